@@ -1 +1,2 @@
 from .logger import Logger
+from .manager import get_logger
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from asyncio import AbstractServer, StreamReader, StreamWriter
+from typing import Callable, Dict, Optional
+
+from aiologger.handlers.sockets import decode_records
+from aiologger.logger import Logger
+from aiologger.utils import current_task
+
+READ_SIZE = 256 * 1024
+DEFAULT_CLOSE_TIMEOUT = 1.0
+
+
+class LogCollector:
+    """
+    Receives records sent by `AsyncUnixSocketHandler`s, usually from many
+    worker processes, and handles them with a single `Logger`. Its handlers,
+    e.g. an `AsyncTimedRotatingFileHandler`, are then only used by the
+    collector process.
+
+    Records from each connection are handled in the order they were sent.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        logger: Logger,
+        deserializer: Callable[[bytes], dict] = json.loads,
+    ) -> None:
+        self.path = path
+        self.logger = logger
+        self.deserializer = deserializer
+        self.server: Optional[AbstractServer] = None
+        self._connections: Dict[asyncio.Task, StreamWriter] = {}
+
+    async def start(self) -> None:
+        """
+        Start listening on the Unix socket at `path`.
+        """
+        self.server = await asyncio.start_unix_server(
+            self._serve_connection, path=self.path
+        )
+
+    async def _serve_connection(
+        self, reader: StreamReader, writer: StreamWriter
+    ) -> None:
+        task = current_task()
+        self._connections[task] = writer  # type: ignore
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+                for record in decode_records(buffer, self.deserializer):
+                    await self.logger.handle(record)
+        finally:
+            self._connections.pop(task, None)  # type: ignore
+            writer.close()
+
+    async def close(self, timeout: float = DEFAULT_CLOSE_TIMEOUT) -> None:
+        """
+        Stop accepting connections, wait at most `timeout` seconds for the
+        connected handlers to disconnect and shut down the logger. Connections
+        still open by then are closed, after the records already received
+        from them are handled.
+        """
+        server, self.server = self.server, None
+        if server is not None:
+            server.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections), timeout=timeout)
+        for writer in list(self._connections.values()):
+            # The connection task reads until EOF, then ends
+            writer.close()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if server is not None:
+            await server.wait_closed()
+        await self.logger.shutdown()
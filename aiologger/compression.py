@@ -0,0 +1,136 @@
+import bz2
+import enum
+import gzip
+import lzma
+import os
+import shutil
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from aiologger.utils import get_running_loop
+
+
+class Compression(str, enum.Enum):
+    """
+    Compression formats for rotated log files.
+
+    | compression | suffix | level                                  |
+    |-------------|--------|----------------------------------------|
+    | GZIP        | .gz    | 1 (fastest) to 9, defaults to 9        |
+    | BZ2         | .bz2   | 1 (fastest) to 9, defaults to 9        |
+    | LZMA        | .xz    | preset 0 (fastest) to 9, defaults to 6 |
+    """
+
+    GZIP = "GZIP"
+    BZ2 = "BZ2"
+    LZMA = "LZMA"
+
+    @property
+    def suffix(self) -> str:
+        return _SUFFIXES[self]
+
+
+_SUFFIXES = {
+    Compression.GZIP: ".gz",
+    Compression.BZ2: ".bz2",
+    Compression.LZMA: ".xz",
+}
+
+
+def _open_compressed(path: str, compression: Compression, level: Optional[int]):
+    if compression == Compression.LZMA:
+        return lzma.open(path, "wb", preset=level)
+    module = gzip if compression == Compression.GZIP else bz2
+    if level is None:
+        return module.open(path, "wb")
+    return module.open(path, "wb", compresslevel=level)
+
+
+def compress_file(
+    source: str, compression: Compression, level: Optional[int] = None
+) -> str:
+    """
+    Compresses `source` into `source` plus the compression suffix, then
+    removes it. The compressed data is written to a temporary file that is
+    renamed once complete, so the compressed file is never seen partially
+    written. It keeps the times of `source`, which retention uses as its
+    age. Returns the compressed file path.
+    """
+    compression = Compression(compression)
+    dest = source + compression.suffix
+    temp_path = dest + ".tmp"
+    try:
+        with open(source, "rb") as src, _open_compressed(
+            temp_path, compression, level
+        ) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        stat = os.stat(source)
+        os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        with open(temp_path, "rb") as fp:
+            os.fsync(fp.fileno())
+        os.replace(temp_path, dest)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    os.unlink(source)
+    return dest
+
+
+class FileCompressor:
+    """
+    Compresses rotated log files in a process pool, so compression neither
+    blocks the event loop nor competes with it for the GIL.
+
+    At most `max_workers` files are compressed at the same time, the others
+    wait in the pool queue. The pool is created on first use and may be
+    shared by many handlers. An `executor` may be given instead, e.g. a
+    `ThreadPoolExecutor`.
+    """
+
+    def __init__(
+        self,
+        compression: Compression = Compression.GZIP,
+        level: Optional[int] = None,
+        max_workers: int = 1,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if max_workers <= 0:
+            raise ValueError(
+                f"max_workers must be a positive int: {max_workers}"
+            )
+        self.compression = Compression(compression)
+        self.level = level
+        self.max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def suffix(self) -> str:
+        return self.compression.suffix
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def compress(self, path: str) -> str:
+        """
+        Compresses `path`, as described by `compress_file`, and returns the
+        compressed file path.
+        """
+        return await get_running_loop().run_in_executor(
+            self._get_executor(),
+            compress_file,
+            path,
+            self.compression,
+            self.level,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the process pool, if it was created by the compressor.
+        """
+        if self._owns_executor and self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=wait)
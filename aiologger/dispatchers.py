@@ -0,0 +1,396 @@
+import asyncio
+import enum
+import threading
+from asyncio import AbstractEventLoop, Future, Task, TimerHandle
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple, Union
+
+from aiologger.levels import LogLevel, check_level
+from aiologger.records import LogRecord
+from aiologger.utils import get_running_loop
+
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_DROPPED_REPORT_INTERVAL = 10.0
+
+_RecordHandler = Callable[[LogRecord], Awaitable[Any]]
+_DroppedReporter = Callable[[int], Awaitable[None]]
+_BatchHandler = Callable[[List[LogRecord]], None]
+_DroppedCounter = Callable[[int], None]
+
+
+class OverflowPolicy(str, enum.Enum):
+    """
+    What to do with a record that is put into a full queue.
+
+    | policy           | behavior                                            |
+    |------------------|-----------------------------------------------------|
+    | BLOCK            | the record waits for room in the queue              |
+    | DROP_NEWEST      | the record is dropped                               |
+    | DROP_OLDEST      | the oldest queued record is dropped to make room    |
+    | DROP_BELOW_LEVEL | records below `drop_level` are dropped, others wait |
+
+    Waiting only applies backpressure to callers that await the log call. At
+    most as many records as fit in the queue wait for room, and records put
+    after that are dropped too, so callers that don't await can't grow the
+    memory used without bound.
+    """
+
+    BLOCK = "BLOCK"
+    DROP_NEWEST = "DROP_NEWEST"
+    DROP_OLDEST = "DROP_OLDEST"
+    DROP_BELOW_LEVEL = "DROP_BELOW_LEVEL"
+
+
+class QueuedDispatcher:
+    """
+    Delivers records to a coroutine function using a bounded queue and a
+    single long-lived consumer task, instead of one task per record.
+
+    Records are handled in the same order that they were put. `put` never
+    schedules a task: while there is room in the queue it returns an already
+    completed future, otherwise it applies the `overflow_policy`. Records that
+    must wait for room get a future that completes once they're admitted into
+    the queue, which callers should await before putting more records. Once
+    `max_size` records are waiting, records that would wait are dropped.
+
+    Dropped records are counted by policy on `dropped`. If `on_dropped` is
+    given, it's awaited by the consumer with the number of records dropped
+    since its last call, at most once every `report_interval` seconds.
+
+    Once closed, records put are dropped and counted on `dropped_after_close`.
+    """
+
+    def __init__(
+        self,
+        handle: _RecordHandler,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        drop_level: Union[str, int, LogLevel] = LogLevel.WARNING,
+        on_dropped: Optional[_DroppedReporter] = None,
+        report_interval: float = DEFAULT_DROPPED_REPORT_INTERVAL,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError(f"max_size must be a positive int: {max_size}")
+        self.handle = handle
+        self.max_size = max_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.drop_level = check_level(drop_level)
+        self.on_dropped = on_dropped
+        self.report_interval = report_interval
+        self.dropped: Counter = Counter()
+        self.dropped_after_close = 0
+        self.closed = False
+        self._dropped_since_report = 0
+        self._report_timer: Optional[TimerHandle] = None
+        self._report_due = False
+        self._records: Deque[LogRecord] = deque()
+        self._waiting: Deque[Tuple[LogRecord, Future]] = deque()
+        self._joiners: Deque[Tuple[int, Future]] = deque()
+        self._put_count = 0
+        self._handled_count = 0
+        self._loop: Optional[AbstractEventLoop] = None
+        self._consumer: Optional[Task] = None
+        self._wakeup: Optional[Future] = None
+        self._enqueued: Optional[Future] = None
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of records waiting to be handled, including the ones waiting
+        for room in the queue.
+        """
+        return len(self._records) + len(self._waiting)
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of records put that weren't handled yet, including the one
+        being handled.
+        """
+        return self._put_count - self._handled_count
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the consumer task is running on the current event loop.
+        """
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            return False
+        return (
+            loop is self._loop
+            and self._consumer is not None
+            and not self._consumer.done()
+        )
+
+    def _ensure_consumer(self) -> AbstractEventLoop:
+        loop = get_running_loop()
+        if loop is not self._loop:
+            # Records put while running on a previous event loop can't be
+            # handled anymore, since its consumer died with it.
+            self._reset(loop)
+        if self._consumer is None or self._consumer.done():
+            self._consumer = loop.create_task(self._consume())
+        return loop
+
+    def _reset(self, loop: AbstractEventLoop) -> None:
+        self._loop = loop
+        self._records.clear()
+        self._waiting.clear()
+        self._joiners.clear()
+        self._put_count = self._handled_count = 0
+        self._consumer = self._wakeup = self._report_timer = None
+        self._report_due = False
+        self._enqueued = loop.create_future()
+        self._enqueued.set_result(None)
+
+    def _wake_consumer(self) -> None:
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    def _drop(self, loop: AbstractEventLoop, policy: OverflowPolicy) -> None:
+        self.dropped[policy] += 1
+        self._dropped_since_report += 1
+        if self.on_dropped is not None and self._report_timer is None:
+            self._report_timer = loop.call_later(
+                self.report_interval, self._schedule_report
+            )
+
+    def _schedule_report(self) -> None:
+        self._report_timer = None
+        self._report_due = True
+        self._wake_consumer()
+
+    def put(self, record: LogRecord) -> Future:
+        """
+        Put a record into the queue. The returned future completes as soon
+        as the record is in the queue (or was dropped), not when it's handled.
+        """
+        if self.closed:
+            self.dropped_after_close += 1
+            return _completed_future()
+        loop = self._ensure_consumer()
+        if not self._waiting and len(self._records) < self.max_size:
+            self._put_count += 1
+            self._records.append(record)
+            self._wake_consumer()
+            return self._enqueued  # type: ignore
+
+        policy = self.overflow_policy
+        if policy == OverflowPolicy.DROP_NEWEST or (
+            policy == OverflowPolicy.DROP_BELOW_LEVEL
+            and record.levelno < self.drop_level
+        ):
+            self._drop(loop, policy)
+            return self._enqueued  # type: ignore
+        if policy == OverflowPolicy.DROP_OLDEST:
+            self._records.popleft()
+            self._handled_count += 1
+            self._drop(loop, policy)
+            self._put_count += 1
+            self._records.append(record)
+            return self._enqueued  # type: ignore
+
+        if len(self._waiting) >= self.max_size:
+            # Callers that don't await their future could otherwise keep
+            # adding records
+            self._drop(loop, policy)
+            return self._enqueued  # type: ignore
+        self._put_count += 1
+        future = loop.create_future()
+        self._waiting.append((record, future))
+        return future
+
+    def _admit_waiting(self) -> None:
+        while self._waiting and len(self._records) < self.max_size:
+            record, future = self._waiting.popleft()
+            if future.cancelled():
+                self._handled_count += 1
+                continue
+            self._records.append(record)
+            future.set_result(None)
+
+    def _notify_joiners(self) -> None:
+        while self._joiners and self._joiners[0][0] <= self._handled_count:
+            _, future = self._joiners.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    async def _call(self, coro: Awaitable[Any], **context) -> None:
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            get_running_loop().call_exception_handler(
+                {
+                    "message": "Unhandled exception while dispatching a log record",
+                    "exception": exc,
+                    **context,
+                }
+            )
+
+    async def _report_dropped(self) -> None:
+        self._report_due = False
+        count, self._dropped_since_report = self._dropped_since_report, 0
+        if count and self.on_dropped is not None:
+            await self._call(self.on_dropped(count))
+
+    async def _consume(self) -> None:
+        loop = get_running_loop()
+        while True:
+            self._admit_waiting()
+            self._notify_joiners()
+            if self._report_due:
+                await self._report_dropped()
+            if not self._records:
+                self._wakeup = loop.create_future()
+                await self._wakeup
+                self._wakeup = None
+                continue
+
+            record = self._records.popleft()
+            self._admit_waiting()
+            await self._call(self.handle(record), record=record)
+            self._handled_count += 1
+
+    async def join(self) -> None:
+        """
+        Wait until every record put so far has been handled.
+        """
+        if self._loop is None or self._handled_count >= self._put_count:
+            return
+        future = get_running_loop().create_future()
+        self._joiners.append((self._put_count, future))
+        await future
+
+    async def close(self) -> None:
+        """
+        Stop the consumer task, reporting any pending dropped records. Records
+        still in the queue are discarded, so `join` should be awaited first,
+        and the ones waiting for room have their futures completed.
+        """
+        self.closed = True
+        while self._waiting:
+            _, future = self._waiting.popleft()
+            if not future.done():
+                future.set_result(None)
+        if self._report_timer is not None:
+            self._report_timer.cancel()
+            self._report_timer = None
+        consumer, self._consumer = self._consumer, None
+        if consumer is None or consumer.done():
+            return
+        if consumer.get_loop() is not get_running_loop():
+            consumer.cancel()
+            return
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+        await self._report_dropped()
+
+
+def _completed_future() -> Future:
+    future = get_running_loop().create_future()
+    future.set_result(None)
+    return future
+
+
+class ThreadSafeBuffer:
+    """
+    Collects records put by threads other than the event loop thread and
+    hands them to `dispatch_batch`, in the loop thread, in put order.
+
+    Producers only append to a deque and take a lock to check whether a
+    drain is already scheduled, so the loop is woken up with a single
+    `call_soon_threadsafe` per batch instead of one per record. Records put
+    before a loop is bound, or after it was closed, wait in the buffer until
+    the next one is bound, or until `flush` is called from a loop.
+
+    At most `max_size` records wait for a loop; the ones put after that are
+    dropped and counted on `dropped`. If `on_dropped` is given, it's called
+    from the loop with the number of records dropped since its last call.
+    """
+
+    def __init__(
+        self,
+        dispatch_batch: _BatchHandler,
+        loop: Optional[AbstractEventLoop] = None,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        on_dropped: Optional[_DroppedCounter] = None,
+    ) -> None:
+        self.dispatch_batch = dispatch_batch
+        self.loop = loop
+        self.max_size = max_size
+        self.on_dropped = on_dropped
+        self.dropped = 0
+        self._dropped_since_report = 0
+        self._records: Deque[LogRecord] = deque()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def bind(self, loop: AbstractEventLoop) -> None:
+        """
+        Hands the records to `loop` from now on, including the ones waiting.
+        """
+        if loop is self.loop:
+            return
+        self.loop = loop
+        with self._lock:
+            # A drain scheduled on the previous loop may never run
+            self._drain_scheduled = False
+        if self._records:
+            self._schedule_drain(loop)
+
+    def put(self, record: LogRecord) -> None:
+        loop = self.loop
+        if loop is None and len(self._records) >= self.max_size:
+            with self._lock:
+                self.dropped += 1
+                self._dropped_since_report += 1
+            return
+        self._records.append(record)
+        if loop is not None:
+            self._schedule_drain(loop)
+
+    def flush(self) -> None:
+        """
+        Hands the waiting records to `dispatch_batch` right away. Must be
+        called from the loop thread.
+        """
+        self._drain()
+
+    def _schedule_drain(self, loop: AbstractEventLoop) -> None:
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        try:
+            loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            # The loop is closed, so records wait for the next one
+            with self._lock:
+                self._drain_scheduled = False
+            if self.loop is loop:
+                self.loop = None
+
+    def _drain(self) -> None:
+        with self._lock:
+            self._drain_scheduled = False
+            dropped, self._dropped_since_report = self._dropped_since_report, 0
+        if dropped and self.on_dropped is not None:
+            self.on_dropped(dropped)
+        records = []
+        while True:
+            try:
+                records.append(self._records.popleft())
+            except IndexError:
+                break
+        if records:
+            self.dispatch_batch(records)
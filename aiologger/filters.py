@@ -1,10 +1,23 @@
 # The following code and documentation was inspired, and in some cases
 # copied and modified, from the work of Vinay Sajip and contributors
 # on cpython's logging package
+import enum
+import time
+import zlib
 from abc import ABC
-from typing import List, Callable, Union
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from aiologger.levels import LogLevel
+from aiologger.levels import LogLevel, check_level
 from aiologger.records import LogRecord
 
 
@@ -96,3 +109,197 @@ class StdoutFilter(Filter):
 
     def filter(self, record: LogRecord) -> bool:
         return record.levelno in self._levels
+
+
+def _call_site(record: LogRecord) -> Hashable:
+    return record.pathname, record.lineno
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated_at", "suppressed")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.suppressed = 0
+
+
+class RateLimitFilter(Filter):
+    """
+    Limits how often records with the same key are logged, using a token
+    bucket per key: each record takes a token, buckets hold at most `burst`
+    tokens and are refilled with `rate` tokens per second.
+
+    By default, records are keyed by call site, i.e. their `pathname` and
+    `lineno`, so loggers with `capture_caller=False` should use a `key`
+    function. Only the `max_keys` most recently used buckets are kept.
+
+    Records that pass get the number of records with the same key that
+    were suppressed since the previous one as `suppressed`. The record is
+    shared by every handler, so its message isn't changed: formatters may
+    opt into the count, e.g. "%(message)s (%(suppressed)s suppressed)", or
+    `ExtendedJsonFormatter(record_attrs=["suppressed"])`.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 10,
+        key: Optional[Callable[[LogRecord], Hashable]] = None,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        if rate <= 0 or burst < 1:
+            raise ValueError(
+                f"rate and burst must be positive: {rate}, {burst}"
+            )
+        self.rate = rate
+        self.burst = burst
+        self.key = _call_site if key is None else key
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[Hashable, _TokenBucket]" = OrderedDict()
+
+    def filter(self, record: LogRecord) -> bool:
+        key = self.key(record)
+        now = self.clock()
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_keys:
+                buckets.popitem(last=False)
+            bucket = buckets[key] = _TokenBucket(self.burst, now)
+        else:
+            buckets.move_to_end(key)
+            bucket.tokens = min(
+                self.burst,
+                bucket.tokens + (now - bucket.updated_at) * self.rate,
+            )
+            bucket.updated_at = now
+
+        if bucket.tokens < 1:
+            bucket.suppressed += 1
+            return False
+        bucket.tokens -= 1
+        record.suppressed = bucket.suppressed  # type: ignore
+        bucket.suppressed = 0
+        return True
+
+
+_Level = Union[str, int, LogLevel]
+
+
+class SamplingMethod(str, enum.Enum):
+    """
+    How `SamplingFilter` chooses the records it keeps.
+
+    | method  | behavior                                                  |
+    |---------|-----------------------------------------------------------|
+    | COUNTER | a `rate` fraction of the records of each key is kept, at  |
+    |         | evenly spaced intervals, e.g. 1 in 4 for 0.25             |
+    | HASH    | records are kept if their key hashes below the rate, so a |
+    |         | key is always kept or always dropped, in every process    |
+    """
+
+    COUNTER = "COUNTER"
+    HASH = "HASH"
+
+
+class SamplingFilter(Filter):
+    """
+    Keeps only a fraction of the records of some levels, e.g. 1% of DEBUG
+    and INFO records, while records of levels without a rate are all kept.
+
+    `rates` maps levels to the fraction of their records that is kept.
+    `logger_rates` overrides them for loggers with the given names, and for
+    their children, e.g. {"app.db": {"DEBUG": 0.1}}.
+
+    Records are sampled by key, which is their call site by default. Kept
+    records get the rate they were sampled with as `sample_rate`, so counts
+    can be re-weighted downstream. The record is shared by every handler,
+    so its `extra` fields aren't changed: formatters may opt into the rate,
+    e.g. with `ExtendedJsonFormatter(record_attrs=["sample_rate"])`.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Mapping[_Level, float]] = None,
+        logger_rates: Optional[Mapping[str, Mapping[_Level, float]]] = None,
+        method: SamplingMethod = SamplingMethod.COUNTER,
+        key: Optional[Callable[[LogRecord], Hashable]] = None,
+        max_keys: int = 10000,
+    ) -> None:
+        super().__init__()
+        if rates is None:
+            rates = {LogLevel.DEBUG: 0.01, LogLevel.INFO: 0.01}
+        self.rates = self._check_rates(rates)
+        self.logger_rates = {
+            name: self._check_rates(level_rates)
+            for name, level_rates in (logger_rates or {}).items()
+        }
+        self.method = SamplingMethod(method)
+        self.key = _call_site if key is None else key
+        self.max_keys = max_keys
+        self._resolved_rates: Dict[Tuple[str, int], float] = {}
+        # The fraction of a record each key is owed, kept once it reaches 1
+        self._credits: Dict[Hashable, float] = {}
+
+    @staticmethod
+    def _check_rates(rates: Mapping[_Level, float]) -> Dict[int, float]:
+        checked = {}
+        for level, rate in rates.items():
+            if not 0 <= rate <= 1:
+                raise ValueError(
+                    f"Sample rates must be between 0 and 1: {rate}"
+                )
+            checked[check_level(level)] = rate
+        return checked
+
+    def get_rate(self, name: str, level: int) -> float:
+        """
+        The fraction of the records of a logger and level that is kept.
+        """
+        try:
+            return self._resolved_rates[(name, level)]
+        except KeyError:
+            pass
+        rate = self.rates.get(level, 1.0)
+        ancestor = name
+        while ancestor:
+            level_rates = self.logger_rates.get(ancestor)
+            if level_rates is not None and level in level_rates:
+                rate = level_rates[level]
+                break
+            ancestor, _, _ = ancestor.rpartition(".")
+        self._resolved_rates[(name, level)] = rate
+        return rate
+
+    def filter(self, record: LogRecord) -> bool:
+        rate = self.get_rate(record.name, record.levelno)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+
+        key = self.key(record)
+        if self.method == SamplingMethod.HASH:
+            digest = zlib.crc32(str(key).encode())
+            if digest >= rate * 0x100000000:
+                return False
+        else:
+            credits = self._credits
+            credit = credits.get(key)
+            if credit is None:
+                if len(credits) >= self.max_keys:
+                    credits.clear()
+                # The first record of a key is kept
+                credit = 1 - rate
+            credit += rate
+            if credit < 1:
+                credits[key] = credit
+                return False
+            credits[key] = credit - 1
+
+        record.sample_rate = rate  # type: ignore
+        return True
@@ -4,10 +4,11 @@ from datetime import datetime
 from inspect import istraceback
 from typing import Callable, Iterable, Union, Dict, Optional, List
 from datetime import timezone
+from weakref import WeakKeyDictionary
 
 from aiologger.formatters.base import Formatter
 from aiologger.levels import LEVEL_TO_NAME
-from aiologger.records import LogRecord, ExtendedLogRecord
+from aiologger.records import BoundExtra, LogRecord, ExtendedLogRecord
 from aiologger.utils import CallableWrapper
 
 
@@ -18,6 +19,8 @@ LOG_LEVEL_FIELDNAME = "level"
 MSG_FIELDNAME = "msg"
 FILE_PATH_FIELDNAME = "file_path"
 
+_MISSING = object()
+
 
 class JsonFormatter(Formatter):
     def __init__(
@@ -133,8 +136,13 @@ class ExtendedJsonFormatter(JsonFormatter):
         default_msg_fieldname: str = None,
         exclude_fields: Iterable[str] = None,
         tz: timezone = None,
+        record_attrs: Iterable[str] = (),
     ) -> None:
-
+        """
+        :param record_attrs: Names of record attributes, like the ones set by
+        filters, e.g. `sample_rate`, that are added as fields to the records
+        that have them.
+        """
         super(ExtendedJsonFormatter, self).__init__(
             serializer=serializer, default_msg_fieldname=default_msg_fieldname
         )
@@ -143,6 +151,12 @@ class ExtendedJsonFormatter(JsonFormatter):
             self.log_fields = self.default_fields
         else:
             self.log_fields = self.default_fields - set(exclude_fields)
+        self.record_attrs = tuple(record_attrs)
+        # Serialized bound extra fields, without the surrounding braces
+        self._bound_extra_fragments: "WeakKeyDictionary[BoundExtra, str]" = (
+            WeakKeyDictionary()
+        )
+        self._item_separator: Optional[str] = None
 
     def formatter_fields_for_record(self, record: LogRecord):
         """
@@ -164,21 +178,72 @@ class ExtendedJsonFormatter(JsonFormatter):
             if field in self.log_fields:
                 yield field, value
 
-    def format(self, record: ExtendedLogRecord) -> str:  # type: ignore
-        """
-        :type record: aiologger.records.ExtendedLogRecord
-        """
+    def _make_msg(
+        self, record: ExtendedLogRecord, bound_fields: Optional[Dict] = None
+    ) -> Dict:
         msg = dict(self.formatter_fields_for_record(record))
         if record.flatten and isinstance(record.msg, dict):
             msg.update(record.msg)
         else:
             msg[MSG_FIELDNAME] = record.msg
 
+        for attr in self.record_attrs:
+            value = getattr(record, attr, _MISSING)
+            if value is not _MISSING:
+                msg[attr] = value
+        if bound_fields:
+            msg.update(bound_fields)
         if record.extra:
             msg.update(record.extra)
         if record.exc_info:
             msg["exc_info"] = record.exc_info
         if record.exc_text:
             msg["exc_text"] = record.exc_text
+        return msg
+
+    def _get_bound_extra_fragment(self, bound_extra: BoundExtra) -> str:
+        try:
+            return self._bound_extra_fragments[bound_extra]
+        except KeyError:
+            serialized = self._serializer_ensure_str(
+                msg=dict(bound_extra.fields)
+            )
+            fragment = serialized.strip()[1:-1].strip()
+            self._bound_extra_fragments[bound_extra] = fragment
+            return fragment
+
+    def _get_item_separator(self) -> str:
+        if self._item_separator is None:
+            probe = self._serializer_ensure_str(msg={"a": 0, "b": 0})
+            self._item_separator = probe[
+                probe.index("0") + 1 : probe.index('"b"')
+            ]
+        return self._item_separator
+
+    def format(self, record: ExtendedLogRecord) -> str:  # type: ignore
+        """
+        :type record: aiologger.records.ExtendedLogRecord
+
+        Fields bound to the logger are serialized only once, and spliced into
+        the serialized record, unless the record has `serializer_kwargs` or
+        has fields with the same names.
+        """
+        bound_extra = record.bound_extra
+        if bound_extra is None:
+            return self._serializer_ensure_str(
+                msg=self._make_msg(record), record=record
+            )
 
+        if not record.serializer_kwargs:
+            msg = self._make_msg(record)
+            if bound_extra.fields.keys().isdisjoint(msg):
+                fragment = self._get_bound_extra_fragment(bound_extra)
+                serialized = self._serializer_ensure_str(msg=msg)
+                if not fragment:
+                    return serialized
+                if serialized.endswith("}"):
+                    separator = self._get_item_separator() if msg else ""
+                    return f"{serialized[:-1]}{separator}{fragment}}}"
+
+        msg = self._make_msg(record, bound_extra.fields)  # type: ignore
         return self._serializer_ensure_str(msg=msg, record=record)
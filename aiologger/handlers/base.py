@@ -7,7 +7,12 @@ from aiologger import settings
 from aiologger.filters import Filterer
 from aiologger.formatters.base import Formatter
 from aiologger.formatters.json import JsonFormatter
-from aiologger.levels import LogLevel, check_level, get_level_name
+from aiologger.levels import (
+    EffectiveLevels,
+    LogLevel,
+    check_level,
+    get_level_name,
+)
 from aiologger.records import LogRecord
 
 
@@ -47,6 +52,7 @@ class Handler(Filterer):
         Set the logging level of this handler.
         """
         self._level = check_level(value)
+        EffectiveLevels.invalidate()
 
     @abc.abstractmethod
     async def emit(self, record: LogRecord) -> None:
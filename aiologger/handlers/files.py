@@ -4,19 +4,116 @@
 
 import abc
 import asyncio
+import codecs
 import datetime
 import enum
 import os
 import re
 import time
-from typing import Callable, List, Optional
+from asyncio import Future, Task, TimerHandle
+from collections import Counter
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
 
 import aiofiles
 from aiofiles.threadpool import AsyncTextIOWrapper
+from aiologger.compression import FileCompressor
 from aiologger.formatters.base import Formatter
 from aiologger.handlers.base import Handler
+from aiologger.levels import LogLevel, check_level
 from aiologger.records import LogRecord
-from aiologger.utils import classproperty, get_running_loop
+from aiologger.retention import (
+    DEFAULT_MAX_DELETES_PER_SECOND,
+    Backup,
+    BackupJanitor,
+)
+from aiologger.utils import (
+    classproperty,
+    create_task,
+    current_task,
+    get_running_loop,
+)
+from aiologger.writers import (
+    DEFAULT_ATOMIC_WRITE_SIZE,
+    AtomicAppendStream,
+    FdStream,
+    PreallocatedStream,
+    WriterThread,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+_Stream = Union[
+    AsyncTextIOWrapper, FdStream, AtomicAppendStream, PreallocatedStream
+]
+
+# Only syncs the data, and the metadata needed to read it, where supported
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+# The `.N` suffix of a backup name, before any compression suffix
+_BACKUP_NUMBER = re.compile(r"\.(\d+)(\.(gz|bz2|xz))?$", re.ASCII)
+
+
+class DurabilityPolicy(str, enum.Enum):
+    """
+    When a file handler syncs the written records to disk, besides flushing
+    them to the OS.
+
+    | policy       | behavior                                                |
+    |--------------|---------------------------------------------------------|
+    | NONE         | records are never synced, the OS decides when           |
+    | INTERVAL     | records are synced in the background, at most           |
+    |              | `sync_interval` seconds after being written             |
+    | LEVEL        | records at `sync_level` or above wait until synced      |
+    | GROUP_COMMIT | every record waits until synced, and concurrent records |
+    |              | share the same `fdatasync`                              |
+
+    With every policy but NONE, files are also synced before being closed
+    or rotated. Buffered records wait for their sync only if written right
+    away, i.e. the ones at `flush_level` or above.
+    """
+
+    NONE = "NONE"
+    INTERVAL = "INTERVAL"
+    LEVEL = "LEVEL"
+    GROUP_COMMIT = "GROUP_COMMIT"
+
+
+class SyncStats:
+    """
+    Latency metrics of the syncs of a file handler, in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total_time / self.count
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.last_time = duration
+        if duration > self.max_time:
+            self.max_time = duration
 
 
 class AsyncFileHandler(Handler):
@@ -28,42 +125,235 @@ class AsyncFileHandler(Handler):
         mode: str = "a",
         encoding: str = None,
         formatter: Formatter = None,
+        buffered: bool = False,
+        max_buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        flush_level: Union[str, int, LogLevel] = LogLevel.ERROR,
+        writer_thread: Optional[WriterThread] = None,
+        preallocate: int = 0,
+        durability: DurabilityPolicy = DurabilityPolicy.NONE,
+        sync_interval: float = 1.0,
+        sync_level: Union[str, int, LogLevel] = LogLevel.ERROR,
     ) -> None:
+        """
+        :param buffered: If True, formatted records are kept in memory and
+        written, then flushed, many at a time, instead of once per record.
+        :param max_buffer_size: Size of the buffered records, in characters,
+        at which they're written right away.
+        :param flush_interval: Maximum number of seconds that a record waits
+        in the buffer before being written.
+        :param flush_level: Records with this level or above are written
+        right away, along with the records buffered before them.
+        :param writer_thread: If given, the file is opened as a raw file
+        descriptor and written by this thread, instead of aiofiles and the
+        default executor. Many handlers may share the same thread.
+        :param preallocate: If > 0, the file is written at offsets tracked in
+        memory, and space is preallocated in chunks of this many bytes as it
+        grows. It's truncated to the written length when closed or rotated.
+        :param durability: When records are synced to disk, as described by
+        `DurabilityPolicy`. Sync latencies are reported by `sync_stats`.
+        :param sync_interval: Seconds between syncs with INTERVAL durability.
+        :param sync_level: Level of the records that wait until synced with
+        LEVEL durability.
+        """
         super().__init__(formatter=formatter)
         filename = os.fspath(filename)
         self.absolute_file_path = os.path.abspath(filename)
         self.mode = mode
         self.encoding = encoding
-        self.stream: AsyncTextIOWrapper = None
-        self._initialization_lock = None
+        self.stream: _Stream = None
+        self._initialization_lock: Optional[asyncio.Lock] = None
+        if preallocate > 0 and writer_thread is not None:
+            raise ValueError("preallocate can't be used with a writer_thread")
+        self.writer_thread = writer_thread
+        self.preallocate = preallocate
+        self.buffered = buffered
+        self.max_buffer_size = max_buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = check_level(flush_level)
+        self._buffer: List[str] = []
+        self._buffer_size = 0
+        self._buffer_last_record: Optional[LogRecord] = None
+        self._buffer_writer: Optional[Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self.durability = DurabilityPolicy(durability)
+        self.sync_interval = sync_interval
+        self.sync_level = check_level(sync_level)
+        self.sync_stats = SyncStats()
+        self._buffer_sync = False
+        self._sync_timer: Optional[TimerHandle] = None
+        # Group commit: the next sync of each stream, and the task running
+        # its syncs
+        self._sync_waiters: Dict[object, Future] = {}
+        self._sync_tasks: Dict[object, Task] = {}
+        # Writes in flight by stream, so streams are only closed after them
+        self._stream_writes: Counter = Counter()
+        self._retiring_streams: Dict[object, Future] = {}
 
     @property
     def initialized(self):
         return self.stream is not None
 
+    def _get_initialization_lock(self) -> asyncio.Lock:
+        if not self._initialization_lock:
+            self._initialization_lock = asyncio.Lock()
+        return self._initialization_lock
+
     async def _init_writer(self):
         """
         Open the current base file with the (original) mode and encoding.
         """
-        if not self._initialization_lock:
-            self._initialization_lock = asyncio.Lock()
-
-        async with self._initialization_lock:
+        async with self._get_initialization_lock():
             if not self.initialized:
-                self.stream = await aiofiles.open(
-                    file=self.absolute_file_path,
-                    mode=self.mode,
-                    encoding=self.encoding,
+                self.stream = await self._open_stream()
+
+    async def _open_stream(self) -> _Stream:
+        if self.writer_thread is not None:
+            return await self.writer_thread.open(
+                self.absolute_file_path, self.mode, self.encoding
+            )
+        if self.preallocate > 0:
+            return await PreallocatedStream.open(
+                self.absolute_file_path,
+                self.mode,
+                self.preallocate,
+                self.encoding,
+            )
+        return await aiofiles.open(
+            file=self.absolute_file_path, mode=self.mode, encoding=self.encoding
+        )
+
+    async def _write(self, data: str, sync: bool = False) -> None:
+        """
+        Writes and flushes `data`. If `sync`, also waits until it's synced.
+        """
+        stream = self.stream
+        self._stream_writes[stream] += 1
+        try:
+            await stream.write(data)
+            if isinstance(stream, FdStream):
+                # Only waits for the writer thread while it's behind
+                await stream.drain()
+            else:
+                await stream.flush()
+            if sync:
+                await self._sync(stream)
+            elif (
+                self.durability == DurabilityPolicy.INTERVAL
+                and self._sync_timer is None
+            ):
+                self._sync_timer = get_running_loop().call_later(
+                    self.sync_interval, self._on_sync_timer
                 )
+        finally:
+            self._stream_writes[stream] -= 1
+            if not self._stream_writes[stream]:
+                del self._stream_writes[stream]
+                waiter = self._retiring_streams.pop(stream, None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(None)
+
+    async def _retire_stream(self, stream) -> None:
+        """
+        Closes a stream that was replaced, once the writes that started
+        before it was replaced are done.
+        """
+        if self._stream_writes[stream]:
+            waiter = get_running_loop().create_future()
+            self._retiring_streams[stream] = waiter
+            await waiter
+        if self.durability != DurabilityPolicy.NONE:
+            await self._sync(stream)
+        await stream.close()
+
+    def _should_sync(self, record: LogRecord) -> bool:
+        if self.durability == DurabilityPolicy.GROUP_COMMIT:
+            return True
+        return (
+            self.durability == DurabilityPolicy.LEVEL
+            and record.levelno >= self.sync_level
+        )
+
+    async def _fdatasync(self, stream) -> None:
+        start = time.perf_counter()
+        if isinstance(stream, FdStream):
+            # After the writes still queued in the writer thread
+            await stream.writer_thread.call(_fdatasync, stream.fileno())
+        else:
+            await get_running_loop().run_in_executor(
+                None, _fdatasync, stream.fileno()
+            )
+        self.sync_stats.record(time.perf_counter() - start)
+
+    async def _sync(self, stream) -> None:
+        """
+        Waits until everything written to `stream` so far is synced.
+
+        Callers that arrive while a sync is running share the next one,
+        which starts as soon as the running one is done, so any number of
+        concurrent callers costs at most two syncs.
+        """
+        waiter = self._sync_waiters.get(stream)
+        if waiter is None:
+            waiter = get_running_loop().create_future()
+            self._sync_waiters[stream] = waiter
+            if stream not in self._sync_tasks:
+                self._sync_tasks[stream] = create_task(self._run_syncs(stream))
+        await asyncio.shield(waiter)
+
+    async def _run_syncs(self, stream) -> None:
+        try:
+            while stream in self._sync_waiters:
+                waiter = self._sync_waiters.pop(stream)
+                try:
+                    await self._fdatasync(stream)
+                except Exception as exc:
+                    waiter.set_exception(exc)
+                else:
+                    waiter.set_result(None)
+        finally:
+            del self._sync_tasks[stream]
+
+    def _on_sync_timer(self) -> None:
+        self._sync_timer = None
+        if self.initialized:
+            create_task(self._sync_in_background(self.stream))
+
+    async def _sync_in_background(self, stream) -> None:
+        try:
+            await self._sync(stream)
+        except Exception as exc:
+            get_running_loop().call_exception_handler(
+                {
+                    "message": "Unhandled exception while syncing a log file",
+                    "exception": exc,
+                    "handler": self,
+                }
+            )
 
     async def flush(self):
+        """
+        Writes the buffered records, after any batch that's already being
+        written, and flushes the stream.
+        """
+        if self._buffer:
+            await self._write_buffer()
+            return
+        if self._write_lock is not None:
+            # Waits for a batch written in the background
+            async with self._write_lock:
+                pass
         await self.stream.flush()
 
     async def close(self):
         if not self.initialized:
             return
-        await self.stream.flush()
-        await self.stream.close()
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+        await self.flush()
+        # Writes still in flight finish before the stream is closed
+        await self._retire_stream(self.stream)
         self.stream = None
         self._initialization_lock = None
 
@@ -74,13 +364,150 @@ class AsyncFileHandler(Handler):
         try:
             msg = self.formatter.format(record)
 
-            # Write order is not guaranteed. String concatenation required
-            await self.stream.write(msg + self.terminator)
+            if self.buffered:
+                self._buffer.append(msg + self.terminator)
+                self._buffer_size += len(msg) + len(self.terminator)
+                self._buffer_last_record = record
+                self._buffer_sync = self._buffer_sync or self._should_sync(
+                    record
+                )
+                if (
+                    self._buffer_size >= self.max_buffer_size
+                    or record.levelno >= self.flush_level
+                ):
+                    await self._write_buffer()
+                elif self._buffer_writer is None:
+                    self._buffer_writer = create_task(
+                        self._write_buffer_later()
+                    )
+                return
 
-            await self.stream.flush()
+            # Write order is not guaranteed. String concatenation required
+            await self._write(msg + self.terminator, self._should_sync(record))
         except Exception as exc:
             await self.handle_error(record, exc)
 
+    async def _write_buffer_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        record = self._buffer_last_record
+        try:
+            await self._write_buffer()
+        except Exception as exc:
+            await self.handle_error(record, exc)  # type: ignore
+
+    async def _write_buffer(self) -> None:
+        """
+        Writes and flushes the buffered records at once. Batches are written
+        in the order that they were taken from the buffer.
+        """
+        buffer_writer, self._buffer_writer = self._buffer_writer, None
+        if buffer_writer is not None and buffer_writer is not current_task():
+            buffer_writer.cancel()
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffer_size = 0
+        self._buffer_last_record = None
+        sync, self._buffer_sync = self._buffer_sync, False
+
+        if not self._write_lock:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            if not self.initialized:
+                await self._init_writer()
+            await self._write(data, sync)
+
+
+def _get_file_stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _is_same_file(stat: Optional[os.stat_result], file_id: Optional[Tuple]):
+    return stat is not None and (stat.st_dev, stat.st_ino) == file_id
+
+
+class AsyncWatchedFileHandler(AsyncFileHandler):
+    """
+    A file handler that reopens its file when it's renamed or deleted by
+    an external tool, e.g. logrotate, instead of writing to the renamed
+    file forever.
+
+    The file is compared with the open stream by device and inode, with a
+    single `os.stat`, at most once every `check_interval` seconds or, if
+    `check_bytes` is > 0, every `check_bytes` characters written, whichever
+    comes first. Writes that started before a reopen finish on the old
+    stream, and buffered records are written to the new file, in order.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        mode: str = "a",
+        encoding: str = None,
+        formatter: Formatter = None,
+        check_interval: float = 1.0,
+        check_bytes: int = 0,
+        **kwargs,
+    ) -> None:
+        super().__init__(filename, mode, encoding, formatter, **kwargs)
+        self.check_interval = check_interval
+        self.check_bytes = check_bytes
+        self._dev_ino: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self._bytes_since_check = 0
+
+    async def _open_stream(self) -> _Stream:
+        stream = await super()._open_stream()
+        stat = await get_running_loop().run_in_executor(
+            None, os.fstat, stream.fileno()
+        )
+        self._dev_ino = (stat.st_dev, stat.st_ino)
+        self._last_check = time.monotonic()
+        self._bytes_since_check = 0
+        return stream
+
+    async def _write(self, data: str, sync: bool = False) -> None:
+        self._bytes_since_check += len(data)
+        await super()._write(data, sync)
+
+    def _should_check(self) -> bool:
+        if 0 < self.check_bytes <= self._bytes_since_check:
+            return True
+        return time.monotonic() - self._last_check >= self.check_interval
+
+    def _file_changed(self) -> bool:
+        stat = _get_file_stat(self.absolute_file_path)
+        return not _is_same_file(stat, self._dev_ino)
+
+    async def _check_file(self) -> None:
+        """
+        Reopens the file if it was renamed or deleted since it was opened.
+        """
+        self._last_check = time.monotonic()
+        self._bytes_since_check = 0
+        loop = get_running_loop()
+        if not await loop.run_in_executor(None, self._file_changed):
+            return
+        async with self._get_initialization_lock():
+            if not self.initialized or not await loop.run_in_executor(
+                None, self._file_changed
+            ):
+                return
+            old_stream, self.stream = self.stream, await self._open_stream()
+        await self._retire_stream(old_stream)
+
+    async def emit(self, record: LogRecord):
+        if self.initialized and self._should_check():
+            try:
+                await self._check_file()
+            except Exception as exc:
+                await self.handle_error(record, exc)
+        await super().emit(record)
+
 
 Namer = Callable[[str], str]
 Rotator = Callable[[str, str], None]
@@ -95,13 +522,74 @@ class BaseAsyncRotatingFileHandler(AsyncFileHandler, metaclass=abc.ABCMeta):
         namer: Namer = None,
         rotator: Rotator = None,
         formatter: Formatter = None,
+        max_bytes: int = 0,
+        compressor: Optional[FileCompressor] = None,
+        max_total_bytes: int = 0,
+        max_age: float = 0,
+        max_deletes_per_second: int = DEFAULT_MAX_DELETES_PER_SECOND,
+        process_safe: bool = False,
+        atomic_write_size: int = DEFAULT_ATOMIC_WRITE_SIZE,
+        split_long_lines: bool = True,
+        check_interval: float = 1.0,
+        **kwargs,
     ) -> None:
-        super().__init__(filename, mode, encoding, formatter)
+        """
+        :param max_bytes: If > 0, size of the file at which subclasses that
+        support it roll over. The size is tracked in memory, from the size of
+        the file when it's opened plus the characters written to it since.
+        :param compressor: If given, rotated files are compressed by it in
+        the background, and old backups are only deleted after that.
+        :param max_total_bytes: If > 0, the oldest backups are deleted so
+        that all of them take at most this many bytes.
+        :param max_age: If > 0, backups older than this many seconds are
+        deleted.
+        :param max_deletes_per_second: Rate limit of the background task
+        that deletes the backups over the budgets.
+        :param process_safe: If True, many processes may log to the same
+        file: records are written with `O_APPEND`, in writes of whole lines
+        of at most `atomic_write_size` bytes, and rollovers are coordinated
+        through a lock file, so that a single process rotates the file.
+        :param split_long_lines: If False, in process safe mode, records with
+        lines larger than `atomic_write_size` are refused, instead of split.
+        :param check_interval: In process safe mode, seconds between checks
+        for a file rotated by another process, which is then reopened.
+
+        Extra keyword arguments, e.g. `buffered`, are passed to
+        `AsyncFileHandler`.
+        """
+        super().__init__(filename, mode, encoding, formatter, **kwargs)
+        if process_safe and fcntl is None:  # pragma: no cover
+            raise ValueError("process_safe requires fcntl file locks")
+        if process_safe and self.writer_thread is not None:
+            raise ValueError("process_safe can't be used with a writer_thread")
+        if process_safe and self.preallocate > 0:
+            # Preallocated files are written at offsets, not appended to
+            raise ValueError("process_safe can't be used with preallocate")
         self.mode = mode
         self.encoding = encoding
         self.namer = namer
         self.rotator = rotator
+        self.max_bytes = max_bytes
+        self.compressor = compressor
+        self.max_total_bytes = max_total_bytes
+        self.max_age = max_age
+        self.max_deletes_per_second = max_deletes_per_second
+        self.process_safe = process_safe
+        self.atomic_write_size = atomic_write_size
+        self.split_long_lines = split_long_lines
+        self.check_interval = check_interval
+        self.backup_count = 0
+        # Rotated file suffixes that count as backups, set by subclasses
+        self.ext_match: Optional[Pattern] = None
+        self._size = 0
+        # The encoding of the current file, which writes are counted in
+        self._size_encoding = "utf-8"
         self._rollover_lock: Optional[asyncio.Lock] = None
+        self._rollover_task: Optional[Task] = None
+        self._compression_tasks: Set[Task] = set()
+        self._janitor: Optional[BackupJanitor] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
 
     def should_rollover(self, record: LogRecord) -> bool:
         raise NotImplementedError
@@ -109,6 +597,291 @@ class BaseAsyncRotatingFileHandler(AsyncFileHandler, metaclass=abc.ABCMeta):
     async def do_rollover(self):
         raise NotImplementedError
 
+    def _get_rollover_lock(self) -> asyncio.Lock:
+        if not self._rollover_lock:
+            self._rollover_lock = asyncio.Lock()
+        return self._rollover_lock
+
+    async def _open_stream(self) -> _Stream:
+        stream: _Stream
+        if self.process_safe:
+            stream = await AtomicAppendStream.open(
+                self.absolute_file_path,
+                self.encoding,
+                atomic_write_size=self.atomic_write_size,
+                split_long_lines=self.split_long_lines,
+            )
+            stat = await get_running_loop().run_in_executor(
+                None, os.fstat, stream.fileno()
+            )
+            self._file_id = (stat.st_dev, stat.st_ino)
+            self._last_check = time.monotonic()
+            self._size = stat.st_size
+        else:
+            stream = await super()._open_stream()
+            if self.max_bytes > 0:
+                # The only stat per file: from now on, writes are counted
+                self._size = await get_running_loop().run_in_executor(
+                    None, os.path.getsize, self.absolute_file_path
+                )
+        encoding = getattr(stream, "encoding", None) or self.encoding
+        self._size_encoding = codecs.lookup(encoding or "utf-8").name
+        return stream
+
+    def _encoded_size(self, data: str) -> int:
+        if self._size_encoding == "utf-8" and data.isascii():
+            return len(data)
+        return len(data.encode(self._size_encoding, "replace"))
+
+    async def _write(self, data: str, sync: bool = False) -> None:
+        if (
+            self.process_safe
+            and time.monotonic() - self._last_check >= self.check_interval
+        ):
+            await self._reopen_if_replaced()
+        self._size += self._encoded_size(data)
+        await super()._write(data, sync)
+
+    async def _reopen_if_replaced(self) -> bool:
+        """
+        In process safe mode, reopens the file if another process rotated
+        it. Otherwise, the size tracked in memory is updated with the writes
+        of the other processes.
+        """
+        self._last_check = time.monotonic()
+        loop = get_running_loop()
+        stat = await loop.run_in_executor(
+            None, _get_file_stat, self.absolute_file_path
+        )
+        if _is_same_file(stat, self._file_id):
+            self._size = max(self._size, stat.st_size)  # type: ignore
+            return False
+        async with self._get_initialization_lock():
+            if not self.initialized:
+                return False
+            stat = await loop.run_in_executor(
+                None, _get_file_stat, self.absolute_file_path
+            )
+            if _is_same_file(stat, self._file_id):
+                return False
+            old_stream, self.stream = self.stream, await self._open_stream()
+        await self._retire_stream(old_stream)
+        return True
+
+    def _lock_rotation(self) -> int:
+        fd = os.open(
+            self.absolute_file_path + ".lock", os.O_RDWR | os.O_CREAT, 0o666
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _unlock_rotation(fd: int) -> None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read_last_rollover(lock_fd: int) -> float:
+        """
+        The time of the last rollover, recorded in the lock file by the
+        process that did it.
+        """
+        try:
+            return float(os.pread(lock_fd, 32, 0) or 0)
+        except ValueError:
+            return 0.0
+
+    @staticmethod
+    def _record_rollover(lock_fd: int) -> None:
+        os.ftruncate(lock_fd, 0)
+        os.pwrite(lock_fd, repr(time.time()).encode(), 0)
+
+    def _is_over_max_bytes(self, lock_fd: int) -> bool:
+        return os.path.getsize(self.absolute_file_path) >= self.max_bytes
+
+    async def _coordinate_rollover(
+        self,
+        rollover: Callable[[], Awaitable[None]],
+        is_due: Callable[[int], bool],
+    ) -> bool:
+        """
+        Runs `rollover`. In process safe mode, it only runs while holding the
+        lock file and if `is_due(lock_fd)` is still True, after reopening the
+        file if another process already rotated it. Returns whether
+        `rollover` ran.
+        """
+        if not self.process_safe:
+            await rollover()
+            return True
+
+        loop = get_running_loop()
+        lock_fd = await loop.run_in_executor(None, self._lock_rotation)
+        try:
+            await self._reopen_if_replaced()
+            if not await loop.run_in_executor(None, is_due, lock_fd):
+                return False
+            await rollover()
+            await loop.run_in_executor(None, self._record_rollover, lock_fd)
+            return True
+        finally:
+            await loop.run_in_executor(None, self._unlock_rotation, lock_fd)
+
+    def _should_rollover_by_size(self) -> bool:
+        return 0 < self.max_bytes <= self._size
+
+    def _start_rollover(self, rollover: Callable[[], Awaitable[None]]) -> None:
+        """
+        Runs `rollover` in a background task, after any rollover in
+        progress, so records keep being written to the current file
+        meanwhile.
+        """
+        self._rollover_task = create_task(self._run_rollover(rollover))
+
+    async def _run_rollover(self, rollover: Callable[[], Awaitable[None]]):
+        try:
+            async with self._get_rollover_lock():
+                await rollover()
+        except Exception as exc:
+            get_running_loop().call_exception_handler(
+                {
+                    "message": "Unhandled exception during a log file rollover",
+                    "exception": exc,
+                    "handler": self,
+                }
+            )
+        finally:
+            if self._rollover_task is current_task():
+                self._rollover_task = None
+
+    async def _rollover_by_size(self) -> None:
+        if self._should_rollover_by_size():
+            await self.do_rollover()
+
+    async def _handle_rotated_file(self, file_path: str) -> None:
+        """
+        Indexes the rotated file as a backup and starts deleting the ones
+        over the budgets. With a compressor, the rotated file is compressed
+        first, by a background task.
+        """
+        if self.compressor is None:
+            await self._retain_backup(file_path)
+            return
+        task = create_task(self._compress_rotated_file(file_path))
+        self._compression_tasks.add(task)
+        task.add_done_callback(self._compression_tasks.discard)
+
+    async def _compress_rotated_file(self, file_path: str) -> None:
+        compressor = self.compressor
+        assert compressor is not None
+        try:
+            file_path = await compressor.compress(file_path)
+            await self._retain_backup(file_path)
+        except Exception as exc:
+            get_running_loop().call_exception_handler(
+                {
+                    "message": "Unhandled exception while compressing a rotated log file",
+                    "exception": exc,
+                    "handler": self,
+                    "file_path": file_path,
+                }
+            )
+
+    async def _wait_compressions(self) -> None:
+        if self._compression_tasks:
+            await asyncio.wait(list(self._compression_tasks))
+
+    def _backup_sort_key(self, backup: Backup) -> Tuple:
+        """
+        Orders backups by age: by mtime, then by name, where a `.N` suffix
+        marks a file rotated after the one with the same name without it.
+        """
+        match = _BACKUP_NUMBER.search(backup.path)
+        if match is None:
+            return backup.mtime, backup.path, 0
+        return backup.mtime, backup.path[: match.start()], int(match.group(1))
+
+    def _get_janitor(self) -> BackupJanitor:
+        if self._janitor is None:
+            self._janitor = BackupJanitor(
+                self._delete_files,
+                max_deletes_per_second=self.max_deletes_per_second,
+                key=self._backup_sort_key,
+            )
+        # Subclasses set `backup_count` after initializing the base class
+        self._janitor.backup_count = self.backup_count
+        self._janitor.max_total_bytes = self.max_total_bytes
+        self._janitor.max_age = self.max_age
+        return self._janitor
+
+    def _scan_backups(self) -> List[Backup]:
+        dir_name, base_name = os.path.split(self.absolute_file_path)
+        prefix = base_name + "."
+        plen = len(prefix)
+        backups = []
+        for file_name in os.listdir(dir_name):
+            if file_name[:plen] == prefix:
+                suffix = file_name[plen:]
+                if self.ext_match.match(suffix):  # type: ignore
+                    file_path = os.path.join(dir_name, file_name)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    backups.append(
+                        Backup(file_path, stat.st_size, stat.st_mtime)
+                    )
+        return backups
+
+    async def _load_backups(self) -> BackupJanitor:
+        """
+        Loads the backup index, with a single scan of the log directory.
+        """
+        janitor = self._get_janitor()
+        if not janitor.loaded:
+            janitor.loaded = True
+            backups = await get_running_loop().run_in_executor(
+                None, self._scan_backups
+            )
+            for backup in backups:
+                janitor.index.add(backup)
+        return janitor
+
+    def _has_retention_budget(self) -> bool:
+        return self.ext_match is not None and (
+            self.backup_count > 0
+            or self.max_total_bytes > 0
+            or self.max_age > 0
+        )
+
+    async def _retain_backup(self, file_path: str) -> None:
+        if not self._has_retention_budget():
+            return
+        janitor = self._get_janitor()
+        if janitor.loaded:
+            stat = await get_running_loop().run_in_executor(
+                None, os.stat, file_path
+            )
+            janitor.index.add(Backup(file_path, stat.st_size, stat.st_mtime))
+        else:
+            # The scan finds the new backup too
+            await self._load_backups()
+        janitor.schedule()
+
+    async def close(self):
+        rollover_task = self._rollover_task
+        if rollover_task is not None and rollover_task is not current_task():
+            await rollover_task
+        await self._wait_compressions()
+        if self._janitor is not None:
+            await self._janitor.close()
+        await super().close()
+
     async def emit(self, record: LogRecord):  # type: ignore
         """
         Emit a record.
@@ -118,16 +891,42 @@ class BaseAsyncRotatingFileHandler(AsyncFileHandler, metaclass=abc.ABCMeta):
         """
         try:
             if self.should_rollover(record):
-                if not self._rollover_lock:
-                    self._rollover_lock = asyncio.Lock()
-
-                async with self._rollover_lock:
+                async with self._get_rollover_lock():
                     if self.should_rollover(record):
                         await self.do_rollover()
             await super().emit(record)
         except Exception as exc:
             await self.handle_error(record, exc)
 
+    async def _rotate_and_reopen(self, destination: str) -> None:
+        """
+        Rotates the current file to `destination` and replaces the stream
+        with one for a new file.
+
+        With the default rotator, the new file is opened before the old
+        stream is retired, so concurrent writes never wait for the rotation:
+        they use the old stream, and the rotated file, until the new one is
+        swapped in.
+        """
+        if self._buffer:
+            await self._write_buffer()
+        if self.rotator is None:
+            async with self._get_initialization_lock():
+                await self.rotate(self.absolute_file_path, destination)
+                old_stream, self.stream = self.stream, await self._open_stream()
+        else:
+            # Custom rotators may read the file, so it must be closed before
+            # they run. Meanwhile, writes wait for the new stream.
+            async with self._get_initialization_lock():
+                old_stream, self.stream = self.stream, None
+                if old_stream is not None:
+                    await self._retire_stream(old_stream)
+                    old_stream = None
+                await self.rotate(self.absolute_file_path, destination)
+                self.stream = await self._open_stream()
+        if old_stream is not None:
+            await self._retire_stream(old_stream)
+
     def rotation_filename(self, default_name: str) -> str:
         """
         Modify the filename of a log file when rotating.
@@ -141,6 +940,50 @@ class BaseAsyncRotatingFileHandler(AsyncFileHandler, metaclass=abc.ABCMeta):
 
         return self.namer(default_name)
 
+    async def _get_free_filename(self, name: str) -> str:
+        """
+        The rotation filename for `name` or, if that file already exists,
+        for the first `name.N` that doesn't. A compressed backup takes its
+        name too, so compressing the new file never replaces it.
+        """
+        suffix = self.compressor.suffix if self.compressor else ""
+
+        def exists(file_path: str) -> bool:
+            return os.path.exists(file_path) or (
+                suffix != "" and os.path.exists(file_path + suffix)
+            )
+
+        def find() -> str:
+            file_path = self.rotation_filename(name)
+            n = 1
+            while exists(file_path):
+                file_path = self.rotation_filename(f"{name}.{n}")
+                n += 1
+            return file_path
+
+        return await get_running_loop().run_in_executor(None, find)
+
+    async def get_files_to_delete(self) -> List[str]:
+        """
+        Determine the backups over the budgets, oldest first, from the backup
+        index. The index is loaded from the log directory the first time,
+        and kept up to date by rollovers after that.
+        """
+        if not self._has_retention_budget():
+            return []
+        janitor = await self._load_backups()
+        return [backup.path for backup in janitor.expired()]
+
+    async def _delete_files(self, file_paths: List[str]):
+        def delete():
+            for file_path in file_paths:
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+
+        await get_running_loop().run_in_executor(None, delete)
+
     async def rotate(self, source: str, dest: str):
         """
         When rotating, rotate the current log.
@@ -166,6 +1009,179 @@ class BaseAsyncRotatingFileHandler(AsyncFileHandler, metaclass=abc.ABCMeta):
             self.rotator(source, dest)
 
 
+class RotationNaming(str, enum.Enum):
+    """
+    How `AsyncRotatingFileHandler` names rotated files.
+
+    | naming      | rotated files                                           |
+    |-------------|---------------------------------------------------------|
+    | NUMBERED    | app.log.1 (the newest) to app.log.${backup_count}       |
+    | TIMESTAMPED | app.log.2020-01-01_10-00-00, named for the rotation time |
+    """
+
+    NUMBERED = "NUMBERED"
+    TIMESTAMPED = "TIMESTAMPED"
+
+
+class AsyncRotatingFileHandler(BaseAsyncRotatingFileHandler):
+    """
+    Handler for logging to a file, rotating the log file when it reaches
+    `max_bytes`.
+
+    The file size is tracked in memory, so records don't stat the file.
+    Records that find the file at `max_bytes` start a rollover in the
+    background and are written to the current file until the new one is
+    open, so the file may end up slightly larger than `max_bytes`.
+
+    With NUMBERED naming, like the standard library's `RotatingFileHandler`,
+    rollovers only happen if `backup_count` is > 0, and existing backups are
+    shifted so that no more than `backup_count` are kept. With TIMESTAMPED
+    naming, if `backup_count` is > 0, the oldest backups are deleted. Names
+    are passed through `namer`, and files rotated within the same second get
+    a `.N` suffix. With both namings, the oldest backups over `max_total_bytes`
+    or `max_age` are deleted too.
+
+    For rollovers by both time and size, see the `max_bytes` parameter of
+    `AsyncTimedRotatingFileHandler`.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        mode: str = "a",
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        encoding: str = None,
+        naming: RotationNaming = RotationNaming.NUMBERED,
+        utc: bool = False,
+        namer: Namer = None,
+        rotator: Rotator = None,
+        formatter: Formatter = None,
+        **kwargs,
+    ) -> None:
+        if max_bytes > 0:
+            # A truncated file would lose the records of the previous run
+            mode = "a"
+        super().__init__(
+            filename=filename,
+            mode=mode,
+            encoding=encoding,
+            namer=namer,
+            rotator=rotator,
+            formatter=formatter,
+            max_bytes=max_bytes,
+            **kwargs,
+        )
+        self.backup_count = backup_count
+        self.naming = RotationNaming(naming)
+        self.utc = utc
+        self.suffix = "%Y-%m-%d_%H-%M-%S"
+        if self.naming == RotationNaming.TIMESTAMPED:
+            self.ext_match = re.compile(
+                r"^\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}(\.\w+)?(\.(gz|bz2|xz))?$",
+                re.ASCII,
+            )
+        else:
+            self.ext_match = re.compile(r"^\d+(\.(gz|bz2|xz))?$", re.ASCII)
+
+    def _has_retention_budget(self) -> bool:
+        if self.naming == RotationNaming.NUMBERED:
+            # Shifting already keeps at most backup_count backups
+            return self.max_total_bytes > 0 or self.max_age > 0
+        return super()._has_retention_budget()
+
+    def _backup_sort_key(self, backup: Backup) -> Tuple:
+        if self.naming == RotationNaming.TIMESTAMPED:
+            return super()._backup_sort_key(backup)
+        # Higher numbers are older
+        match = _BACKUP_NUMBER.search(backup.path)
+        return backup.mtime, -int(match.group(1)) if match else 0
+
+    def should_rollover(self, record: LogRecord) -> bool:
+        """
+        Determine if rollover should occur, i.e. if the file reached
+        `max_bytes`.
+
+        record is not used, since the size of the records already written is
+        tracked, but it is needed so the method signatures are the same
+        """
+        if self.naming == RotationNaming.NUMBERED and self.backup_count <= 0:
+            return False
+        return self._should_rollover_by_size()
+
+    async def emit(self, record: LogRecord):  # type: ignore
+        try:
+            if self._rollover_task is None and self.should_rollover(record):
+                self._start_rollover(self._rollover_by_size)
+            await AsyncFileHandler.emit(self, record)
+        except Exception as exc:
+            await self.handle_error(record, exc)
+
+    async def _rollover_by_size(self) -> None:
+        if self.should_rollover(None):  # type: ignore
+            await self.do_rollover()
+
+    def _shift_backups(self) -> str:
+        """
+        Renames app.log.N to app.log.N+1, dropping the oldest backup, and
+        returns the now free name for the newest one. Compressed backups are
+        shifted along with their suffix.
+        """
+        base_name = self.absolute_file_path
+        suffixes = [""]
+        if self.compressor is not None:
+            suffixes.append(self.compressor.suffix)
+        for i in range(self.backup_count - 1, 0, -1):
+            for suffix in suffixes:
+                source = self.rotation_filename(f"{base_name}.{i}") + suffix
+                dest = self.rotation_filename(f"{base_name}.{i + 1}") + suffix
+                if os.path.exists(source):
+                    if os.path.exists(dest):
+                        os.remove(dest)
+                    os.rename(source, dest)
+        dest = self.rotation_filename(f"{base_name}.1")
+        if os.path.exists(dest):
+            os.remove(dest)
+        return dest
+
+    async def do_rollover(self):
+        """
+        Rotates the file to the newest backup name, as described by
+        `RotationNaming`, and opens a new one.
+
+        The new file is opened before the old one is closed, and old files are
+        only deleted after that, so records logged meanwhile don't wait.
+        """
+        await self._coordinate_rollover(self._rotate, self._is_over_max_bytes)
+
+    async def _rotate(self) -> None:
+        if self.naming == RotationNaming.NUMBERED:
+            # Backups can't be shifted while they're being compressed or
+            # deleted, and their indexed names are stale once shifted
+            await self._wait_compressions()
+            if self._janitor is not None:
+                await self._janitor.join()
+                self._janitor.forget()
+            destination_file_path = await get_running_loop().run_in_executor(
+                None, self._shift_backups
+            )
+            await self._rotate_and_reopen(destination_file_path)
+            await self._handle_rotated_file(destination_file_path)
+            return
+
+        if self.utc:
+            time_tuple = time.gmtime()
+        else:
+            time_tuple = time.localtime()
+        destination_file_path = await self._get_free_filename(
+            self.absolute_file_path
+            + "."
+            + time.strftime(self.suffix, time_tuple)
+        )
+        await self._rotate_and_reopen(destination_file_path)
+        await self._handle_rotated_file(destination_file_path)
+
+
 class RolloverInterval(str, enum.Enum):
     SECONDS = "S"
     MINUTES = "M"
@@ -233,9 +1249,21 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
         utc: bool = False,
         at_time: datetime.time = None,
         formatter: Formatter = None,
+        max_bytes: int = 0,
+        **kwargs,
     ) -> None:
+        """
+        :param max_bytes: If > 0, the file is also rotated when it reaches
+        this size, before the end of the interval. Files rotated within the
+        same interval get a `.N` suffix after the interval's.
+        """
         super().__init__(
-            filename=filename, mode="a", encoding=encoding, formatter=formatter
+            filename=filename,
+            mode="a",
+            encoding=encoding,
+            formatter=formatter,
+            max_bytes=max_bytes,
+            **kwargs,
         )
         self.when = when.upper()
         self.backup_count = backup_count
@@ -256,22 +1284,26 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
         if self.when == RolloverInterval.SECONDS:
             self.interval = 1  # one second
             self.suffix = "%Y-%m-%d_%H-%M-%S"
-            ext_match = r"^\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}(\.\w+)?$"
+            ext_match = (
+                r"^\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}(\.\w+)?(\.(gz|bz2|xz))?$"
+            )
         elif self.when == RolloverInterval.MINUTES:
             self.interval = ONE_MINUTE_IN_SECONDS  # one minute
             self.suffix = "%Y-%m-%d_%H-%M"
-            ext_match = r"^\d{4}-\d{2}-\d{2}_\d{2}-\d{2}(\.\w+)?$"
+            ext_match = (
+                r"^\d{4}-\d{2}-\d{2}_\d{2}-\d{2}(\.\w+)?(\.(gz|bz2|xz))?$"
+            )
         elif self.when == RolloverInterval.HOURS:
             self.interval = ONE_HOUR_IN_SECONDS  # one hour
             self.suffix = "%Y-%m-%d_%H"
-            ext_match = r"^\d{4}-\d{2}-\d{2}_\d{2}(\.\w+)?$"
+            ext_match = r"^\d{4}-\d{2}-\d{2}_\d{2}(\.\w+)?(\.(gz|bz2|xz))?$"
         elif (
             self.when == RolloverInterval.DAYS
             or self.when == RolloverInterval.MIDNIGHT
         ):
             self.interval = ONE_DAY_IN_SECONDS  # one day
             self.suffix = "%Y-%m-%d"
-            ext_match = r"^\d{4}-\d{2}-\d{2}(\.\w+)?$"
+            ext_match = r"^\d{4}-\d{2}-\d{2}(\.\w+)?(\.(gz|bz2|xz))?$"
         elif self.when.startswith("W"):
             if self.when not in RolloverInterval.WEEK_DAYS:
                 raise ValueError(
@@ -280,7 +1312,7 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
             self.interval = ONE_DAY_IN_SECONDS * 7  # one week
             self.day_of_week = int(self.when[1])
             self.suffix = "%Y-%m-%d"
-            ext_match = r"^\d{4}-\d{2}-\d{2}(\.\w+)?$"
+            ext_match = r"^\d{4}-\d{2}-\d{2}(\.\w+)?(\.(gz|bz2|xz))?$"
         else:
             raise ValueError(f"Invalid RolloverInterval specified: {self.when}")
 
@@ -294,6 +1326,11 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
         else:
             t = int(time.time())
         self.rollover_at = self.compute_rollover(t)
+        self._rollover_scheduled = False
+        self._rollover_timer: Optional[TimerHandle] = None
+        # Whether the current file was written since it was opened. Unknown
+        # for a file that already exists, so it's rotated when due.
+        self._written_since_rollover = True
 
     def compute_rollover(self, current_time: int) -> int:
         """
@@ -390,49 +1427,107 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
             return True
         return False
 
-    async def get_files_to_delete(self) -> List[str]:
+    async def emit(self, record: LogRecord):  # type: ignore
         """
-        Determine the files to delete when rolling over.
+        Emit a record.
+
+        Rollovers are done by a loop timer, at `rollover_at`, instead of
+        being checked for each record. The first record only checks whether
+        the file is already due, e.g. if it's older than the interval. The
+        timer isn't armed again after an interval without records, so idle
+        handlers don't rotate empty files; the next record arms it.
+
+        With `max_bytes`, records that find the file at that size start a
+        rollover in the background and are written to the current file.
         """
-        dir_name, base_name = os.path.split(self.absolute_file_path)
-        loop = get_running_loop()
-        file_names = await loop.run_in_executor(
-            None, lambda: os.listdir(dir_name)
+        try:
+            if not self._rollover_scheduled:
+                self._rollover_scheduled = True
+                async with self._get_rollover_lock():
+                    await self._rollover_if_due()
+            if self._rollover_task is None and self._should_rollover_by_size():
+                self._start_rollover(self._rollover_by_size)
+            await AsyncFileHandler.emit(self, record)
+        except Exception as exc:
+            await self.handle_error(record, exc)
+
+    def _schedule_rollover(self) -> None:
+        if self._rollover_timer is not None:
+            self._rollover_timer.cancel()
+        delay = max(self.rollover_at - time.time(), 0)
+        self._rollover_timer = get_running_loop().call_later(
+            delay, self._on_rollover_timer
         )
-        result = []
-        prefix = base_name + "."
-        plen = len(prefix)
-        for file_name in file_names:
-            if file_name[:plen] == prefix:
-                suffix = file_name[plen:]
-                if self.ext_match.match(suffix):
-                    result.append(os.path.join(dir_name, file_name))
-        if len(result) < self.backup_count:
-            return []
+
+    def _on_rollover_timer(self) -> None:
+        self._rollover_timer = None
+        self._start_rollover(self._timed_rollover)
+
+    async def _rollover_if_due(self) -> None:
+        """
+        Rotates the file if the interval is over and the file was written
+        during it. An unwritten file is kept for the next interval.
+        """
+        if not self.should_rollover(None):  # type: ignore
+            self._schedule_rollover()
+        elif self._written_since_rollover:
+            await self.do_rollover()
         else:
-            result.sort()  # os.listdir order is not defined
-            return result[: len(result) - self.backup_count]
+            self.rollover_at = self._get_next_rollover_at(int(time.time()))
+            self._schedule_rollover()
 
-    async def _delete_files(self, file_paths: List[str]):
-        loop = get_running_loop()
-        for file_path in file_paths:
-            await loop.run_in_executor(  # type: ignore
-                None, lambda: os.unlink(file_path)
+    async def _timed_rollover(self) -> None:
+        try:
+            idle = not self._written_since_rollover
+            if idle and self.should_rollover(None):  # type: ignore
+                # Idle: the next record checks the rollover and arms the timer
+                self._rollover_scheduled = False
+            else:
+                # Timers use a monotonic clock, so they may fire a bit early
+                await self._rollover_if_due()
+        except Exception:
+            self.rollover_at = self.compute_rollover(int(time.time()))
+            self._schedule_rollover()
+            raise
+
+    async def _open_stream(self) -> _Stream:
+        stream = await super()._open_stream()
+        self._written_since_rollover = False
+        return stream
+
+    async def _write(self, data: str, sync: bool = False) -> None:
+        self._written_since_rollover = True
+        await super()._write(data, sync)
+
+    async def _rollover_by_size(self) -> None:
+        """
+        Rotates the file before the end of the interval, when it reaches
+        `max_bytes`. The rotated file is also named after the start of the
+        interval, with a `.N` suffix, and `rollover_at` doesn't change.
+        """
+        if self._should_rollover_by_size():
+            await self._coordinate_rollover(
+                self._rotate_by_size, self._is_over_max_bytes
             )
 
-    async def do_rollover(self):
+    async def _rotate_by_size(self) -> None:
+        destination_file_path = await self._get_free_filename(
+            self._get_interval_file_path(int(time.time()))
+        )
+        await self._rotate_and_reopen(destination_file_path)
+        await self._handle_rotated_file(destination_file_path)
+
+    async def close(self):
+        self._rollover_scheduled = False
+        if self._rollover_timer is not None:
+            self._rollover_timer.cancel()
+            self._rollover_timer = None
+        await super().close()
+
+    def _get_interval_file_path(self, current_time: int) -> str:
         """
-        do a rollover; in this case, a date/time stamp is appended to the filename
-        when the rollover happens.  However, you want the file to be named for the
-        start of the interval, not the current time.  If there is a backup count,
-        then we have to get a list of matching filenames, sort them and remove
-        the one with the oldest suffix.
+        The file path for the current interval, named after its start.
         """
-        if self.stream:
-            await self.stream.close()
-            self.stream = None
-        # get the time that this sequence started at and make it a TimeTuple
-        current_time = int(time.time())
         dst_now = time.localtime(current_time)[-1]
         t = self.rollover_at - self.interval
         if self.utc:
@@ -446,25 +1541,40 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
                 else:
                     addend = -ONE_HOUR_IN_SECONDS
                 time_tuple = time.localtime(t + addend)
-        destination_file_path = self.rotation_filename(
+        return (
             self.absolute_file_path
             + "."
             + time.strftime(self.suffix, time_tuple)
         )
-        loop = get_running_loop()
-        if await loop.run_in_executor(
-            None, lambda: os.path.exists(destination_file_path)
-        ):
-            await loop.run_in_executor(
-                None, lambda: os.unlink(destination_file_path)
-            )
-        await self.rotate(self.absolute_file_path, destination_file_path)
-        if self.backup_count > 0:
-            files_to_delete = await self.get_files_to_delete()
-            if files_to_delete:
-                await self._delete_files(files_to_delete)
 
-        await self._init_writer()
+    async def do_rollover(self):
+        """
+        do a rollover; in this case, a date/time stamp is appended to the filename
+        when the rollover happens.  However, you want the file to be named for the
+        start of the interval, not the current time.  If there is a backup count,
+        then we have to get a list of matching filenames, sort them and remove
+        the one with the oldest suffix.
+
+        The new file is opened before the old one is closed, and old files are
+        only deleted after that, so records logged meanwhile don't wait.
+
+        In process safe mode, if another process already rotated the file
+        during the interval, the file is only reopened.
+        """
+        rotated = await self._coordinate_rollover(
+            self._rotate_by_time, self._is_interval_not_rotated
+        )
+        if not rotated:
+            self.rollover_at = self._get_next_rollover_at(int(time.time()))
+            if self._rollover_scheduled:
+                self._schedule_rollover()
+
+    def _is_interval_not_rotated(self, lock_fd: int) -> bool:
+        last_rollover = self._read_last_rollover(lock_fd)
+        return last_rollover < self.rollover_at - self.interval
+
+    def _get_next_rollover_at(self, current_time: int) -> int:
+        dst_now = time.localtime(current_time)[-1]
         new_rollover_at = self.compute_rollover(current_time)
         while new_rollover_at <= current_time:
             new_rollover_at = new_rollover_at + self.interval
@@ -482,4 +1592,21 @@ class AsyncTimedRotatingFileHandler(BaseAsyncRotatingFileHandler):
                     # DST bows out before next rollover, so we need to add an hour
                     addend = ONE_HOUR_IN_SECONDS
                 new_rollover_at += addend
+        return new_rollover_at
+
+    async def _rotate_by_time(self) -> None:
+        # get the time that this sequence started at and make it a TimeTuple
+        current_time = int(time.time())
+        file_path = self._get_interval_file_path(current_time)
+        # Size rollovers during the interval, or a backup compressed under
+        # the name, may have taken it
+        destination_file_path = await self._get_free_filename(file_path)
+
+        new_rollover_at = self._get_next_rollover_at(current_time)
+
+        await self._rotate_and_reopen(destination_file_path)
         self.rollover_at = new_rollover_at
+        if self._rollover_scheduled:
+            self._schedule_rollover()
+
+        await self._handle_rotated_file(destination_file_path)
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import struct
+from asyncio import StreamWriter, TimerHandle
+from typing import Callable, List, Optional, Union
+
+from aiologger.formatters.base import Formatter
+from aiologger.formatters.json import JsonFormatter
+from aiologger.handlers.base import Handler
+from aiologger.levels import LogLevel
+from aiologger.records import ExtendedLogRecord, LogRecord
+from aiologger.utils import get_running_loop
+
+# Each encoded record is prefixed by its size, as a 4 bytes big-endian int
+FRAME_HEADER = struct.Struct(">I")
+
+_exception_formatter = Formatter()
+_json_default = JsonFormatter()._default_handler
+
+
+def encode_record(
+    record: LogRecord, serializer: Callable[..., Union[str, bytes]] = json.dumps
+) -> bytes:
+    """
+    Encodes a record as a size-prefixed frame, to be decoded by
+    `decode_records`. Messages are merged with their arguments and exception
+    information is sent as text, since neither can be serialized reliably.
+    """
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _exception_formatter.format_exception(record.exc_info)
+    data = {
+        "n": record.name,
+        "l": record.levelno,
+        "p": record.pathname,
+        "ln": record.lineno,
+        "f": record.funcName,
+        "c": record.created,
+        "pr": record.process,
+        "x": record.exc_text,
+        "s": record.stack_info,
+    }
+    if isinstance(record, ExtendedLogRecord):
+        data["m"] = record.msg
+        data["e"] = record.get_extra()
+        data["fl"] = record.flatten
+        data["sk"] = record.serializer_kwargs
+    else:
+        data["m"] = record.get_message()
+
+    payload = serializer(data, default=_json_default)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_record(
+    payload: bytes, deserializer: Callable[[bytes], dict] = json.loads
+) -> LogRecord:
+    """
+    Decodes the payload of a frame made by `encode_record`.
+    """
+    data = deserializer(payload)
+    kwargs = dict(
+        name=data["n"],
+        level=data["l"],
+        pathname=data["p"],
+        lineno=data["ln"],
+        msg=data["m"],
+        args=None,
+        exc_info=None,
+        func=data["f"],
+        sinfo=data["s"],
+    )
+    record: LogRecord
+    if "e" in data:
+        record = ExtendedLogRecord(
+            extra=data["e"],
+            flatten=data["fl"],
+            serializer_kwargs=data["sk"],
+            **kwargs,
+        )
+    else:
+        record = LogRecord(**kwargs)
+    created = data["c"]
+    record.created = created
+    record.msecs = (created - int(created)) * 1000
+    record.process = data["pr"]
+    record.exc_text = data["x"]
+    return record
+
+
+def decode_records(
+    buffer: bytearray, deserializer: Callable[[bytes], dict] = json.loads
+) -> List[LogRecord]:
+    """
+    Decodes every complete frame in `buffer`, removing them from it. Trailing
+    incomplete frames are kept in the buffer.
+    """
+    records = []
+    offset = 0
+    with memoryview(buffer) as view:
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            (size,) = FRAME_HEADER.unpack_from(view, offset)
+            start = offset + FRAME_HEADER.size
+            end = start + size
+            if end > len(buffer):
+                break
+            records.append(decode_record(bytes(view[start:end]), deserializer))
+            offset = end
+    del buffer[:offset]
+    return records
+
+
+class AsyncUnixSocketHandler(Handler):
+    """
+    A handler that sends records to a `LogCollector` listening on a Unix
+    socket, so that many processes can share the collector handlers.
+
+    Encoded records are buffered and written in batches: the buffer is
+    written when it reaches `max_batch_size` bytes or, at most,
+    `flush_interval` seconds after its first record.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        level: Union[str, int, LogLevel] = LogLevel.NOTSET,
+        max_batch_size: int = 64 * 1024,
+        flush_interval: float = 0.01,
+        serializer: Callable[..., Union[str, bytes]] = json.dumps,
+    ) -> None:
+        super().__init__()
+        self.level = level
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.serializer = serializer
+        self.writer: Optional[StreamWriter] = None
+        self._buffer = bytearray()
+        self._flush_handle: Optional[TimerHandle] = None
+        self._initialization_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def initialized(self):
+        return self.writer is not None
+
+    async def _init_writer(self) -> StreamWriter:
+        if not self._initialization_lock:
+            self._initialization_lock = asyncio.Lock()
+
+        async with self._initialization_lock:
+            if self.writer is None:
+                _, self.writer = await asyncio.open_unix_connection(self.path)
+            return self.writer
+
+    def _write_buffer(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._buffer and self.writer is not None:
+            self.writer.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    async def emit(self, record: LogRecord) -> None:
+        try:
+            if self.writer is None:
+                await self._init_writer()
+
+            self._buffer += encode_record(record, self.serializer)
+            if len(self._buffer) >= self.max_batch_size:
+                self._write_buffer()
+                await self.writer.drain()  # type: ignore
+            elif self._flush_handle is None:
+                self._flush_handle = get_running_loop().call_later(
+                    self.flush_interval, self._write_buffer
+                )
+        except Exception as exc:
+            await self._reset_connection()
+            await self.handle_error(record, exc)
+
+    async def _reset_connection(self) -> None:
+        """
+        Drops the connection, and the records buffered for it, so the next
+        record reconnects to the collector.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._buffer.clear()
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+
+    async def flush(self) -> None:
+        if self.writer is None:
+            return
+        self._write_buffer()
+        await self.writer.drain()
+
+    async def close(self) -> None:
+        if self.writer is None:
+            return
+        await self.flush()
+        writer, self.writer = self.writer, None
+        writer.close()
+        await writer.wait_closed()
@@ -1,15 +1,16 @@
 import asyncio
 import sys
-from asyncio import AbstractEventLoop, StreamWriter
+from asyncio import AbstractEventLoop, StreamWriter, Task
 from typing import Union, Optional
 
-from aiologger.utils import get_running_loop
+from aiologger.utils import create_task, current_task, get_running_loop
 from aiologger.filters import Filter
 from aiologger.formatters.base import Formatter
 from aiologger.handlers.base import Handler
 from aiologger.levels import LogLevel
 from aiologger.protocols import AiologgerProtocol
 from aiologger.records import LogRecord
+from aiologger.writers import DEFAULT_HIGH_WATER_MARK, FdStream, WriterThread
 
 
 class AsyncStreamHandler(Handler):
@@ -21,7 +22,35 @@ class AsyncStreamHandler(Handler):
         level: Union[str, int, LogLevel] = LogLevel.NOTSET,
         formatter: Formatter = None,
         filter: Filter = None,
+        batch: bool = False,
+        max_batch_size: int = 64 * 1024,
+        max_batch_records: int = 1000,
+        max_batch_latency: float = 0,
+        high_water_mark: Optional[int] = None,
+        low_water_mark: Optional[int] = None,
+        writer_thread: Optional[WriterThread] = None,
     ) -> None:
+        """
+        :param batch: If True, formatted records are gathered in a buffer
+        which is written, and drained, once per batch instead of once per
+        record. By default, a batch has the records emitted during a single
+        event loop iteration.
+        :param max_batch_size: Size, in bytes, at which a batch is written
+        right away, by the emit call that filled it.
+        :param max_batch_records: Number of records at which a batch is
+        written right away.
+        :param max_batch_latency: Seconds to wait for more records after the
+        first record of a batch, before writing it.
+        :param high_water_mark: Size, in bytes, of the transport buffer above
+        which writes wait for it to be drained down to `low_water_mark`. If
+        not given, the transport defaults are used (64 KiB and a quarter of
+        the high-water mark, for asyncio's transports).
+        :param writer_thread: If given, the stream file descriptor is written
+        by this thread, with blocking writes, instead of a pipe transport on
+        the event loop. The stream isn't closed along with the handler.
+        Writes then wait for the thread while more than `high_water_mark`
+        bytes are pending on it.
+        """
         super().__init__()
         if stream is None:
             stream = sys.stderr
@@ -34,21 +63,61 @@ class AsyncStreamHandler(Handler):
             self.add_filter(filter)
         self.protocol_class = AiologgerProtocol
         self._initialization_lock = asyncio.Lock()
-        self.writer: Optional[StreamWriter] = None
+        self.writer: Optional[Union[StreamWriter, FdStream]] = None
+        self._protocol: Optional[AiologgerProtocol] = None
+        self.writer_thread = writer_thread
+        self.batch = batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_records = max_batch_records
+        self.max_batch_latency = max_batch_latency
+        self.high_water_mark = high_water_mark
+        self.low_water_mark = low_water_mark
+        self._batch = bytearray()
+        self._batch_records = 0
+        self._batch_last_record: Optional[LogRecord] = None
+        self._batch_writer: Optional[Task] = None
 
     @property
     def initialized(self):
         return self.writer is not None
 
-    async def _init_writer(self) -> StreamWriter:
+    @property
+    def buffered_bytes(self) -> int:
+        """
+        Number of bytes written but still waiting in the transport buffer,
+        i.e. not yet accepted by the stream.
+        """
+        if self.writer is None:
+            return 0
+        if isinstance(self.writer, FdStream):
+            return self.writer.pending_bytes
+        return self.writer.transport.get_write_buffer_size()
+
+    async def _init_writer(self) -> Union[StreamWriter, FdStream]:
         async with self._initialization_lock:
             if self.writer is not None:
                 return self.writer
+            if self.writer_thread is not None:
+                high_water_mark = self.high_water_mark
+                if high_water_mark is None:
+                    high_water_mark = DEFAULT_HIGH_WATER_MARK
+                self.writer = self.writer_thread.attach(
+                    self.stream.fileno(), high_water_mark=high_water_mark
+                )
+                return self.writer
 
             loop = get_running_loop()
             transport, protocol = await loop.connect_write_pipe(
                 self.protocol_class, self.stream
             )
+            if (
+                self.high_water_mark is not None
+                or self.low_water_mark is not None
+            ):
+                transport.set_write_buffer_limits(
+                    high=self.high_water_mark, low=self.low_water_mark
+                )
+            self._protocol = protocol
 
             self.writer = StreamWriter(  # type: ignore # https://github.com/python/typeshed/pull/2719
                 transport=transport, protocol=protocol, reader=None, loop=loop
@@ -66,7 +135,13 @@ class AsyncStreamHandler(Handler):
         return rv
 
     async def flush(self):
-        await self.writer.drain()
+        if self._batch_records:
+            await self._write_batch()
+        else:
+            await self.writer.drain()
+        if isinstance(self.writer, FdStream):
+            # drain only waits for the writer thread while it's behind
+            await self.writer.flush()
 
     async def emit(self, record: LogRecord):
         """
@@ -78,11 +153,72 @@ class AsyncStreamHandler(Handler):
         try:
             msg = self.formatter.format(record) + self.terminator
 
-            self.writer.write(msg.encode())
-            await self.writer.drain()
+            if not self.batch:
+                self.writer.write(msg.encode())
+                await self.writer.drain()
+                return
+
+            self._batch += msg.encode()
+            self._batch_records += 1
+            self._batch_last_record = record
+            if (
+                len(self._batch) >= self.max_batch_size
+                or self._batch_records >= self.max_batch_records
+            ):
+                await self._write_batch()
+            else:
+                if self._batch_writer is None:
+                    self._batch_writer = create_task(self._write_batch_later())
+                if self._is_paused():
+                    # The stream is backed up, so emitters wait for it too,
+                    # instead of only growing the batch
+                    await self.writer.drain()
         except Exception as exc:
             await self.handle_error(record, exc)
 
+    def _is_paused(self) -> bool:
+        if isinstance(self.writer, FdStream):
+            return self.writer.paused
+        return self._protocol is not None and self._protocol.paused
+
+    async def _write_batch_later(self) -> None:
+        """
+        Writes batches until no records are left, so a handler has a single
+        batch writer, even while it waits for the stream to drain.
+        """
+        try:
+            while self._batch_records:
+                await asyncio.sleep(self.max_batch_latency)
+                record = self._batch_last_record
+                try:
+                    self._write_buffered_batch()
+                    await self.writer.drain()  # type: ignore
+                except Exception as exc:
+                    await self.handle_error(record, exc)  # type: ignore
+        finally:
+            if self._batch_writer is current_task():
+                self._batch_writer = None
+
+    def _write_buffered_batch(self) -> None:
+        if not self._batch_records:
+            return
+        # The written buffer is replaced, not cleared, since transports may
+        # keep a view of it, e.g. uvloop's
+        batch, self._batch = self._batch, bytearray()
+        self._batch_records = 0
+        self._batch_last_record = None
+        self.writer.write(batch)  # type: ignore
+
+    async def _write_batch(self) -> None:
+        """
+        Writes the buffered records with a single write and drain.
+        """
+        batch_writer, self._batch_writer = self._batch_writer, None
+        if batch_writer is not None and batch_writer is not current_task():
+            batch_writer.cancel()
+        self._write_buffered_batch()
+        await self.writer.drain()  # type: ignore
+
     async def close(self):
         """
         Tidy up any resources used by the handler.
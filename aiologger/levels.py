@@ -17,6 +17,20 @@ NAME_TO_LEVEL = {level: LogLevel[level].value for level in LogLevel.__members__}
 LEVEL_TO_NAME = {level.value: level.name for level in LogLevel}
 
 
+class EffectiveLevels:
+    """
+    Tracks changes which may affect the effective level of loggers, i.e. the
+    levels of loggers and handlers, and which handlers apply to each logger.
+    Loggers cache their effective level until the generation changes.
+    """
+
+    generation = 0
+
+    @classmethod
+    def invalidate(cls) -> None:
+        cls.generation += 1
+
+
 def get_level_name(level: Union[int, LogLevel]) -> str:
     """
     Return the textual representation of logging level 'level'.
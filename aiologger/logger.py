@@ -1,17 +1,46 @@
 import asyncio
+import functools
 import io
+import os
+import signal
 import sys
 import traceback
 from asyncio import AbstractEventLoop, Task
-from typing import Iterable, Optional, Callable, Awaitable, List, NamedTuple
-
+from collections import Counter
+from types import CodeType
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aiologger.dispatchers import (
+    DEFAULT_DROPPED_REPORT_INTERVAL,
+    DEFAULT_MAX_QUEUE_SIZE,
+    OverflowPolicy,
+    QueuedDispatcher,
+    ThreadSafeBuffer,
+)
 from aiologger.filters import StdoutFilter, Filterer
 from aiologger.formatters.base import Formatter
 from aiologger.handlers.base import Handler
 from aiologger.handlers.streams import AsyncStreamHandler
-from aiologger.levels import LogLevel, check_level
+from aiologger.levels import EffectiveLevels, LogLevel, check_level
 from aiologger.records import LogRecord
-from aiologger.utils import get_current_frame, create_task
+from aiologger.utils import (
+    CompletedAwaitable,
+    create_task,
+    current_task,
+    get_current_frame,
+    get_running_loop,
+)
 
 _HandlerFactory = Callable[[], Awaitable[Iterable[Handler]]]
 
@@ -23,6 +52,16 @@ class _Caller(NamedTuple):
     stack: Optional[str]
 
 
+class ShutdownReport(NamedTuple):
+    """
+    Records that were in flight when a logger was shut down: the ones handled
+    before the deadline were delivered, the others were abandoned.
+    """
+
+    delivered: int
+    abandoned: int
+
+
 def o_o():
     """
     Ordinarily we would use __file__ for this, but frozen modules don't always
@@ -42,19 +81,213 @@ def o_o():
 # source file.
 _srcfile = o_o.__code__.co_filename
 
+_COMPLETED = CompletedAwaitable()
+
+_UNKNOWN_CALLER = _Caller(
+    filename="(unknown file)",
+    line_number=0,
+    function_name="(unknown function)",
+    stack=None,
+)
+
+# Resolved callers by call site, i.e. the code object and the instruction
+# offset of the logging call
+_CALLERS_CACHE_MAX_SIZE = 10000
+_callers_cache: Dict[Tuple[CodeType, int], _Caller] = {}
+
+# Queues of isolated handlers, shared by every logger passing records to the
+# same handler, e.g. a parent and its children, with the number of loggers
+# using each one. Records keep their order across loggers and a handler is
+# never called concurrently.
+_handler_dispatchers: Dict[Handler, QueuedDispatcher] = {}
+_handler_dispatcher_users: Counter = Counter()
+
 
 class Logger(Filterer):
-    def __init__(self, *, name="aiologger", level=LogLevel.NOTSET) -> None:
+    def __init__(
+        self,
+        *,
+        name="aiologger",
+        level=LogLevel.NOTSET,
+        queued: bool = False,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        overflow_drop_level=LogLevel.WARNING,
+        dropped_report_interval: float = DEFAULT_DROPPED_REPORT_INTERVAL,
+        isolate_handlers: bool = False,
+        handler_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        capture_caller: bool = True,
+    ) -> None:
+        """
+        :param queued: If True, log calls only put records into a bounded
+        queue which is consumed, in order, by a single task per logger.
+        Otherwise, a new task is created to handle each record.
+        :param max_queue_size: Maximum number of records waiting in the queue
+        when `queued` is True, and logged from other threads before the logger
+        is used from an event loop.
+        :param overflow_policy: What happens to records logged while the queue
+        is full. By default, log calls return an awaitable that only completes
+        when there's room for its record, and should be awaited: at most
+        `max_queue_size` records wait for room, and the ones logged after that
+        are dropped. See `OverflowPolicy`.
+        :param overflow_drop_level: Records below this level are dropped if
+        the queue is full and `overflow_policy` is DROP_BELOW_LEVEL.
+        :param dropped_report_interval: Minimum interval, in seconds, between
+        the WARNING records reporting how many records were dropped.
+        :param isolate_handlers: If True, each handler gets its own bounded
+        queue, consumed by its own task, so a slow handler only delays its own
+        output. Passing a record to the handlers then only enqueues it. The
+        queue of a handler is shared by every logger that uses it.
+        :param handler_queue_size: Maximum number of records waiting in each
+        handler queue when `isolate_handlers` is True. Handler queues share
+        the logger's overflow settings.
+        :param capture_caller: If False, the stack isn't inspected to find the
+        caller of each log call, and records get unknown `pathname`, `lineno`
+        and `funcName`. Useful if formatters don't use those fields.
+        """
         super(Logger, self).__init__()
         self.name = name
-        self.level = check_level(level)
-        self.parent = None
-        self.propagate = True
-        self.handlers: List[Handler] = []
+        self._level = check_level(level)
+        self._parent: Optional[Logger] = None
+        self._propagate = True
+        self._handlers: List[Handler] = []
+        self._effective_level = self._level
+        self._handler_chain: Tuple[Handler, ...] = ()
+        self._cache_generation = -1
         self.disabled = False
+        self.capture_caller = capture_caller
         self._was_shutdown = False
+        self._dispatchers_closed = False
+        # Tasks handling records, with the number of records each one handles
+        self._in_flight: Dict[Task, int] = {}
+
+        self._overflow_options = dict(
+            overflow_policy=overflow_policy,
+            drop_level=overflow_drop_level,
+            report_interval=dropped_report_interval,
+        )
+        self._dispatcher: Optional[QueuedDispatcher] = None
+        if queued:
+            self._dispatcher = QueuedDispatcher(
+                self.handle,
+                max_size=max_queue_size,
+                on_dropped=self._log_dropped_records,
+                **self._overflow_options,  # type: ignore
+            )
+        self.isolate_handlers = isolate_handlers
+        self.handler_queue_size = handler_queue_size
+        self._handler_dispatchers: Dict[Handler, QueuedDispatcher] = {}
+        self._thread_safe_buffer = ThreadSafeBuffer(
+            self._dispatch_batch,
+            max_size=max_queue_size,
+            on_dropped=self._on_thread_records_dropped,
+        )
+        self._bind_running_loop()
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @level.setter
+    def level(self, value: Union[str, int, LogLevel]) -> None:
+        self._level = check_level(value)
+        EffectiveLevels.invalidate()
+
+    @property
+    def parent(self) -> Optional["Logger"]:
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: Optional["Logger"]) -> None:
+        self._parent = value
+        EffectiveLevels.invalidate()
+
+    @property
+    def propagate(self) -> bool:
+        return self._propagate
+
+    @propagate.setter
+    def propagate(self, value: bool) -> None:
+        self._propagate = value
+        EffectiveLevels.invalidate()
+
+    @property
+    def handlers(self) -> List[Handler]:
+        return self._handlers
+
+    @handlers.setter
+    def handlers(self, value: List[Handler]) -> None:
+        self._handlers = value
+        EffectiveLevels.invalidate()
+
+    @property
+    def effective_level(self) -> int:
+        """
+        The lowest level a record must have to be handled, i.e. the highest
+        between the logger level and the lowest level of the handlers that
+        apply to it. Loggers with a NOTSET level use the level of their
+        closest ancestor with a level set. It's cached until a level, the
+        handlers or the logger hierarchy change.
+        """
+        if self._cache_generation != EffectiveLevels.generation:
+            self._refresh_cache()
+        return self._effective_level
 
-        self._dummy_task: Optional[Task] = None
+    @property
+    def handler_chain(self) -> Tuple[Handler, ...]:
+        """
+        The handlers of this logger and of its ancestors, up to the first one
+        that doesn't propagate. It's cached until the handlers or the logger
+        hierarchy change.
+        """
+        if self._cache_generation != EffectiveLevels.generation:
+            self._refresh_cache()
+        return self._handler_chain
+
+    def _refresh_cache(self) -> None:
+        handlers: List[Handler] = []
+        c: Optional[Logger] = self
+        while c:
+            handlers.extend(c.handlers)
+            if not c.propagate:
+                c = None
+            else:
+                c = c.parent
+
+        level = self.level
+        c = self.parent
+        while not level and c is not None:
+            level = c.level
+            c = c.parent
+
+        # Without handlers, records must still reach call_handlers, which
+        # raises an error
+        lowest_handler_level = min(
+            (handler.level for handler in handlers), default=LogLevel.NOTSET
+        )
+        self._handler_chain = tuple(handlers)
+        self._effective_level = max(level, lowest_handler_level)
+        self._cache_generation = EffectiveLevels.generation
+
+    @property
+    def dropped_records(self) -> Dict[OverflowPolicy, int]:
+        """
+        Number of records dropped because the queue was full, by policy.
+        """
+        if self._dispatcher is None:
+            return {}
+        return dict(self._dispatcher.dropped)
+
+    @property
+    def handler_queue_depths(self) -> Dict[Handler, int]:
+        """
+        Number of records waiting on each handler queue, if handlers are
+        isolated.
+        """
+        return {
+            handler: dispatcher.depth
+            for handler, dispatcher in self._handler_dispatchers.items()
+        }
 
     @classmethod
     def with_default_handlers(
@@ -84,10 +317,17 @@ class Logger(Filterer):
 
         return self
 
-    def find_caller(self, stack_info=False) -> _Caller:
+    def find_caller(self, stack_info=False, stacklevel: int = 1) -> _Caller:
         """
         Find the stack frame of the caller so that we can note the source
         file name, line number and function name.
+
+        Callers are cached by call site, so only the first call from each
+        call site pays for resolving its line number.
+
+        :param stacklevel: If greater than 1, the corresponding number of
+        stack frames are skipped after the first frame outside of this module,
+        e.g. to skip the frames of a logging wrapper.
         """
         frame = get_current_frame()
         # On some versions of IronPython, currentframe() returns None if
@@ -96,11 +336,14 @@ class Logger(Filterer):
             frame = frame.f_back
         while hasattr(frame, "f_code"):
             code = frame.f_code
-            filename = code.co_filename
-            if filename == _srcfile:
+            if code.co_filename == _srcfile:
                 frame = frame.f_back
                 continue
-            sinfo = None
+            for _ in range(stacklevel - 1):
+                if frame.f_back is None:
+                    break
+                frame = frame.f_back
+            code = frame.f_code
             if stack_info:
                 sio = io.StringIO()
                 sio.write("Stack (most recent call last):\n")
@@ -109,42 +352,91 @@ class Logger(Filterer):
                 if sinfo[-1] == "\n":
                     sinfo = sinfo[:-1]
                 sio.close()
-            return _Caller(
-                filename=code.co_filename or "(unknown file)",
-                line_number=frame.f_lineno,
-                function_name=code.co_name,
-                stack=sinfo,
-            )
-        return _Caller(
-            filename="(unknown file)",
-            line_number=0,
-            function_name="(unknown function)",
-            stack=None,
-        )
+                return _Caller(
+                    filename=code.co_filename or "(unknown file)",
+                    line_number=frame.f_lineno,
+                    function_name=code.co_name,
+                    stack=sinfo,
+                )
+            call_site = (code, frame.f_lasti)
+            try:
+                return _callers_cache[call_site]
+            except KeyError:
+                if len(_callers_cache) >= _CALLERS_CACHE_MAX_SIZE:
+                    _callers_cache.clear()
+                caller = _callers_cache[call_site] = _Caller(
+                    filename=code.co_filename or "(unknown file)",
+                    line_number=frame.f_lineno,
+                    function_name=code.co_name,
+                    stack=None,
+                )
+                return caller
+        return _UNKNOWN_CALLER
 
     async def call_handlers(self, record):
         """
         Pass a record to all relevant handlers.
 
         Loop through all handlers for this logger and its parents in the
-        logger hierarchy. If no handler was found, raises an error. Stop
-        searching up the hierarchy whenever a logger with the "propagate"
-        attribute set to zero is found - that will be the last logger
-        whose handlers are called.
+        logger hierarchy, as cached by `handler_chain`. If no handler was
+        found, raises an error.
         """
-        c = self
-        found = 0
-        while c:
-            for handler in c.handlers:
-                found = found + 1
-                if record.levelno >= handler.level:
-                    await handler.handle(record)
-            if not c.propagate:
-                c = None  # break out
-            else:
-                c = c.parent
-        if found == 0:
+        handlers = self.handler_chain
+        if not handlers:
             raise Exception("No handlers could be found for logger")
+        blocked = []
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                if self.isolate_handlers and not self._dispatchers_closed:
+                    enqueued = self._get_handler_dispatcher(handler).put(record)
+                    if not enqueued.done():
+                        blocked.append(enqueued)
+                else:
+                    await handler.handle(record)
+        if blocked:
+            await asyncio.gather(*blocked)
+
+    def _get_handler_dispatcher(self, handler: Handler) -> QueuedDispatcher:
+        """
+        The queue of an isolated handler. It's shared with the other loggers
+        using the handler, and is created with the queue settings of the
+        first one.
+        """
+        try:
+            return self._handler_dispatchers[handler]
+        except KeyError:
+            pass
+        try:
+            dispatcher = _handler_dispatchers[handler]
+        except KeyError:
+            dispatcher = _handler_dispatchers[handler] = QueuedDispatcher(
+                handler.handle,
+                max_size=self.handler_queue_size,
+                on_dropped=functools.partial(
+                    self._log_handler_dropped_records, handler
+                ),
+                **self._overflow_options,  # type: ignore
+            )
+        _handler_dispatcher_users[handler] += 1
+        self._handler_dispatchers[handler] = dispatcher
+        return dispatcher
+
+    def _release_handler_dispatcher(
+        self, handler: Handler
+    ) -> Optional[QueuedDispatcher]:
+        """
+        Stops using the queue of an isolated handler. Returns it if no other
+        logger uses it anymore, so it can be closed.
+        """
+        dispatcher = self._handler_dispatchers.pop(handler, None)
+        if dispatcher is None:
+            return None
+        _handler_dispatcher_users[handler] -= 1
+        if _handler_dispatcher_users[handler] > 0:
+            return None
+        del _handler_dispatcher_users[handler]
+        del _handler_dispatchers[handler]
+        return dispatcher
 
     def add_handler(self, handler: Handler) -> None:
         """
@@ -152,6 +444,8 @@ class Logger(Filterer):
         """
         if not (handler in self.handlers):
             self.handlers.append(handler)
+            EffectiveLevels.invalidate()
+        self._bind_running_loop()
 
     def remove_handler(self, handler: Handler) -> None:
         """
@@ -159,6 +453,17 @@ class Logger(Filterer):
         """
         if handler in self.handlers:
             self.handlers.remove(handler)
+            EffectiveLevels.invalidate()
+        dispatcher = self._release_handler_dispatcher(handler)
+        if dispatcher is not None and dispatcher.running:
+            # Records already enqueued are still handled before the handler
+            # worker stops
+            create_task(self._close_dispatcher(dispatcher))
+
+    @staticmethod
+    async def _close_dispatcher(dispatcher: QueuedDispatcher) -> None:
+        await dispatcher.join()
+        await dispatcher.close()
 
     async def handle(self, record):
         """
@@ -179,7 +484,7 @@ class Logger(Filterer):
         extra=None,
         stack_info=False,
         caller: _Caller = None,
-    ) -> Task:
+    ) -> Awaitable[None]:
 
         sinfo = None
         if _srcfile and caller is None:  # type: ignore
@@ -209,36 +514,121 @@ class Logger(Filterer):
             sinfo=sinfo,
             extra=extra,
         )
-        return create_task(self.handle(record))
+        return self._dispatch(record)
+
+    def _dispatch(self, record: LogRecord) -> Awaitable[None]:
+        """
+        Schedules the handling of a record. Returns an awaitable that
+        completes after the record is handled or, if the logger is queued,
+        as soon as the record is enqueued.
+
+        Records logged from threads without a running event loop are handed
+        over to the loop the logger was last used from, in batches, and an
+        already completed awaitable is returned. The logger is also bound to
+        the running loop when it's created or gets a handler, if any, and
+        up to `max_queue_size` records logged before a loop is known wait for
+        one, or for `shutdown`. The ones after that are dropped.
+        """
+        try:
+            self._thread_safe_buffer.bind(get_running_loop())
+        except RuntimeError:
+            # Logging from another thread, e.g. from `run_in_executor`
+            self._thread_safe_buffer.put(record)
+            return _COMPLETED
+        if self._dispatcher is not None:
+            return self._dispatcher.put(record)
+        return self._track(create_task(self.handle(record)), 1)
+
+    def _bind_running_loop(self) -> None:
+        try:
+            self._thread_safe_buffer.bind(get_running_loop())
+        except RuntimeError:
+            pass
+
+    def _track(self, task: Task, records: int) -> Task:
+        self._in_flight[task] = records
+        task.add_done_callback(self._in_flight.pop)
+        return task
+
+    def _dispatch_batch(self, records: List[LogRecord]) -> None:
+        """
+        Schedules the handling of records logged from other threads, with a
+        single task if the logger isn't queued.
+        """
+        if self._dispatcher is not None:
+            for record in records:
+                self._dispatcher.put(record)
+        else:
+            self._track(create_task(self._handle_batch(records)), len(records))
+
+    async def _handle_batch(self, records: List[LogRecord]) -> None:
+        for record in records:
+            await self.handle(record)
+
+    def _on_thread_records_dropped(self, count: int) -> None:
+        self._track(create_task(self._log_dropped_records(count)), 0)
+
+    def _make_dropped_records_record(self, count: int) -> LogRecord:
+        return LogRecord(
+            name=self.name,
+            level=LogLevel.WARNING,
+            pathname=_srcfile,
+            lineno=0,
+            msg=f"{count} log records dropped because the queue was full",
+            func="_log_dropped_records",
+        )
 
-    def __make_dummy_task(self) -> Task:
-        async def _dummy(*args, **kwargs):
-            return
+    async def _log_dropped_records(self, count: int) -> None:
+        """
+        Reports dropped records straight to the handlers, since the queue
+        that would drop them might still be full.
+        """
+        await self.call_handlers(self._make_dropped_records_record(count))
 
-        return create_task(_dummy())
+    async def _log_handler_dropped_records(
+        self, handler: Handler, count: int
+    ) -> None:
+        await handler.handle(self._make_dropped_records_record(count))
+
+    async def join(self) -> None:
+        """
+        Wait until every record logged so far was handled. Only queued
+        loggers, or loggers with isolated handlers, need this, since otherwise
+        awaiting the log call is enough.
+        """
+        if self._dispatcher is not None:
+            await self._dispatcher.join()
+        for dispatcher in list(self._handler_dispatchers.values()):
+            await dispatcher.join()
 
     def is_enabled_for(self, level) -> bool:
-        return level >= self.level
+        return level >= self.effective_level
 
-    def _make_log_task(self, level, msg, *args, **kwargs) -> Task:
+    def _make_log_task(self, level, msg, *args, **kwargs) -> Awaitable[None]:
         """
-        Creates an asyncio.Task for a msg if logging is enabled for level.
-        Returns a dummy task otherwise.
+        Creates an asyncio.Task for a msg if logging is enabled for level, or
+        enqueues it if the logger is queued. Otherwise, returns a completed
+        awaitable without creating a record.
         """
         if not self.is_enabled_for(level):
-            if self._dummy_task is None:
-                self._dummy_task = self.__make_dummy_task()
-            return self._dummy_task
+            return _COMPLETED
 
         if kwargs.get("exc_info", False):
             if not isinstance(kwargs["exc_info"], BaseException):
                 kwargs["exc_info"] = sys.exc_info()
 
-        return self._log(  # type: ignore
-            level, msg, *args, caller=self.find_caller(False), **kwargs
-        )
+        stacklevel = kwargs.pop("stacklevel", 1)
+        if self.capture_caller:
+            caller = self.find_caller(
+                kwargs.get("stack_info", False), stacklevel
+            )
+        else:
+            caller = _UNKNOWN_CALLER
+        return self._log(
+            level, msg, *args, caller=caller, **kwargs
+        )  # type: ignore
 
-    def debug(self, msg, *args, **kwargs) -> Task:
+    def debug(self, msg, *args, **kwargs) -> Awaitable[None]:
         """
         Log msg with severity 'DEBUG'.
 
@@ -249,7 +639,7 @@ class Logger(Filterer):
         """
         return self._make_log_task(LogLevel.DEBUG, msg, args, **kwargs)
 
-    def info(self, msg, *args, **kwargs) -> Task:
+    def info(self, msg, *args, **kwargs) -> Awaitable[None]:
         """
         Log msg with severity 'INFO'.
 
@@ -260,7 +650,7 @@ class Logger(Filterer):
         """
         return self._make_log_task(LogLevel.INFO, msg, args, **kwargs)
 
-    def warning(self, msg, *args, **kwargs) -> Task:
+    def warning(self, msg, *args, **kwargs) -> Awaitable[None]:
         """
         Log msg with severity 'WARNING'.
 
@@ -273,7 +663,7 @@ class Logger(Filterer):
 
     warn = warning
 
-    def error(self, msg, *args, **kwargs) -> Task:
+    def error(self, msg, *args, **kwargs) -> Awaitable[None]:
         """
         Log msg with severity 'ERROR'.
 
@@ -284,7 +674,7 @@ class Logger(Filterer):
         """
         return self._make_log_task(LogLevel.ERROR, msg, args, **kwargs)
 
-    def critical(self, msg, *args, **kwargs) -> Task:
+    def critical(self, msg, *args, **kwargs) -> Awaitable[None]:
         """
         Log msg with severity 'CRITICAL'.
 
@@ -297,28 +687,115 @@ class Logger(Filterer):
 
     fatal = critical
 
-    def exception(self, msg, *args, exc_info=True, **kwargs) -> Task:
+    def exception(self, msg, *args, exc_info=True, **kwargs) -> Awaitable[None]:
         """
         Convenience method for logging an ERROR with exception information.
         """
         return self.error(msg, *args, exc_info=exc_info, **kwargs)
 
-    async def shutdown(self):
+    async def shutdown(self, timeout: Optional[float] = None) -> ShutdownReport:
         """
         Perform any cleanup actions in the logging system (e.g. flushing
         buffers).
 
-        Should be called at application exit.
+        Should be called at application exit. Records still being handled, or
+        waiting on a queue or for a loop after being logged from another
+        thread, are waited for at most `timeout` seconds, or until they're
+        all handled if it's None. The ones that weren't handled by
+        then are abandoned. With isolated handlers, a record is counted once
+        per handler queue that it's waiting on.
         """
         if self._was_shutdown:
-            return
+            return ShutdownReport(delivered=0, abandoned=0)
         self._was_shutdown = True
+        report = await self._drain(timeout)
         await self._do_shutdown()
+        return report
+
+    def _dispatchers(self) -> List[QueuedDispatcher]:
+        dispatchers = list(self._handler_dispatchers.values())
+        if self._dispatcher is not None:
+            dispatchers.append(self._dispatcher)
+        return dispatchers
+
+    def _count_in_flight(self) -> int:
+        return (
+            sum(self._in_flight.values())
+            + sum(dispatcher.pending for dispatcher in self._dispatchers())
+            + len(self._thread_safe_buffer)
+        )
+
+    async def _wait_in_flight(self) -> None:
+        this_task = current_task()
+        while True:
+            self._thread_safe_buffer.flush()
+            tasks = [task for task in self._in_flight if task is not this_task]
+            if not tasks:
+                break
+            await asyncio.wait(tasks)
+        await self.join()
+
+    async def _drain(self, timeout: Optional[float]) -> ShutdownReport:
+        # Records logged from threads wait in the buffer if the logger was
+        # never used from a loop, e.g. if it was created at import time
+        self._thread_safe_buffer.bind(get_running_loop())
+        in_flight = self._count_in_flight()
+        try:
+            await asyncio.wait_for(self._wait_in_flight(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        abandoned = self._count_in_flight()
+        this_task = current_task()
+        for task in list(self._in_flight):
+            if task is not this_task:
+                task.cancel()
+        return ShutdownReport(
+            delivered=max(in_flight - abandoned, 0), abandoned=abandoned
+        )
+
+    def install_signal_handlers(
+        self,
+        timeout: Optional[float] = None,
+        signals: Sequence[int] = (signal.SIGTERM, signal.SIGINT),
+    ) -> None:
+        """
+        Shut down the logger, waiting at most `timeout` seconds for records in
+        flight, when the running event loop receives one of `signals`. The
+        signal is then sent again to the process, with its default handling
+        restored, so it terminates as it would without the logger.
+
+        Must be called from a coroutine and is only available on Unix.
+        """
+        loop = get_running_loop()
+        for signum in signals:
+            loop.add_signal_handler(
+                signum, self._on_signal, loop, signals, signum, timeout
+            )
+
+    def _on_signal(
+        self,
+        loop: AbstractEventLoop,
+        signals: Sequence[int],
+        signum: int,
+        timeout: Optional[float],
+    ) -> None:
+        for installed in signals:
+            loop.remove_signal_handler(installed)
+        task = loop.create_task(self.shutdown(timeout))
+        task.add_done_callback(lambda _: os.kill(os.getpid(), signum))
 
     async def _do_shutdown(self):
         """
         Does actual shutdown
         """
+        if self._dispatcher is not None:
+            await self._dispatcher.close()
+        for handler in list(self._handler_dispatchers):
+            dispatcher = self._release_handler_dispatcher(handler)
+            if dispatcher is not None:
+                await dispatcher.close()
+        # Records logged after shutdown don't start new handler workers
+        self._dispatchers_closed = True
         for handler in reversed(self.handlers):
             if not handler:
                 continue
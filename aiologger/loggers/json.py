@@ -1,15 +1,23 @@
 import json
 from datetime import timezone
-from asyncio import AbstractEventLoop, Task
-from typing import Dict, Iterable, Callable, Tuple, Any, Optional, Mapping
+from asyncio import AbstractEventLoop
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 from aiologger import Logger
-from aiologger.utils import create_task
 from aiologger.formatters.base import Formatter
 from aiologger.formatters.json import ExtendedJsonFormatter
 from aiologger.levels import LogLevel
-from aiologger.logger import _Caller
-from aiologger.records import ExtendedLogRecord
+from aiologger.logger import _Caller, _srcfile
+from aiologger.records import BoundExtra, ExtendedLogRecord
 
 
 class JsonLogger(Logger):
@@ -20,8 +28,9 @@ class JsonLogger(Logger):
         flatten: bool = False,
         serializer_kwargs: Dict = None,
         extra: Dict = None,
+        **kwargs,
     ) -> None:
-        super().__init__(name=name, level=level)
+        super().__init__(name=name, level=level, **kwargs)
 
         self.flatten = flatten
 
@@ -46,11 +55,15 @@ class JsonLogger(Logger):
         exclude_fields: Iterable[str] = None,
         tz: timezone = None,
         formatter: Optional[Formatter] = None,
+        record_attrs: Iterable[str] = (),
         **kwargs,
     ):
         if formatter is None:
             formatter = ExtendedJsonFormatter(
-                serializer=serializer, exclude_fields=exclude_fields, tz=tz
+                serializer=serializer,
+                exclude_fields=exclude_fields,
+                tz=tz,
+                record_attrs=record_attrs,
             )
         return super(JsonLogger, cls).with_default_handlers(
             name=name,
@@ -62,6 +75,29 @@ class JsonLogger(Logger):
             **kwargs,
         )
 
+    def bind(self, **fields) -> "BoundJsonLogger":
+        """
+        Returns a child logger that adds `fields` to the extra fields of its
+        records. They're merged with the logger `extra` once, when it's bound,
+        so later changes to `extra` don't affect the child logger.
+        """
+        return BoundJsonLogger(self, BoundExtra({**self.extra, **fields}))
+
+    def _make_dropped_records_record(self, count: int) -> ExtendedLogRecord:
+        return ExtendedLogRecord(
+            name=self.name,
+            level=LogLevel.WARNING,
+            pathname=_srcfile,
+            lineno=0,
+            msg=f"{count} log records dropped because the queue was full",
+            args=None,
+            exc_info=None,
+            func="_log_dropped_records",
+            extra={**self.extra, "dropped_records": count},
+            flatten=self.flatten,
+            serializer_kwargs=self.serializer_kwargs,
+        )
+
     def _log(  # type: ignore
         self,
         level: LogLevel,
@@ -73,7 +109,8 @@ class JsonLogger(Logger):
         flatten: bool = False,
         serializer_kwargs: Dict = None,
         caller: _Caller = None,
-    ) -> Task:
+        bound_extra: BoundExtra = None,
+    ) -> Awaitable[None]:
         """
         Low-level logging routine which creates a ExtendedLogRecord and
         then calls all the handlers of this logger to handle the record.
@@ -88,11 +125,15 @@ class JsonLogger(Logger):
         if exc_info and isinstance(exc_info, BaseException):
             exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
 
-        joined_extra = {}
-        joined_extra.update(self.extra)
+        if bound_extra is not None:
+            # Bound fields already include the logger extra
+            joined_extra = extra or {}
+        else:
+            joined_extra = {}
+            joined_extra.update(self.extra)
 
-        if extra:
-            joined_extra.update(extra)
+            if extra:
+                joined_extra.update(extra)
 
         record = ExtendedLogRecord(
             name=self.name,
@@ -107,5 +148,62 @@ class JsonLogger(Logger):
             extra=joined_extra,
             flatten=flatten or self.flatten,
             serializer_kwargs=serializer_kwargs or self.serializer_kwargs,
+            bound_extra=bound_extra,
+        )
+        return self._dispatch(record)
+
+
+class BoundJsonLogger:
+    """
+    A child of a `JsonLogger`, made by `JsonLogger.bind`, that adds the
+    fields bound to it to every record. Records are handled by the parent
+    logger, which is also used for any attribute that isn't a log method.
+    """
+
+    __slots__ = ("logger", "bound_extra")
+
+    def __init__(self, logger: JsonLogger, bound_extra: BoundExtra) -> None:
+        self.logger = logger
+        self.bound_extra = bound_extra
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.logger, name)
+
+    def bind(self, **fields) -> "BoundJsonLogger":
+        """
+        Returns a child logger with `fields` bound in addition to the fields
+        already bound to this one.
+        """
+        return BoundJsonLogger(self.logger, self.bound_extra.merge(fields))
+
+    def _make_log_task(self, level, msg, args, **kwargs) -> Awaitable[None]:
+        # This frame takes the place of the log method frame that find_caller
+        # expects, so only the bound log method frame must be skipped
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+        return self.logger._make_log_task(
+            level, msg, args, bound_extra=self.bound_extra, **kwargs
+        )
+
+    def debug(self, msg, *args, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(LogLevel.DEBUG, msg, args, **kwargs)
+
+    def info(self, msg, *args, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(LogLevel.INFO, msg, args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(LogLevel.WARNING, msg, args, **kwargs)
+
+    warn = warning
+
+    def error(self, msg, *args, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(LogLevel.ERROR, msg, args, **kwargs)
+
+    def critical(self, msg, *args, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(LogLevel.CRITICAL, msg, args, **kwargs)
+
+    fatal = critical
+
+    def exception(self, msg, *args, exc_info=True, **kwargs) -> Awaitable[None]:
+        return self._make_log_task(
+            LogLevel.ERROR, msg, args, exc_info=exc_info, **kwargs
         )
-        return create_task(self.handle(record))
@@ -0,0 +1,72 @@
+from typing import Dict, Optional, Type
+
+from aiologger.logger import Logger
+
+ROOT_LOGGER_NAME = "root"
+
+
+class Manager:
+    """
+    Holds the hierarchy of loggers created by `get_logger`, where each dotted
+    name is a child of its prefixes, e.g. "a.b" is the parent of "a.b.c" and
+    the root logger is the parent of "a".
+
+    Missing ancestors are created along with their descendants, so creating a
+    logger never changes the parent of an existing one.
+    """
+
+    def __init__(
+        self, root: Optional[Logger] = None, logger_class: Type[Logger] = Logger
+    ) -> None:
+        self.logger_class = logger_class
+        if root is None:
+            root = logger_class(name=ROOT_LOGGER_NAME)
+        self.root = root
+        self.loggers: Dict[str, Logger] = {}
+
+    def get_logger(self, name: Optional[str] = None) -> Logger:
+        """
+        Return the logger with the specified name, creating it and its
+        ancestors if necessary. The root logger is returned if no name is
+        specified.
+        """
+        if not name:
+            return self.root
+        try:
+            return self.loggers[name]
+        except KeyError:
+            pass
+
+        parent = self.root
+        ancestor_name = ""
+        for part in name.split("."):
+            if ancestor_name:
+                ancestor_name = f"{ancestor_name}.{part}"
+            else:
+                ancestor_name = part
+            logger = self.loggers.get(ancestor_name)
+            if logger is None:
+                logger = self.logger_class(name=ancestor_name)
+                logger.parent = parent
+                self.loggers[ancestor_name] = logger
+            parent = logger
+        return parent
+
+    async def shutdown(self) -> None:
+        """
+        Shut down every logger in the hierarchy, from the leaves to the root.
+        """
+        for name in sorted(self.loggers, reverse=True):
+            await self.loggers[name].shutdown()
+        await self.root.shutdown()
+
+
+manager = Manager()
+
+
+def get_logger(name: Optional[str] = None) -> Logger:
+    """
+    Return a logger with the specified name from the default `Manager`,
+    creating it if necessary.
+    """
+    return manager.get_logger(name)
@@ -1,6 +1,68 @@
 import asyncio
+from asyncio import BaseTransport, Future, WriteTransport
+from collections import deque
+from typing import Deque, Optional
+
+from aiologger.utils import get_running_loop
 
 
 class AiologgerProtocol(asyncio.Protocol):
-    async def _drain_helper(self):
-        pass
+    """
+    A protocol for write-only transports with flow control: the transport
+    pauses it when its buffer grows above the high-water mark and resumes
+    it once the buffer is back under the low-water mark. Only then
+    `StreamWriter.drain` waits, so writes to a fast consumer never yield.
+    """
+
+    def __init__(self) -> None:
+        self.transport: Optional[WriteTransport] = None
+        self._paused = False
+        self._connection_lost = False
+        self._drain_waiters: Deque[Future] = deque()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def buffered_bytes(self) -> int:
+        """
+        Number of bytes waiting in the transport buffer.
+        """
+        if self.transport is None or self._connection_lost:
+            return 0
+        return self.transport.get_write_buffer_size()
+
+    def connection_made(self, transport: BaseTransport) -> None:
+        self.transport = transport  # type: ignore
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._connection_lost = True
+        self._paused = False
+        self._wake_drain_waiters(exc)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wake_drain_waiters()
+
+    def _wake_drain_waiters(self, exc: Optional[Exception] = None) -> None:
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if waiter.done():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    async def _drain_helper(self) -> None:
+        if self._connection_lost:
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        waiter = get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
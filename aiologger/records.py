@@ -5,9 +5,10 @@ import os
 import time
 import types
 from collections.abc import Mapping
-from typing import Optional, Tuple, Type, Union
+from typing import Dict, Optional, Tuple, Type, Union
 
 from aiologger.levels import LogLevel, get_level_name
+from aiologger.utils import CallableWrapper
 
 ExceptionInfo = Tuple[Type[BaseException], BaseException, types.TracebackType]
 
@@ -89,6 +90,7 @@ class LogRecord:
         self.process = os.getpid()
         self.asctime: Optional[str] = None
         self.message: Optional[str] = None
+        self._deferred_resolved = False
 
     def __str__(self):
         return (
@@ -102,12 +104,51 @@ class LogRecord:
         """
         Return the message for this LogRecord after merging any user-supplied
         arguments with the message.
+
+        Messages and arguments wrapped with `CallableWrapper`, such as
+        `aiologger.utils.Lazy`, are evaluated on the first call and replaced
+        by their values.
         """
+        if not self._deferred_resolved:
+            self._resolve_deferred()
         msg = str(self.msg)
         if self.args:
             msg = msg % self.args
         return msg
 
+    def _resolve_deferred(self) -> None:
+        self._deferred_resolved = True
+        if isinstance(self.msg, CallableWrapper):
+            self.msg = self.msg()
+        if isinstance(self.args, Mapping):
+            if any(isinstance(v, CallableWrapper) for v in self.args.values()):
+                self.args = {
+                    k: v() if isinstance(v, CallableWrapper) else v
+                    for k, v in self.args.items()
+                }
+        elif self.args:
+            if any(isinstance(arg, CallableWrapper) for arg in self.args):
+                self.args = tuple(
+                    arg() if isinstance(arg, CallableWrapper) else arg
+                    for arg in self.args
+                )
+
+
+class BoundExtra:
+    """
+    Extra fields bound to a logger by `JsonLogger.bind`. They're merged only
+    once and formatters may cache their serialized form, so they can't be
+    changed.
+    """
+
+    __slots__ = ("fields", "__weakref__")
+
+    def __init__(self, fields: Mapping) -> None:
+        self.fields: Mapping = types.MappingProxyType(dict(fields))
+
+    def merge(self, fields: Mapping) -> "BoundExtra":
+        return BoundExtra({**self.fields, **fields})
+
 
 class ExtendedLogRecord(LogRecord):
     def __init__(
@@ -129,3 +170,13 @@ class ExtendedLogRecord(LogRecord):
         self.extra = kwargs["extra"]
         self.flatten = kwargs["flatten"]
         self.serializer_kwargs = kwargs["serializer_kwargs"]
+        self.bound_extra: Optional[BoundExtra] = kwargs.get("bound_extra")
+
+    def get_extra(self) -> Dict:
+        """
+        The extra fields of the record, including the ones bound to its
+        logger. Fields given to the log call take precedence.
+        """
+        if self.bound_extra is None:
+            return self.extra or {}
+        return {**self.bound_extra.fields, **(self.extra or {})}
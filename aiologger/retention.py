@@ -0,0 +1,203 @@
+import asyncio
+import bisect
+import time
+from asyncio import Task
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from aiologger.utils import create_task, get_running_loop
+
+DEFAULT_MAX_DELETES_PER_SECOND = 100
+
+_Deleter = Callable[[List[str]], Awaitable[None]]
+_SortKey = Callable[["Backup"], Any]
+
+
+class Backup(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+
+
+def _by_mtime(backup: Backup) -> Any:
+    return backup.mtime, backup.path
+
+
+class BackupIndex:
+    """
+    An in-memory index of the backups of a rotating handler, oldest first.
+    Backups are ordered by `key`, their mtime and then their path by
+    default, since names don't sort by age, e.g. app.log.10 sorts before
+    app.log.2. Their total size is kept up to date, so budgets are checked
+    without touching the filesystem.
+    """
+
+    def __init__(self, key: Optional[_SortKey] = None) -> None:
+        self.key = _by_mtime if key is None else key
+        self._backups: List[Backup] = []
+        self._keys: List[Any] = []
+        self._keys_by_path: Dict[str, Any] = {}
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._backups)
+
+    def __iter__(self):
+        return iter(self._backups)
+
+    def add(self, backup: Backup) -> None:
+        self.discard(backup.path)
+        key = self.key(backup)
+        index = bisect.bisect(self._keys, key)
+        self._keys.insert(index, key)
+        self._backups.insert(index, backup)
+        self._keys_by_path[backup.path] = key
+        self.total_bytes += backup.size
+
+    def discard(self, path: str) -> None:
+        try:
+            key = self._keys_by_path.pop(path)
+        except KeyError:
+            return
+        index = bisect.bisect_left(self._keys, key)
+        # Backups may have equal keys
+        while self._backups[index].path != path:
+            index += 1
+        del self._keys[index]
+        self.total_bytes -= self._backups.pop(index).size
+
+    def expired(
+        self,
+        backup_count: int = 0,
+        max_total_bytes: int = 0,
+        max_age: float = 0,
+        now: Optional[float] = None,
+    ) -> List[Backup]:
+        """
+        The oldest backups that must be deleted so that no more than
+        `backup_count` backups, `max_total_bytes` bytes and no backup older
+        than `max_age` seconds are kept. Budgets that are 0 are ignored.
+        """
+        if now is None:
+            now = time.time()
+        count, total_bytes = len(self._backups), self.total_bytes
+        result = []
+        for backup in self._backups:
+            if not (
+                (backup_count > 0 and count > backup_count)
+                or (max_total_bytes > 0 and total_bytes > max_total_bytes)
+                or (max_age > 0 and now - backup.mtime > max_age)
+            ):
+                break
+            result.append(backup)
+            count -= 1
+            total_bytes -= backup.size
+        return result
+
+
+class BackupJanitor:
+    """
+    Deletes the backups over the retention budgets of a `BackupIndex` in a
+    background task, so rollovers never wait for it.
+
+    Deletions are rate limited: at most `max_deletes_per_second` files are
+    handed to `delete` at once, and the next batch waits a second, so a
+    large backlog of expired files doesn't flood the executor or the disk.
+    """
+
+    def __init__(
+        self,
+        delete: _Deleter,
+        backup_count: int = 0,
+        max_total_bytes: int = 0,
+        max_age: float = 0,
+        max_deletes_per_second: int = DEFAULT_MAX_DELETES_PER_SECOND,
+        clock: Callable[[], float] = time.time,
+        key: Optional[_SortKey] = None,
+    ) -> None:
+        if max_deletes_per_second <= 0:
+            raise ValueError(
+                f"max_deletes_per_second must be a positive int: "
+                f"{max_deletes_per_second}"
+            )
+        self.delete = delete
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.max_age = max_age
+        self.max_deletes_per_second = max_deletes_per_second
+        self.clock = clock
+        self.index = BackupIndex(key)
+        self.loaded = False
+        self._task: Optional[Task] = None
+        self._waiting = False
+        self._closing = False
+
+    def forget(self) -> None:
+        """
+        Clears the index, so it's loaded again, e.g. after the backups were
+        renamed.
+        """
+        self.index = BackupIndex(self.index.key)
+        self.loaded = False
+
+    def expired(self) -> List[Backup]:
+        return self.index.expired(
+            self.backup_count, self.max_total_bytes, self.max_age, self.clock()
+        )
+
+    def schedule(self) -> None:
+        """
+        Starts deleting the expired backups, unless it's already running.
+        """
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = self.expired()[: self.max_deletes_per_second]
+            if not batch:
+                return
+            for backup in batch:
+                self.index.discard(backup.path)
+            try:
+                await self.delete([backup.path for backup in batch])
+            except Exception as exc:
+                get_running_loop().call_exception_handler(
+                    {
+                        "message": "Unhandled exception while deleting old log files",
+                        "exception": exc,
+                        "janitor": self,
+                    }
+                )
+            if len(batch) == self.max_deletes_per_second:
+                if self._closing:
+                    return
+                self._waiting = True
+                try:
+                    await asyncio.sleep(1)
+                finally:
+                    self._waiting = False
+
+    async def join(self) -> None:
+        """
+        Waits until the expired backups are deleted.
+        """
+        task = self._task
+        if task is not None and not task.done():
+            await task
+
+    async def close(self) -> None:
+        """
+        Waits for the batch being deleted, if any, but not for the next ones.
+        Backups that are left are deleted after the next rollover.
+        """
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        self._closing = True
+        if self._waiting:
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
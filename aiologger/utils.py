@@ -1,13 +1,16 @@
+import asyncio
 import sys
 import warnings
 import functools
 from asyncio import AbstractEventLoop
+from types import FrameType
 from typing import Callable, TypeVar, Type, cast
 
 
 if sys.version_info >= (3, 7):
     from asyncio import get_running_loop
     from asyncio import create_task
+    from asyncio import current_task
 else:
     from asyncio import _get_running_loop
 
@@ -21,6 +24,9 @@ else:
         loop = get_running_loop()
         return loop.create_task(coro)
 
+    def current_task():
+        return asyncio.Task.current_task(get_running_loop())
+
 
 _T = TypeVar("_T", bound=Type[object])
 
@@ -89,13 +95,62 @@ class CallableWrapper:
         return self.func(*args, **kwargs)
 
 
+_UNEVALUATED = object()
+
+
+class Lazy(CallableWrapper):
+    """
+    A deferred log argument or message. `func` is only called, with the
+    given arguments, when the record is formatted, and at most once. Log
+    calls for disabled levels or filtered out records never call it, e.g.:
+
+    logger.debug("state: %s", Lazy(dump_big_state))
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs) -> None:
+        super().__init__(func)
+        self.args = args
+        self.kwargs = kwargs
+        self._value = _UNEVALUATED
+
+    def __call__(self):
+        if self._value is _UNEVALUATED:
+            self._value = self.func(*self.args, **self.kwargs)
+        return self._value
+
+
+class CompletedAwaitable:
+    """
+    An awaitable that is already complete and, unlike an asyncio.Future,
+    isn't bound to an event loop.
+    """
+
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+
 if hasattr(sys, "_getframe"):
-    get_current_frame = lambda: sys._getframe(3)
+
+    def get_current_frame(depth: int = 3):
+        """
+        Return the frame object `depth` levels up the stack, where 1 is the
+        frame that called this function.
+        """
+        return sys._getframe(depth)
+
+
 else:  # pragma: no cover
 
-    def get_current_frame():
+    def get_current_frame(depth: int = 3):
         """Return the frame object for the caller's stack frame."""
         try:
             raise Exception
         except Exception:
-            return sys.exc_info()[2].tb_frame.f_back
+            traceback = sys.exc_info()[2]
+            assert traceback is not None
+            frame = traceback.tb_frame
+        for _ in range(depth):
+            frame = cast(FrameType, frame.f_back)
+        return frame
@@ -0,0 +1,520 @@
+import os
+import queue
+import select
+import threading
+from asyncio import AbstractEventLoop, Future
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from aiologger.utils import CompletedAwaitable, get_running_loop
+
+_COMPLETED = CompletedAwaitable()
+
+_OPEN_FLAGS = {
+    "a": os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+    "w": os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+    "x": os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+}
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):  # pragma: no cover
+    IOV_MAX = 1024
+
+# Size of the writes that POSIX guarantees not to interleave on pipes. On
+# local filesystems, O_APPEND writes of any size are usually atomic too.
+DEFAULT_ATOMIC_WRITE_SIZE = getattr(select, "PIPE_BUF", 4096)
+
+# Bytes pending on an FdStream above which `drain` waits for them, the
+# same default as asyncio's transports
+DEFAULT_HIGH_WATER_MARK = 64 * 1024
+
+_Chunk = Union[bytes, memoryview]
+
+
+def writev_all(fd: int, chunks: List[_Chunk]) -> None:
+    """
+    Writes every chunk to `fd`, with as few `os.writev` calls as possible,
+    retrying after partial writes.
+    """
+    while chunks:
+        batch = chunks[:IOV_MAX]
+        try:
+            written = os.writev(fd, batch)
+        except BlockingIOError:
+            # The fd, e.g. a pipe shared with an event loop, is non-blocking
+            select.select([], [fd], [])
+            continue
+        index = 0
+        while index < len(batch) and written >= len(batch[index]):
+            written -= len(batch[index])
+            index += 1
+        chunks = chunks[index:]
+        if written:
+            chunks[0] = memoryview(chunks[0])[written:]
+
+
+def split_atomic_writes(
+    data: bytes, max_size: int, split_long_lines: bool = True
+) -> List[bytes]:
+    """
+    Splits `data` into chunks of at most `max_size` bytes, each made of
+    whole lines. Lines longer than `max_size` are split into `max_size`
+    pieces if `split_long_lines`, otherwise a `ValueError` is raised.
+    """
+    chunks = []
+    start = 0
+    while len(data) - start > max_size:
+        end = data.rfind(b"\n", start, start + max_size) + 1
+        if end <= start:
+            if not split_long_lines:
+                raise ValueError(
+                    f"A line is larger than the atomic write size of "
+                    f"{max_size} bytes"
+                )
+            end = start + max_size
+        chunks.append(data[start:end])
+        start = end
+    if start < len(data):
+        chunks.append(data[start:])
+    return chunks
+
+
+class AtomicAppendStream:
+    """
+    A raw file descriptor opened with `O_APPEND`, for files shared by many
+    processes. Each `os.write` holds whole lines and at most
+    `atomic_write_size` bytes, so lines written by different processes are
+    never torn or interleaved. Records with many lines, e.g. tracebacks,
+    are only kept together if they fit in a single write.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        encoding: Optional[str] = None,
+        atomic_write_size: int = DEFAULT_ATOMIC_WRITE_SIZE,
+        split_long_lines: bool = True,
+    ) -> None:
+        self.fd = fd
+        self.encoding = encoding or "utf-8"
+        self.atomic_write_size = atomic_write_size
+        self.split_long_lines = split_long_lines
+        self.closed = False
+
+    @classmethod
+    async def open(
+        cls, path: str, encoding: Optional[str] = None, **kwargs
+    ) -> "AtomicAppendStream":
+        fd = await get_running_loop().run_in_executor(
+            None, os.open, path, _OPEN_FLAGS["a"], 0o666
+        )
+        return cls(fd, encoding, **kwargs)
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def _write_chunks(self, chunks: List[bytes]) -> None:
+        for chunk in chunks:
+            written = os.write(self.fd, chunk)
+            if written < len(chunk):
+                # Only happens on errors, e.g. a full disk, so the rest of
+                # the chunk most likely fails and raises
+                writev_all(self.fd, [memoryview(chunk)[written:]])
+
+    async def write(self, data: Union[str, bytes]) -> None:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if isinstance(data, str):
+            data = data.encode(self.encoding)
+        chunks = split_atomic_writes(
+            data, self.atomic_write_size, self.split_long_lines
+        )
+        await get_running_loop().run_in_executor(
+            None, self._write_chunks, chunks
+        )
+
+    async def flush(self) -> None:
+        # Writes aren't buffered
+        pass
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        await get_running_loop().run_in_executor(None, os.close, self.fd)
+
+
+class PreallocatedStream:
+    """
+    A raw file descriptor written with `os.pwrite` at an offset tracked in
+    memory. Space is preallocated with `os.posix_fallocate`, in chunks of
+    `chunk_size` bytes ahead of the writes, so the filesystem allocates
+    blocks and updates the inode once per chunk instead of once per write.
+
+    Preallocation grows the file, so it's truncated to the written length
+    when closed. If the process dies before that, the zeroed tail is
+    truncated the next time the file is opened. Where `posix_fallocate`
+    isn't supported, the file is written without preallocation.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        offset: int,
+        chunk_size: int,
+        encoding: Optional[str] = None,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be a positive int: {chunk_size}")
+        self.fd = fd
+        self.offset = offset
+        self.allocated = offset
+        self.chunk_size = chunk_size
+        self.encoding = encoding or "utf-8"
+        self.closed = False
+        self._can_preallocate = hasattr(os, "posix_fallocate")
+
+    @classmethod
+    async def open(
+        cls,
+        path: str,
+        mode: str = "a",
+        chunk_size: int = 1024 * 1024,
+        encoding: Optional[str] = None,
+    ) -> "PreallocatedStream":
+        mode = mode.replace("b", "").replace("t", "")
+        if mode not in _OPEN_FLAGS:
+            raise ValueError(f"Unsupported mode for preallocation: {mode}")
+        # Writes are positional, so the file isn't opened with O_APPEND. It's
+        # also read, to find the written length of files that weren't closed
+        flags = _OPEN_FLAGS[mode] & ~(os.O_APPEND | os.O_WRONLY) | os.O_RDWR
+        fd, offset = await get_running_loop().run_in_executor(
+            None, _open_preallocated, path, flags, chunk_size
+        )
+        return cls(fd, offset, chunk_size, encoding)
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def _write_at(
+        self, data: bytes, offset: int, allocation: Optional[Tuple[int, int]]
+    ) -> None:
+        if allocation is not None and self._can_preallocate:
+            try:
+                os.posix_fallocate(self.fd, *allocation)
+            except OSError:
+                # e.g. EOPNOTSUPP, on filesystems without preallocation
+                self._can_preallocate = False
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self.fd, view, offset)
+            view = view[written:]
+            offset += written
+
+    async def write(self, data: Union[str, bytes]) -> None:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if isinstance(data, str):
+            data = data.encode(self.encoding)
+        # Offsets are reserved before awaiting, so concurrent writes never
+        # overlap
+        offset = self.offset
+        self.offset += len(data)
+        allocation = None
+        if self.offset > self.allocated:
+            chunks = -(-(self.offset - self.allocated) // self.chunk_size)
+            allocation = (self.allocated, chunks * self.chunk_size)
+            self.allocated += allocation[1]
+        await get_running_loop().run_in_executor(
+            None, self._write_at, data, offset, allocation
+        )
+
+    async def flush(self) -> None:
+        # Writes aren't buffered
+        pass
+
+    def _truncate_and_close(self) -> None:
+        try:
+            os.ftruncate(self.fd, self.offset)
+        finally:
+            os.close(self.fd)
+
+    async def close(self) -> None:
+        """
+        Truncates the preallocated space past the written length and closes
+        the file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        await get_running_loop().run_in_executor(None, self._truncate_and_close)
+
+
+def _open_preallocated(
+    path: str, flags: int, chunk_size: int
+) -> Tuple[int, int]:
+    fd = os.open(path, flags, 0o666)
+    try:
+        size = os.fstat(fd).st_size
+        # The preallocated tail of a file that wasn't closed is zeroed, and
+        # at most a chunk long
+        tail_size = min(size, chunk_size)
+        tail = os.pread(fd, tail_size, size - tail_size)
+        zeros = tail_size - len(tail.rstrip(b"\0"))
+        if zeros:
+            size -= zeros
+            os.ftruncate(fd, size)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd, size
+
+
+class FdStream:
+    """
+    A raw file descriptor written by a `WriterThread`. It can stand in for
+    both an aiofiles stream, as used by `AsyncFileHandler`, and a
+    `StreamWriter`, as used by `AsyncStreamHandler`.
+
+    Writes only enqueue the encoded data and never wait. Awaiting `flush`
+    waits until everything written before it reached the fd, and raises the
+    error of any failed write. Awaiting `drain` only waits like `flush` while
+    more than `high_water_mark` bytes are pending, so consecutive writes are
+    coalesced by the thread, and otherwise only raises the error of writes
+    that already failed.
+    """
+
+    def __init__(
+        self,
+        writer_thread: "WriterThread",
+        fd: int,
+        encoding: Optional[str] = None,
+        owns_fd: bool = True,
+        high_water_mark: int = DEFAULT_HIGH_WATER_MARK,
+    ) -> None:
+        self.writer_thread = writer_thread
+        self.fd = fd
+        self.encoding = encoding or "utf-8"
+        self.owns_fd = owns_fd
+        self.high_water_mark = high_water_mark
+        self.closed = False
+        self._error: Optional[Exception] = None
+        # Each counter is only changed by a single thread
+        self._enqueued_bytes = 0
+        self._written_bytes = 0
+
+    @property
+    def pending_bytes(self) -> int:
+        """
+        Number of bytes written but not yet handed to the fd.
+        """
+        return self._enqueued_bytes - self._written_bytes
+
+    @property
+    def paused(self) -> bool:
+        """
+        Whether more than `high_water_mark` bytes are pending, so `drain`
+        waits.
+        """
+        return self.pending_bytes > self.high_water_mark
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def write(self, data: Union[str, bytes, bytearray]) -> CompletedAwaitable:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if isinstance(data, str):
+            data = data.encode(self.encoding)
+        elif not isinstance(data, bytes):
+            # Callers may reuse their buffer before the thread writes it
+            data = bytes(data)
+        self._enqueued_bytes += len(data)
+        self.writer_thread.enqueue_write(self, data)
+        return _COMPLETED
+
+    async def flush(self) -> None:
+        await self.writer_thread.call(_noop)
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    async def drain(self) -> None:
+        if self.paused:
+            await self.flush()
+            return
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> Future:
+        """
+        Closes the fd, if it's owned by the stream, after the pending
+        writes. The returned future may be awaited, but it doesn't need to.
+        """
+        self.closed = True
+        if self.owns_fd:
+            return self.writer_thread.call(os.close, self.fd)
+        return self.writer_thread.call(_noop)
+
+
+def _noop() -> None:
+    pass
+
+
+_Request = Tuple[Any, ...]
+_STOP = object()
+
+
+class WriterThread:
+    """
+    A private thread that owns raw file descriptors and writes to them, so
+    log I/O doesn't compete with the application for the event loop's
+    default executor.
+
+    Writes are sent through a queue. Consecutive writes to the same fd are
+    coalesced into a single `os.writev` call, so a burst of records costs a
+    single system call. The thread is started on first use.
+    """
+
+    def __init__(self, name: str = "aiologger-writer") -> None:
+        self.name = name
+        self._requests: "queue.Queue[_Request]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+    def enqueue_write(self, stream: FdStream, data: bytes) -> None:
+        self._ensure_started()
+        self._requests.put((stream, data))
+
+    def call(self, func: Callable, *args) -> Future:
+        """
+        Calls `func` in the writer thread, after the writes already enqueued.
+        Returns a future with its result.
+        """
+        self._ensure_started()
+        loop = get_running_loop()
+        future = loop.create_future()
+        self._requests.put((func, args, loop, future))
+        return future
+
+    async def open(
+        self,
+        path: str,
+        mode: str = "a",
+        encoding: Optional[str] = None,
+        high_water_mark: int = DEFAULT_HIGH_WATER_MARK,
+    ) -> FdStream:
+        """
+        Opens `path` for writing. `mode` is one of "a", "w" or "x", with the
+        same meaning as for `open`; appending uses `O_APPEND`.
+        """
+        try:
+            flags = _OPEN_FLAGS[mode.replace("b", "").replace("t", "")]
+        except KeyError:
+            raise ValueError(f"Unsupported mode for a WriterThread: {mode}")
+        fd = await self.call(os.open, path, flags, 0o666)
+        return FdStream(
+            self, fd, encoding=encoding, high_water_mark=high_water_mark
+        )
+
+    def attach(
+        self,
+        fd: int,
+        encoding: Optional[str] = None,
+        high_water_mark: int = DEFAULT_HIGH_WATER_MARK,
+    ) -> FdStream:
+        """
+        Makes a stream for an already open fd, e.g. stdout's, which isn't
+        closed along with the stream.
+        """
+        return FdStream(
+            self,
+            fd,
+            encoding=encoding,
+            owns_fd=False,
+            high_water_mark=high_water_mark,
+        )
+
+    def stop(self) -> None:
+        """
+        Stops the thread after the requests already enqueued.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._requests.put((_STOP,))
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            requests = [self._requests.get()]
+            while True:
+                try:
+                    requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._handle(requests):
+                return
+
+    def _handle(self, requests: List[_Request]) -> bool:
+        stream: Optional[FdStream] = None
+        chunks: List[_Chunk] = []
+        for request in requests:
+            if len(request) == 2:
+                if request[0] is not stream:
+                    self._write(stream, chunks)
+                    stream, chunks = request[0], []
+                chunks.append(request[1])
+                continue
+
+            self._write(stream, chunks)
+            stream, chunks = None, []
+            if request[0] is _STOP:
+                return False
+            func, args, loop, future = request
+            try:
+                result = func(*args)
+            except Exception as exc:
+                self._resolve(loop, future, exc, failed=True)
+            else:
+                self._resolve(loop, future, result)
+        self._write(stream, chunks)
+        return True
+
+    @staticmethod
+    def _write(stream: Optional[FdStream], chunks: List[_Chunk]) -> None:
+        if stream is None or not chunks:
+            return
+        size = sum(len(chunk) for chunk in chunks)
+        try:
+            writev_all(stream.fd, chunks)
+        except Exception as exc:
+            stream._error = exc
+        stream._written_bytes += size
+
+    @staticmethod
+    def _resolve(
+        loop: AbstractEventLoop, future: Future, result: Any, failed=False
+    ) -> None:
+        def resolve():
+            if future.done():
+                return
+            if failed:
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        try:
+            loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            # The event loop was closed while waiting for the result
+            pass
@@ -11,7 +11,7 @@ from aiologger.formatters.json import (
     LOG_LEVEL_FIELDNAME,
     LINE_NUMBER_FIELDNAME,
 )
-from aiologger.records import ExtendedLogRecord
+from aiologger.records import BoundExtra, ExtendedLogRecord
 
 
 class ExtendedJsonFormatterTests(unittest.TestCase):
@@ -235,3 +235,58 @@ class ExtendedJsonFormatterTests(unittest.TestCase):
         self.assertEqual(
             custom_orjson_serializer_msg, default_json_serializer_msg
         )
+
+    @freeze_time("2018-06-16T10:16:00-03:00")
+    def test_bound_extra_fields_are_spliced_into_the_serialized_record(self):
+        self.record.extra = {"female_dog": "Xena"}
+        expected = self.formatter.format(self.record)[:-1]
+        self.record.bound_extra = BoundExtra({"service": "xablau", "pod": 1})
+
+        with patch.object(
+            self.formatter, "serializer", wraps=self.formatter.serializer
+        ) as serializer:
+            first = self.formatter.format(self.record)
+            second = self.formatter.format(self.record)
+
+        self.assertEqual(first, expected + ', "service": "xablau", "pod": 1}')
+        self.assertEqual(second, first)
+        # the record twice, the bound fields and the separator probe once
+        self.assertEqual(serializer.call_count, 4)
+
+    @freeze_time("2018-06-16T10:16:00-03:00")
+    def test_bound_extra_fields_are_spliced_with_the_serializer_separator(self):
+        custom_formatter = ExtendedJsonFormatter(serializer=orjson.dumps)
+        self.record.bound_extra = BoundExtra({"service": "xablau"})
+
+        content = custom_formatter.format(self.record)
+
+        self.assertTrue(content.endswith('},"service":"xablau"}'))
+        self.assertEqual(json.loads(content)["service"], "xablau")
+
+    def test_record_fields_take_precedence_over_bound_extra_fields(self):
+        self.record.extra = {"dog": "Xena"}
+        self.record.bound_extra = BoundExtra({"dog": "Xablau", "pod": 1})
+
+        content = json.loads(self.formatter.format(self.record))
+
+        self.assertEqual(content["dog"], "Xena")
+        self.assertEqual(content["pod"], 1)
+        self.assertEqual(len(content), 8)
+
+    def test_bound_extra_fields_are_merged_if_there_are_serializer_kwargs(self):
+        self.record.serializer_kwargs = {"indent": 2}
+        self.record.bound_extra = BoundExtra({"service": "xablau"})
+
+        content = self.formatter.format(self.record)
+
+        self.assertTrue(content.endswith('"service": "xablau"\n}'))
+
+    def test_record_attrs_are_added_as_fields_if_records_have_them(self):
+        formatter = ExtendedJsonFormatter(record_attrs=["sample_rate"])
+
+        content = json.loads(formatter.format(self.record))
+        self.assertNotIn("sample_rate", content)
+
+        self.record.sample_rate = 0.25
+        content = json.loads(formatter.format(self.record))
+        self.assertEqual(content["sample_rate"], 0.25)
@@ -1,13 +1,13 @@
 import unittest
 from datetime import datetime
-from unittest.mock import ANY
+from unittest.mock import ANY, Mock
 import orjson
 
 from freezegun import freeze_time
 
 from aiologger.formatters.json import JsonFormatter
 from aiologger.records import LogRecord
-from aiologger.utils import CallableWrapper
+from aiologger.utils import CallableWrapper, Lazy
 
 
 class JsonFormatterTests(unittest.TestCase):
@@ -156,6 +156,14 @@ class DefaultHandlerTests(unittest.TestCase):
         result = self.formatter._default_handler(obj)
         self.assertEqual(result, "Xablau")
 
+    def test_it_calls_lazy_objects_only_once(self):
+        func = Mock(return_value="Xablau")
+        obj = Lazy(func, 1, foo="bar")
+
+        self.assertEqual(self.formatter._default_handler(obj), "Xablau")
+        self.assertEqual(self.formatter._default_handler(obj), "Xablau")
+        func.assert_called_once_with(1, foo="bar")
+
     def test_it_typecasts_object_to_string_if_type_doesnt_match_anything(self):
         obj = 4.2
         result = self.formatter._default_handler(obj)
@@ -1,8 +1,10 @@
 import asyncio
 import datetime
+import gzip
 import os
 import time
-from tempfile import NamedTemporaryFile
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 from unittest.mock import patch
 
 import asynctest
@@ -10,18 +12,26 @@ from aiofiles.threadpool import AsyncTextIOWrapper
 from asynctest import CoroutineMock, Mock
 from freezegun import freeze_time
 
+from aiologger.compression import Compression, FileCompressor
 from aiologger.formatters.base import Formatter
 from aiologger.handlers.files import (
     AsyncFileHandler,
+    AsyncRotatingFileHandler,
+    AsyncWatchedFileHandler,
     BaseAsyncRotatingFileHandler,
+    DurabilityPolicy,
     AsyncTimedRotatingFileHandler,
     RolloverInterval,
+    RotationNaming,
+    SyncStats,
     ONE_WEEK_IN_SECONDS,
     ONE_DAY_IN_SECONDS,
     ONE_MINUTE_IN_SECONDS,
     ONE_HOUR_IN_SECONDS,
 )
+from aiologger.levels import LogLevel
 from aiologger.records import LogRecord
+from aiologger.writers import WriterThread
 from tests.utils import make_log_record
 
 
@@ -109,6 +119,330 @@ class AsyncFileHandlerTests(asynctest.TestCase):
             open.assert_awaited_once()
 
 
+class BufferedAsyncFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_file = NamedTemporaryFile()
+
+    async def tearDown(self):
+        self.temp_file.close()
+
+    def read_file(self):
+        with open(self.temp_file.name) as fp:
+            return fp.read()
+
+    async def test_records_are_written_at_once_after_the_flush_interval(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, buffered=True, flush_interval=0.05
+        )
+        await handler._init_writer()
+
+        write = CoroutineMock(side_effect=handler.stream.write)
+        with asynctest.patch.object(handler.stream, "write", write):
+            for i in range(3):
+                await handler.emit(make_log_record(msg=f"Xablau {i}"))
+            self.assertEqual(self.read_file(), "")
+
+            await asyncio.sleep(0.1)
+
+        write.assert_awaited_once_with("Xablau 0\nXablau 1\nXablau 2\n")
+        self.assertEqual(self.read_file(), "Xablau 0\nXablau 1\nXablau 2\n")
+        await handler.close()
+
+    async def test_buffer_is_written_once_it_reaches_max_buffer_size(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name,
+            buffered=True,
+            max_buffer_size=14,
+            flush_interval=60,
+        )
+
+        await handler.emit(make_log_record(msg="Xablau"))
+        self.assertEqual(self.read_file(), "")
+        await handler.emit(make_log_record(msg="Xablau"))
+
+        self.assertEqual(self.read_file(), "Xablau\nXablau\n")
+        self.assertIsNone(handler._buffer_writer)
+        await handler.close()
+
+    async def test_records_at_the_flush_level_are_written_right_away(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, buffered=True, flush_interval=60
+        )
+
+        await handler.emit(make_log_record(msg="Xablau", levelno=20))
+        await handler.emit(make_log_record(msg="Xena", levelno=40))
+
+        self.assertEqual(self.read_file(), "Xablau\nXena\n")
+        await handler.close()
+
+    async def test_close_writes_the_buffered_records(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, buffered=True, flush_interval=60
+        )
+
+        await handler.emit(make_log_record(msg="Xablau"))
+        await handler.close()
+
+        self.assertEqual(self.read_file(), "Xablau\n")
+
+    async def test_close_waits_for_a_batch_being_written(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, buffered=True, flush_interval=0.01
+        )
+        await handler._init_writer()
+        writing = asyncio.Event()
+        release = asyncio.Event()
+        write = handler.stream.write
+
+        async def slow_write(data):
+            writing.set()
+            await release.wait()
+            await write(data)
+
+        with asynctest.patch.object(handler.stream, "write", slow_write):
+            await handler.emit(make_log_record(msg="Xablau"))
+            await writing.wait()
+            close = asyncio.ensure_future(handler.close())
+            await asyncio.sleep(0.01)
+            self.assertFalse(close.done())
+
+            release.set()
+            await close
+
+        self.assertEqual(self.read_file(), "Xablau\n")
+
+    async def test_flush_writes_the_buffered_records(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, buffered=True, flush_interval=60
+        )
+
+        await handler.emit(make_log_record(msg="Xablau"))
+        await handler.flush()
+
+        self.assertEqual(self.read_file(), "Xablau\n")
+        await handler.close()
+
+
+class PreallocatedAsyncFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "app.log")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_file(self, path):
+        with open(path) as fp:
+            return fp.read()
+
+    async def test_close_truncates_the_file_to_the_written_length(self):
+        handler = AsyncFileHandler(self.file_path, preallocate=4096)
+        await handler.emit(make_log_record(msg="Xablau"))
+        self.assertEqual(os.path.getsize(self.file_path), 4096)
+        await handler.close()
+
+        self.assertEqual(self.read_file(self.file_path), "Xablau\n")
+
+    async def test_rotated_files_are_truncated_to_the_written_length(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=5, backup_count=1, preallocate=4096
+        )
+        for msg in ("1-abc", "2-abc", "3-abc"):
+            await handler.emit(make_log_record(msg=msg))
+            if handler._rollover_task is not None:
+                await handler._rollover_task
+        self.assertEqual(handler._size, 6)
+        await handler.close()
+
+        self.assertEqual(
+            self.read_file(self.file_path + ".1"), "1-abc\n2-abc\n"
+        )
+        self.assertEqual(self.read_file(self.file_path), "3-abc\n")
+
+    async def test_preallocate_cant_be_used_with_a_writer_thread(self):
+        with self.assertRaises(ValueError):
+            AsyncFileHandler(
+                self.file_path, preallocate=4096, writer_thread=WriterThread()
+            )
+
+
+class DurableAsyncFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "app.log")
+        self.fdatasync = Mock(side_effect=os.fsync)
+        patcher = patch("aiologger.handlers.files._fdatasync", self.fdatasync)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_records_arent_synced_by_default(self):
+        handler = AsyncFileHandler(self.file_path)
+        await handler.emit(make_log_record(msg="Xablau"))
+        await handler.close()
+
+        self.fdatasync.assert_not_called()
+        self.assertEqual(handler.sync_stats.count, 0)
+
+    async def test_concurrent_records_share_syncs_with_group_commit(self):
+        def slow_fdatasync(fd):
+            time.sleep(0.05)
+            os.fsync(fd)
+
+        self.fdatasync.side_effect = slow_fdatasync
+        handler = AsyncFileHandler(
+            self.file_path, durability=DurabilityPolicy.GROUP_COMMIT
+        )
+        await handler._init_writer()
+        await asyncio.gather(
+            *(handler.emit(make_log_record(msg="Xablau")) for _ in range(20))
+        )
+
+        self.assertGreaterEqual(self.fdatasync.call_count, 1)
+        self.assertLessEqual(self.fdatasync.call_count, 2)
+        self.assertEqual(handler.sync_stats.count, self.fdatasync.call_count)
+        self.assertGreaterEqual(handler.sync_stats.max_time, 0.05)
+        await handler.close()
+
+    async def test_only_records_at_the_sync_level_wait_for_a_sync(self):
+        handler = AsyncFileHandler(
+            self.file_path,
+            durability=DurabilityPolicy.LEVEL,
+            sync_level=LogLevel.ERROR,
+        )
+        await handler.emit(make_log_record(msg="Xablau", levelno=LogLevel.INFO))
+        self.fdatasync.assert_not_called()
+
+        await handler.emit(make_log_record(msg="Xena", levelno=LogLevel.ERROR))
+        self.fdatasync.assert_called_once_with(handler.stream.fileno())
+        await handler.close()
+
+    async def test_records_are_synced_in_the_background_with_interval(self):
+        handler = AsyncFileHandler(
+            self.file_path,
+            durability=DurabilityPolicy.INTERVAL,
+            sync_interval=0.01,
+        )
+        for _ in range(3):
+            await handler.emit(make_log_record(msg="Xablau"))
+        self.fdatasync.assert_not_called()
+
+        await asyncio.sleep(0.05)
+        self.fdatasync.assert_called_once()
+        await handler.close()
+
+    async def test_close_syncs_the_file(self):
+        handler = AsyncFileHandler(
+            self.file_path,
+            durability=DurabilityPolicy.INTERVAL,
+            sync_interval=60,
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+        await handler.close()
+
+        self.fdatasync.assert_called_once()
+
+    async def test_syncs_run_on_the_writer_thread(self):
+        writer_thread = WriterThread()
+        self.addCleanup(writer_thread.stop)
+        handler = AsyncFileHandler(
+            self.file_path,
+            writer_thread=writer_thread,
+            durability=DurabilityPolicy.GROUP_COMMIT,
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+
+        self.fdatasync.assert_called_once()
+        self.assertEqual(self.fdatasync.call_args[0][0], handler.stream.fd)
+        await handler.close()
+
+    def test_sync_stats(self):
+        stats = SyncStats()
+        self.assertEqual(stats.mean_time, 0.0)
+
+        stats.record(0.01)
+        stats.record(0.03)
+
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.mean_time, 0.02)
+        self.assertEqual(stats.max_time, 0.03)
+        self.assertEqual(stats.last_time, 0.03)
+
+
+class AsyncWatchedFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "app.log")
+        self.rotated_path = self.file_path + ".1"
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_file(self, path):
+        with open(path) as fp:
+            return fp.read()
+
+    async def test_it_reopens_the_file_after_it_is_renamed(self):
+        handler = AsyncWatchedFileHandler(self.file_path, check_interval=0)
+        await handler.emit(make_log_record(msg="Xablau"))
+        os.rename(self.file_path, self.rotated_path)
+        await handler.emit(make_log_record(msg="Xena"))
+        await handler.close()
+
+        self.assertEqual(self.read_file(self.rotated_path), "Xablau\n")
+        self.assertEqual(self.read_file(self.file_path), "Xena\n")
+
+    async def test_it_reopens_the_file_after_it_is_deleted(self):
+        handler = AsyncWatchedFileHandler(self.file_path, check_interval=0)
+        await handler.emit(make_log_record(msg="Xablau"))
+        os.unlink(self.file_path)
+        await handler.emit(make_log_record(msg="Xena"))
+        await handler.close()
+
+        self.assertEqual(self.read_file(self.file_path), "Xena\n")
+
+    async def test_the_file_is_checked_at_most_once_per_interval(self):
+        handler = AsyncWatchedFileHandler(self.file_path, check_interval=60)
+        await handler.emit(make_log_record(msg="Xablau"))
+        os.rename(self.file_path, self.rotated_path)
+        with patch("aiologger.handlers.files.os.stat") as stat:
+            await handler.emit(make_log_record(msg="Xena"))
+        await handler.close()
+
+        stat.assert_not_called()
+        self.assertEqual(self.read_file(self.rotated_path), "Xablau\nXena\n")
+
+    async def test_the_file_is_checked_after_check_bytes(self):
+        handler = AsyncWatchedFileHandler(
+            self.file_path, check_interval=60, check_bytes=10
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+        os.rename(self.file_path, self.rotated_path)
+        await handler.emit(make_log_record(msg="Xena"))
+        await handler.emit(make_log_record(msg="Xablau again"))
+        await handler.close()
+
+        self.assertEqual(self.read_file(self.rotated_path), "Xablau\nXena\n")
+        self.assertEqual(self.read_file(self.file_path), "Xablau again\n")
+
+    async def test_buffered_records_are_written_to_the_new_file_in_order(self):
+        handler = AsyncWatchedFileHandler(
+            self.file_path, check_interval=0, buffered=True, flush_interval=60
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+        os.rename(self.file_path, self.rotated_path)
+        await handler.emit(make_log_record(msg="Xena"))
+        await handler.emit(make_log_record(msg="Xablau again"))
+        await handler.close()
+
+        self.assertEqual(self.read_file(self.rotated_path), "")
+        self.assertEqual(
+            self.read_file(self.file_path), "Xablau\nXena\nXablau again\n"
+        )
+
+
 class BaseAsyncRotatingFileHandlerTests(asynctest.TestCase):
     async def setUp(self):
         self.temp_file = NamedTemporaryFile(delete=False)
@@ -308,9 +642,12 @@ class AsyncTimedRotatingFileHandlerTests(asynctest.TestCase):
                 backup_count=1,
             )
             with patch.object(handler, "_delete_files", CoroutineMock()):
-                for _ in range(3):
-                    await handler.emit(self.log_record)
+                await handler.emit(self.log_record)
+                for _ in range(2):
                     frozen_datetime.tick()
+                    await handler.do_rollover()
+                # Old files are deleted in the background
+                await handler._janitor.join()
                 handler._delete_files.assert_awaited_once()
 
             await handler.close()
@@ -341,30 +678,62 @@ class AsyncTimedRotatingFileHandlerTests(asynctest.TestCase):
         )
         self.assertEqual(await handler.get_files_to_delete(), [])
 
-    async def test_rollover_deletes_the_next_destination_file_path_if_it_already_exists(
+    async def test_rollover_keeps_a_file_that_already_has_the_destination_name(
         self
     ):
+        existing_file_path = f"{self.temp_file.name}.2019-01-20_20-22-49"
+        with open(existing_file_path, "w") as fp:
+            fp.write("Xena\n")
+        self.files_to_remove += [existing_file_path, existing_file_path + ".1"]
+
         with freeze_time("2019-01-20 20:22:49") as frozen_datetime:
             with patch(
                 "aiologger.handlers.files.os.stat",
                 return_value=Mock(st_mtime=time.time()),
-            ), patch("aiologger.handlers.files.os.unlink") as unlink:
-                new_file_path = f"{self.temp_file.name}.2019-01-20_20-22-49"
-                os.open(new_file_path, os.O_CREAT)
-
-                self.assertTrue(os.path.exists(new_file_path))
+            ):
                 handler = AsyncTimedRotatingFileHandler(
                     filename=self.temp_file.name,
                     when=RolloverInterval.SECONDS,
-                    backup_count=1,
                     utc=True,
                 )
-                frozen_datetime.tick()
-                await handler.emit(self.log_record)
+            frozen_datetime.tick()
+            await handler.emit(self.log_record)
+            await handler.close()
 
-                unlink.assert_called_once_with(new_file_path)
+        with open(existing_file_path) as fp:
+            self.assertEqual(fp.read(), "Xena\n")
+        self.assertTrue(os.path.exists(existing_file_path + ".1"))
 
-        await handler.close()
+    async def test_rollover_keeps_a_compressed_backup_with_the_destination_name(
+        self
+    ):
+        backup_path = f"{self.temp_file.name}.2019-01-20_20-22-49.gz"
+        with gzip.open(backup_path, "wt") as fp:
+            fp.write("Xena\n")
+        self.files_to_remove += [backup_path, backup_path[:-3] + ".1.gz"]
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        with freeze_time("2019-01-20 20:22:49") as frozen_datetime:
+            with patch(
+                "aiologger.handlers.files.os.stat",
+                return_value=Mock(st_mtime=time.time()),
+            ):
+                handler = AsyncTimedRotatingFileHandler(
+                    filename=self.temp_file.name,
+                    when=RolloverInterval.SECONDS,
+                    utc=True,
+                    compressor=FileCompressor(
+                        Compression.GZIP, executor=executor
+                    ),
+                )
+            frozen_datetime.tick()
+            await handler.emit(self.log_record)
+            await handler.close()
+
+        with gzip.open(backup_path, "rt") as fp:
+            self.assertEqual(fp.read(), "Xena\n")
+        self.assertTrue(os.path.exists(backup_path[:-3] + ".1.gz"))
 
     async def test_rollover_happens_before_a_logline_is_emitted(self):
         handler = AsyncTimedRotatingFileHandler(
@@ -383,6 +752,123 @@ class AsyncTimedRotatingFileHandlerTests(asynctest.TestCase):
         await handler.emit(record)
         await handler.close()
 
+    async def test_rollover_is_scheduled_on_a_loop_timer(self):
+        handler = AsyncTimedRotatingFileHandler(
+            filename=self.temp_file.name, when=RolloverInterval.HOURS
+        )
+        await handler.emit(self.log_record)
+
+        with patch.object(handler, "should_rollover") as should_rollover:
+            await handler.emit(self.log_record)
+            should_rollover.assert_not_called()
+
+        delay = handler._rollover_timer.when() - self.loop.time()
+        self.assertAlmostEqual(
+            delay, handler.rollover_at - time.time(), delta=0.1
+        )
+        await handler.close()
+        self.assertIsNone(handler._rollover_timer)
+
+    async def test_the_rollover_timer_rotates_the_file(self):
+        handler = AsyncTimedRotatingFileHandler(
+            filename=self.temp_file.name, when=RolloverInterval.SECONDS
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+
+        with patch.object(
+            handler, "do_rollover", CoroutineMock()
+        ) as do_rollover:
+            handler.rollover_at = int(time.time())
+            handler._schedule_rollover()
+            await asyncio.sleep(0.01)
+
+        do_rollover.assert_awaited_once()
+        await handler.close()
+
+    async def test_idle_intervals_dont_rotate_empty_files(self):
+        with freeze_time() as frozen_datetime:
+            handler = AsyncTimedRotatingFileHandler(
+                filename=self.temp_file.name,
+                when=RolloverInterval.SECONDS,
+                backup_count=2,
+            )
+            await handler.emit(make_log_record(msg="Xablau"))
+            for _ in range(5):
+                frozen_datetime.tick()
+                await handler._timed_rollover()
+            self.assertFalse(handler._rollover_scheduled)
+
+            await handler.emit(make_log_record(msg="Xena"))
+            self.assertGreater(handler.rollover_at, time.time())
+            self.assertIsNotNone(handler._rollover_timer)
+            await handler.close()
+
+        directory, name = os.path.split(self.temp_file.name)
+        backups = [
+            os.path.join(directory, file_name)
+            for file_name in os.listdir(directory)
+            if file_name.startswith(name + ".")
+        ]
+        self.files_to_remove.extend(backups)
+        self.assertEqual(len(backups), 1)
+        with open(backups[0]) as fp:
+            self.assertEqual(fp.read(), "Xablau\n")
+        with open(self.temp_file.name) as fp:
+            self.assertEqual(fp.read(), "Xena\n")
+
+    async def test_the_first_record_rotates_holding_the_rollover_lock(self):
+        handler = AsyncTimedRotatingFileHandler(
+            filename=self.temp_file.name, when=RolloverInterval.SECONDS
+        )
+        handler.rollover_at = int(time.time())
+        locked = []
+
+        async def do_rollover():
+            locked.append(handler._get_rollover_lock().locked())
+
+        with patch.object(handler, "do_rollover", do_rollover):
+            await handler.emit(self.log_record)
+
+        self.assertEqual(locked, [True])
+        await handler.close()
+
+    async def test_records_logged_during_a_rollover_dont_wait_for_it(self):
+        handler = AsyncTimedRotatingFileHandler(
+            filename=self.temp_file.name, when=RolloverInterval.SECONDS
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+        old_stream = handler.stream
+        renamed = asyncio.Event()
+        release = asyncio.Event()
+        rotate = handler.rotate
+
+        async def slow_rotate(source, dest):
+            self.files_to_remove.append(dest)
+            await rotate(source, dest)
+            renamed.set()
+            await release.wait()
+
+        with patch.object(handler, "rotate", slow_rotate):
+            rollover = asyncio.ensure_future(handler.do_rollover())
+            await renamed.wait()
+            await asyncio.wait_for(
+                handler.emit(make_log_record(msg="Xena")), timeout=1
+            )
+            self.assertIs(handler.stream, old_stream)
+
+            release.set()
+            await rollover
+
+        self.assertIsNot(handler.stream, old_stream)
+        self.assertTrue(old_stream.closed)
+        await handler.emit(make_log_record(msg="Xablau again"))
+        await handler.close()
+
+        with open(self.files_to_remove[-1]) as fp:
+            self.assertEqual(fp.read(), "Xablau\nXena\n")
+        with open(self.temp_file.name) as fp:
+            self.assertEqual(fp.read(), "Xablau again\n")
+
     async def test_invalid_rotation_interval(self):
         for invalid_interval in ("X", "W", "W7", "Xablau"):
             with self.assertRaises(ValueError):
@@ -534,3 +1020,486 @@ class AsyncTimedRotatingFileHandlerTests(asynctest.TestCase):
     #         rollover_at = handler.compute_rollover(current_time)
     #         self.assertEqual()
     #         # ta dificil !
+
+
+class AsyncRotatingFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "app.log")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def list_files(self):
+        return sorted(os.listdir(self.temp_dir.name))
+
+    def read_file(self, name):
+        with open(os.path.join(self.temp_dir.name, name)) as fp:
+            return fp.read()
+
+    async def emit(self, handler, msg):
+        await handler.emit(make_log_record(msg=msg))
+        if handler._rollover_task is not None:
+            await handler._rollover_task
+
+    async def test_size_is_tracked_from_the_size_of_the_file_when_opened(self):
+        with open(self.file_path, "w") as fp:
+            fp.write("12345\n")
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=100, backup_count=1
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+        self.assertEqual(handler._size, 13)
+
+        with patch("aiologger.handlers.files.os.stat") as stat:
+            await handler.emit(make_log_record(msg="Xena"))
+        stat.assert_not_called()
+        self.assertEqual(handler._size, 18)
+        await handler.close()
+
+    async def test_numbered_rollover_keeps_backup_count_files(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=5, backup_count=2
+        )
+        for msg in ("1-abc", "2-abc", "3-abc", "4-abc", "5-abc", "6-abc"):
+            await self.emit(handler, msg)
+        await handler.close()
+
+        self.assertEqual(
+            self.list_files(), ["app.log", "app.log.1", "app.log.2"]
+        )
+        self.assertEqual(self.read_file("app.log"), "")
+        self.assertEqual(self.read_file("app.log.1"), "5-abc\n6-abc\n")
+        self.assertEqual(self.read_file("app.log.2"), "3-abc\n4-abc\n")
+
+    async def test_non_ascii_records_are_counted_in_bytes(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=30, backup_count=2, encoding="utf-8"
+        )
+        for _ in range(6):
+            # 8 characters, 22 bytes
+            await self.emit(handler, "日本語テキスト")
+        await handler.close()
+
+        self.assertEqual(
+            self.list_files(), ["app.log", "app.log.1", "app.log.2"]
+        )
+        # The third record finds 44 bytes, over max_bytes, and starts the
+        # rollover. Counted in characters, it would be the fifth.
+        for name in ("app.log.1", "app.log.2"):
+            size = os.path.getsize(os.path.join(self.temp_dir.name, name))
+            self.assertEqual(size, 3 * 22)
+
+    async def test_numbered_rollover_requires_a_backup_count(self):
+        handler = AsyncRotatingFileHandler(self.file_path, max_bytes=5)
+        for msg in ("1-abc", "2-abc"):
+            await self.emit(handler, msg)
+        await handler.close()
+
+        self.assertEqual(self.list_files(), ["app.log"])
+        self.assertEqual(self.read_file("app.log"), "1-abc\n2-abc\n")
+
+    async def test_records_are_written_to_the_current_file_during_a_rollover(
+        self
+    ):
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=5, backup_count=1
+        )
+        await handler.emit(make_log_record(msg="1-abc"))
+        await handler.emit(make_log_record(msg="2-abc"))
+        await handler.emit(make_log_record(msg="3-abc"))
+        self.assertIsNotNone(handler._rollover_task)
+        await handler.close()
+
+        self.assertEqual(self.read_file("app.log.1"), "1-abc\n2-abc\n3-abc\n")
+
+    @freeze_time("2020-01-01 10:00:00")
+    async def test_timestamped_rollover_names_files_for_the_rotation_time(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            naming=RotationNaming.TIMESTAMPED,
+            utc=True,
+            namer=lambda name: name + ".log",
+        )
+        for msg in ("1-abc", "2-abc", "3-abc", "4-abc"):
+            await self.emit(handler, msg)
+        await handler.close()
+
+        self.assertEqual(
+            self.list_files(),
+            [
+                "app.log",
+                "app.log.2020-01-01_10-00-00.1.log",
+                "app.log.2020-01-01_10-00-00.log",
+            ],
+        )
+        self.assertEqual(
+            self.read_file("app.log.2020-01-01_10-00-00.log"), "1-abc\n2-abc\n"
+        )
+
+    async def test_timestamped_rollover_deletes_the_oldest_backups(self):
+        for name in (
+            "app.log.2020-01-01_10-00-00",
+            "app.log.2020-01-02_10-00-00",
+        ):
+            open(os.path.join(self.temp_dir.name, name), "w").close()
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            backup_count=2,
+            naming=RotationNaming.TIMESTAMPED,
+        )
+        for msg in ("1-abc", "2-abc"):
+            await self.emit(handler, msg)
+        await handler.close()
+
+        files = self.list_files()
+        self.assertEqual(len(files), 3)
+        self.assertNotIn("app.log.2020-01-01_10-00-00", files)
+        self.assertIn("app.log.2020-01-02_10-00-00", files)
+
+    async def test_backups_over_max_total_bytes_are_deleted(self):
+        for name in (
+            "app.log.2020-01-01_10-00-00",
+            "app.log.2020-01-02_10-00-00",
+        ):
+            with open(os.path.join(self.temp_dir.name, name), "w") as fp:
+                fp.write("xablau\n")
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            naming=RotationNaming.TIMESTAMPED,
+            max_total_bytes=13,
+        )
+        for msg in ("1-abc", "2-abc"):
+            await self.emit(handler, msg)
+        await handler._janitor.join()
+        await handler.close()
+
+        files = self.list_files()
+        self.assertEqual(len(files), 2)
+        self.assertNotIn("app.log.2020-01-01_10-00-00", files)
+        self.assertNotIn("app.log.2020-01-02_10-00-00", files)
+
+    async def test_backups_older_than_max_age_are_deleted(self):
+        old_backup = os.path.join(
+            self.temp_dir.name, "app.log.2020-01-01_10-00-00"
+        )
+        open(old_backup, "w").close()
+        os.utime(old_backup, (time.time() - 120, time.time() - 120))
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            naming=RotationNaming.TIMESTAMPED,
+            max_age=60,
+        )
+        for msg in ("1-abc", "2-abc"):
+            await self.emit(handler, msg)
+        await handler._janitor.join()
+        await handler.close()
+
+        self.assertFalse(os.path.exists(old_backup))
+        self.assertEqual(len(self.list_files()), 2)
+
+    async def test_backups_are_deleted_by_age_not_by_name(self):
+        now = time.time()
+        names = [
+            "app.log.2020-01-01_10-00-10.gz",
+            "app.log.2020-01-01_10-00-10.2.gz",
+            "app.log.2020-01-01_10-00-10.10.gz",
+        ]
+        for age, name in zip((30, 20, 10), names):
+            path = os.path.join(self.temp_dir.name, name)
+            open(path, "w").close()
+            os.utime(path, (now - age, now - age))
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            backup_count=3,
+            naming=RotationNaming.TIMESTAMPED,
+        )
+        for msg in ("1-abc", "2-abc"):
+            await self.emit(handler, msg)
+        await handler._janitor.join()
+        await handler.close()
+
+        files = self.list_files()
+        self.assertEqual(len(files), 4)
+        self.assertNotIn(names[0], files)
+        self.assertIn(names[2], files)
+
+    async def test_numbered_backups_over_max_total_bytes_are_deleted(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path, max_bytes=5, backup_count=10, max_total_bytes=25
+        )
+        for i in range(12):
+            await self.emit(handler, f"{i:02d}-ab")
+            if handler._janitor is not None:
+                await handler._janitor.join()
+        await handler.close()
+
+        self.assertEqual(
+            self.list_files(), ["app.log", "app.log.1", "app.log.2"]
+        )
+        self.assertEqual(self.read_file("app.log.1"), "10-ab\n11-ab\n")
+
+    async def test_the_log_directory_is_only_listed_once(self):
+        handler = AsyncRotatingFileHandler(
+            self.file_path,
+            max_bytes=5,
+            backup_count=1,
+            naming=RotationNaming.TIMESTAMPED,
+        )
+        with patch(
+            "aiologger.handlers.files.os.listdir", side_effect=os.listdir
+        ) as listdir:
+            for msg in ("1-abc", "2-abc", "3-abc", "4-abc", "5-abc", "6-abc"):
+                await self.emit(handler, msg)
+                if handler._janitor is not None:
+                    await handler._janitor.join()
+        await handler.close()
+
+        listdir.assert_called_once()
+        self.assertEqual(len(self.list_files()), 2)
+
+    async def test_rotated_files_are_compressed_in_the_background(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            handler = AsyncRotatingFileHandler(
+                self.file_path,
+                max_bytes=5,
+                backup_count=2,
+                compressor=FileCompressor(Compression.GZIP, executor=executor),
+            )
+            for msg in ("1-abc", "2-abc", "3-abc", "4-abc", "5-abc"):
+                await self.emit(handler, msg)
+            await handler.close()
+
+        self.assertEqual(
+            self.list_files(), ["app.log", "app.log.1.gz", "app.log.2.gz"]
+        )
+        path = os.path.join(self.temp_dir.name, "app.log.2.gz")
+        with gzip.open(path, "rt") as fp:
+            self.assertEqual(fp.read(), "1-abc\n2-abc\n")
+
+    async def test_compressed_backups_count_towards_backup_count(self):
+        for name in (
+            "app.log.2020-01-01_10-00-00.gz",
+            "app.log.2020-01-02_10-00-00.gz",
+        ):
+            open(os.path.join(self.temp_dir.name, name), "w").close()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            handler = AsyncRotatingFileHandler(
+                self.file_path,
+                max_bytes=5,
+                backup_count=2,
+                naming=RotationNaming.TIMESTAMPED,
+                compressor=FileCompressor(Compression.GZIP, executor=executor),
+            )
+            for msg in ("1-abc", "2-abc"):
+                await self.emit(handler, msg)
+            await handler.close()
+
+        files = self.list_files()
+        self.assertEqual(len(files), 3)
+        self.assertNotIn("app.log.2020-01-01_10-00-00.gz", files)
+        self.assertTrue(files[-1].endswith(".gz"))
+
+    @freeze_time()
+    async def test_compressed_backups_are_never_replaced(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            handler = AsyncRotatingFileHandler(
+                self.file_path,
+                max_bytes=5,
+                naming=RotationNaming.TIMESTAMPED,
+                compressor=FileCompressor(Compression.GZIP, executor=executor),
+            )
+            for i in range(6):
+                await self.emit(handler, f"{i}-abc")
+                await handler._wait_compressions()
+            await handler.close()
+
+        backups = [name for name in self.list_files() if name != "app.log"]
+        self.assertEqual(len(backups), 3)
+        self.assertTrue(all(name.endswith(".gz") for name in backups))
+
+    async def test_timed_handler_also_rolls_over_by_size(self):
+        handler = AsyncTimedRotatingFileHandler(
+            self.file_path, when=RolloverInterval.HOURS, utc=True, max_bytes=5
+        )
+        for msg in ("1-abc", "2-abc", "3-abc", "4-abc"):
+            await self.emit(handler, msg)
+        rollover_at = handler.rollover_at
+        interval_file_name = os.path.basename(
+            handler._get_interval_file_path(int(time.time()))
+        )
+        await handler.close()
+
+        self.assertEqual(handler.rollover_at, rollover_at)
+        self.assertEqual(
+            self.list_files(),
+            ["app.log", interval_file_name, interval_file_name + ".1"],
+        )
+        self.assertEqual(self.read_file(interval_file_name), "1-abc\n2-abc\n")
+        self.assertEqual(
+            self.read_file(interval_file_name + ".1"), "3-abc\n4-abc\n"
+        )
+
+
+class ProcessSafeRotatingFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "app.log")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def list_files(self):
+        return sorted(os.listdir(self.temp_dir.name))
+
+    def read_file(self, name):
+        with open(os.path.join(self.temp_dir.name, name)) as fp:
+            return fp.read()
+
+    async def test_a_single_process_rotates_the_file_on_time(self):
+        # Each handler stands for a process, with its own lock file fd
+        handlers = [
+            AsyncTimedRotatingFileHandler(
+                self.file_path,
+                when=RolloverInterval.HOURS,
+                utc=True,
+                process_safe=True,
+            )
+            for _ in range(2)
+        ]
+        for handler in handlers:
+            await handler.emit(make_log_record(msg="Xablau"))
+        for handler in handlers:
+            handler.rollover_at = int(time.time())
+            await handler.do_rollover()
+            self.assertGreater(handler.rollover_at, time.time())
+        for handler in handlers:
+            await handler.emit(make_log_record(msg="Xena"))
+            await handler.close()
+
+        files = self.list_files()
+        self.assertEqual(len(files), 3)
+        self.assertIn("app.log.lock", files)
+        rotated = next(f for f in files if f not in ("app.log", "app.log.lock"))
+        self.assertEqual(self.read_file(rotated), "Xablau\nXablau\n")
+        self.assertEqual(self.read_file("app.log"), "Xena\nXena\n")
+
+    async def test_other_processes_reopen_the_rotated_file_lazily(self):
+        rotating, other = [
+            AsyncRotatingFileHandler(
+                self.file_path,
+                max_bytes=10,
+                backup_count=1,
+                process_safe=True,
+                check_interval=0,
+            )
+            for _ in range(2)
+        ]
+        await rotating.emit(make_log_record(msg="Xablau"))
+        await other.emit(make_log_record(msg="Xena"))
+        await rotating.do_rollover()
+        await other.do_rollover()
+        await other.emit(make_log_record(msg="Xablau again"))
+        await rotating.close()
+        await other.close()
+
+        self.assertEqual(self.read_file("app.log.1"), "Xablau\nXena\n")
+        self.assertEqual(self.read_file("app.log"), "Xablau again\n")
+
+    async def test_size_includes_the_writes_of_other_processes(self):
+        handler, other = [
+            AsyncRotatingFileHandler(
+                self.file_path,
+                max_bytes=100,
+                backup_count=1,
+                process_safe=True,
+                check_interval=0,
+            )
+            for _ in range(2)
+        ]
+        await handler.emit(make_log_record(msg="Xablau"))
+        await other.emit(make_log_record(msg="Xena"))
+        await handler.emit(make_log_record(msg="Xablau"))
+
+        self.assertEqual(handler._size, 19)
+        await handler.close()
+        await other.close()
+
+    async def test_records_with_lines_over_the_atomic_write_size_can_be_refused(
+        self
+    ):
+        handler = AsyncTimedRotatingFileHandler(
+            self.file_path,
+            process_safe=True,
+            atomic_write_size=8,
+            split_long_lines=False,
+        )
+        handler.handle_error = CoroutineMock()
+        await handler.emit(make_log_record(msg="Xablau"))
+        await handler.emit(make_log_record(msg="Xablau Xena"))
+        await handler.close()
+
+        handler.handle_error.assert_awaited_once()
+        self.assertEqual(self.read_file("app.log"), "Xablau\n")
+
+    async def test_process_safe_mode_cant_use_a_writer_thread(self):
+        with self.assertRaises(ValueError):
+            AsyncTimedRotatingFileHandler(
+                self.file_path, process_safe=True, writer_thread=WriterThread()
+            )
+
+
+class WriterThreadAsyncFileHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_file = NamedTemporaryFile()
+        self.writer_thread = WriterThread()
+
+    async def tearDown(self):
+        self.writer_thread.stop()
+        self.temp_file.close()
+
+    async def test_records_are_written_by_the_writer_thread(self):
+        handler = AsyncFileHandler(
+            filename=self.temp_file.name, writer_thread=self.writer_thread
+        )
+
+        with patch("aiologger.handlers.files.aiofiles.open") as open_:
+            await handler.emit(make_log_record(msg="Xablau"))
+            await handler.emit(make_log_record(msg="Xena"))
+        await handler.close()
+
+        open_.assert_not_called()
+        with open(self.temp_file.name) as fp:
+            self.assertEqual(fp.read(), "Xablau\nXena\n")
+
+    async def test_rotating_handlers_reopen_the_file_on_the_writer_thread(self):
+        handler = AsyncTimedRotatingFileHandler(
+            filename=self.temp_file.name,
+            when=RolloverInterval.SECONDS,
+            writer_thread=self.writer_thread,
+        )
+        await handler.emit(make_log_record(msg="Xablau"))
+
+        await handler.do_rollover()
+        await handler.emit(make_log_record(msg="Xena"))
+        await handler.close()
+
+        rotated = [
+            name
+            for name in os.listdir(os.path.dirname(self.temp_file.name))
+            if name.startswith(os.path.basename(self.temp_file.name) + ".")
+        ]
+        self.assertEqual(len(rotated), 1)
+        rotated_path = os.path.join(
+            os.path.dirname(self.temp_file.name), rotated[0]
+        )
+        with open(rotated_path) as fp:
+            self.assertEqual(fp.read(), "Xablau\n")
+        with open(self.temp_file.name) as fp:
+            self.assertEqual(fp.read(), "Xena\n")
+        os.unlink(rotated_path)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+from tempfile import TemporaryDirectory
+
+import asynctest
+from asynctest import CoroutineMock, Mock, patch
+
+from aiologger.collector import LogCollector
+from aiologger.handlers.sockets import (
+    AsyncUnixSocketHandler,
+    decode_records,
+    encode_record,
+)
+from aiologger.levels import LogLevel
+from aiologger.logger import Logger
+from aiologger.records import ExtendedLogRecord, LogRecord
+
+
+class RecordEncodingTests(asynctest.TestCase):
+    def setUp(self):
+        self.record = LogRecord(
+            name="aiologger",
+            level=20,
+            pathname="/aiologger/tests/test_logger.py",
+            lineno=17,
+            msg="Xablau %s!",
+            exc_info=None,
+            args=("xena",),
+            func="test",
+        )
+
+    def test_records_are_decoded_with_their_merged_message(self):
+        buffer = bytearray(encode_record(self.record))
+
+        (record,) = decode_records(buffer)
+
+        self.assertEqual(record.get_message(), "Xablau xena!")
+        self.assertEqual(record.name, self.record.name)
+        self.assertEqual(record.levelno, self.record.levelno)
+        self.assertEqual(record.pathname, self.record.pathname)
+        self.assertEqual(record.lineno, self.record.lineno)
+        self.assertEqual(record.funcName, self.record.funcName)
+        self.assertEqual(record.created, self.record.created)
+        self.assertEqual(record.process, self.record.process)
+        self.assertEqual(buffer, b"")
+
+    def test_exception_info_is_sent_as_text(self):
+        try:
+            raise ValueError("Xablau")
+        except ValueError as e:
+            self.record.exc_info = (ValueError, e, e.__traceback__)
+
+        (record,) = decode_records(bytearray(encode_record(self.record)))
+
+        self.assertIsNone(record.exc_info)
+        self.assertIn('raise ValueError("Xablau")', record.exc_text)
+
+    def test_extended_records_keep_their_extra_fields(self):
+        extended_record = ExtendedLogRecord(
+            name="aiologger",
+            level=20,
+            pathname="/aiologger/tests/test_logger.py",
+            lineno=17,
+            msg={"foo": "bar"},
+            args=None,
+            exc_info=None,
+            extra={"pod": "xablau-1"},
+            flatten=True,
+            serializer_kwargs={"indent": 2},
+        )
+
+        (record,) = decode_records(bytearray(encode_record(extended_record)))
+
+        self.assertIsInstance(record, ExtendedLogRecord)
+        self.assertEqual(record.msg, {"foo": "bar"})
+        self.assertEqual(record.extra, {"pod": "xablau-1"})
+        self.assertTrue(record.flatten)
+        self.assertEqual(record.serializer_kwargs, {"indent": 2})
+
+    def test_incomplete_frames_are_kept_in_the_buffer(self):
+        frame = encode_record(self.record)
+        buffer = bytearray(frame + frame[:5])
+
+        self.assertEqual(len(decode_records(buffer)), 1)
+        self.assertEqual(buffer, frame[:5])
+
+        buffer += frame[5:]
+        self.assertEqual(len(decode_records(buffer)), 1)
+        self.assertEqual(buffer, b"")
+
+
+class AsyncUnixSocketHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "aiologger.sock")
+        self.collector_handler = Mock(
+            level=LogLevel.NOTSET, handle=CoroutineMock()
+        )
+        collector_logger = Logger()
+        collector_logger.add_handler(self.collector_handler)
+        self.collector = LogCollector(self.path, collector_logger)
+        await self.collector.start()
+
+    async def tearDown(self):
+        await self.collector.close()
+        self.temp_dir.cleanup()
+
+    def received_messages(self):
+        return [
+            c[0][0].get_message()
+            for c in self.collector_handler.handle.call_args_list
+        ]
+
+    async def test_records_are_handled_by_the_collector_in_order(self):
+        handler = AsyncUnixSocketHandler(self.path, flush_interval=60)
+        logger = Logger()
+        logger.add_handler(handler)
+
+        for i in range(100):
+            await logger.info("Xablau %s", i)
+        self.assertEqual(self.received_messages(), [])
+
+        await logger.shutdown()
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            self.received_messages(), [f"Xablau {i}" for i in range(100)]
+        )
+
+    async def test_close_doesnt_wait_for_connected_handlers_forever(self):
+        handler = AsyncUnixSocketHandler(self.path, flush_interval=60)
+        logger = Logger()
+        logger.add_handler(handler)
+        await logger.info("Xablau")
+        await handler.flush()
+        await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(self.collector.close(timeout=0.01), 1)
+
+        self.assertEqual(self.received_messages(), ["Xablau"])
+        await logger.shutdown()
+
+    async def test_buffered_records_are_written_after_the_flush_interval(self):
+        handler = AsyncUnixSocketHandler(self.path, flush_interval=0.01)
+
+        await handler.handle(
+            LogRecord(
+                name="aiologger",
+                level=20,
+                pathname=__file__,
+                lineno=17,
+                msg="Xablau!",
+            )
+        )
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.received_messages(), ["Xablau!"])
+        await handler.close()
+
+    async def test_full_batches_are_written_right_away(self):
+        handler = AsyncUnixSocketHandler(
+            self.path, max_batch_size=1, flush_interval=60
+        )
+        await handler._init_writer()
+
+        with patch.object(handler.writer, "write") as write:
+            await handler.handle(
+                LogRecord(
+                    name="aiologger",
+                    level=20,
+                    pathname=__file__,
+                    lineno=17,
+                    msg="Xablau!",
+                )
+            )
+
+        write.assert_called_once()
+        await handler.close()
+
+    async def test_emit_errors_reset_the_connection(self):
+        handler = AsyncUnixSocketHandler(
+            os.path.join(self.temp_dir.name, "missing.sock")
+        )
+        record = LogRecord(
+            name="aiologger", level=20, pathname=__file__, lineno=17, msg="X"
+        )
+
+        with asynctest.patch.object(handler, "handle_error") as handle_error:
+            await handler.emit(record)
+
+        handle_error.assert_awaited_once()
+        self.assertFalse(handler.initialized)
@@ -9,6 +9,7 @@ from asynctest import CoroutineMock
 from aiologger.handlers.streams import AsyncStreamHandler
 from aiologger.protocols import AiologgerProtocol
 from aiologger.records import LogRecord
+from aiologger.writers import WriterThread
 
 
 class AsyncStreamHandlerTests(asynctest.TestCase):
@@ -187,3 +188,219 @@ class AsyncStreamHandlerTests(asynctest.TestCase):
         ):
             await handler.handle(self.record)
             stderr.write.assert_not_called()
+
+
+class BatchedAsyncStreamHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        self.written = []
+        self.writer = Mock(
+            write=Mock(
+                side_effect=lambda data: self.written.append(bytes(data))
+            ),
+            drain=CoroutineMock(),
+        )
+        patch(
+            "aiologger.handlers.streams.StreamWriter", return_value=self.writer
+        ).start()
+        r_fileno, w_fileno = os.pipe()
+        self.read_pipe = os.fdopen(r_fileno, "r")
+        self.write_pipe = os.fdopen(w_fileno, "w")
+
+    def tearDown(self):
+        self.read_pipe.close()
+        self.write_pipe.close()
+        patch.stopall()
+
+    def make_handler(self, **kwargs):
+        return AsyncStreamHandler(
+            stream=self.write_pipe,
+            formatter=Mock(format=Mock(side_effect=lambda record: record.msg)),
+            batch=True,
+            **kwargs,
+        )
+
+    def make_record(self, msg):
+        return LogRecord(
+            name="aiologger",
+            level=20,
+            pathname="/aiologger/tests/test_logger.py",
+            lineno=17,
+            msg=msg,
+            exc_info=None,
+            args=None,
+        )
+
+    async def test_records_of_a_loop_iteration_are_written_at_once(self):
+        handler = self.make_handler()
+        await handler._init_writer()
+
+        await asyncio.gather(
+            *(handler.emit(self.make_record(f"Xablau {i}")) for i in range(3))
+        )
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.written, [b"Xablau 0\nXablau 1\nXablau 2\n"])
+        self.writer.drain.assert_awaited_once()
+
+    async def test_full_batches_are_written_by_the_emit_that_fills_them(self):
+        handler = self.make_handler(max_batch_records=2)
+
+        await handler.emit(self.make_record("Xablau"))
+        await handler.emit(self.make_record("Xena"))
+
+        self.assertEqual(self.written, [b"Xablau\nXena\n"])
+        self.writer.drain.assert_awaited_once()
+        self.assertIsNone(handler._batch_writer)
+
+    async def test_batches_are_written_once_they_reach_max_batch_size(self):
+        handler = self.make_handler(max_batch_size=4)
+
+        await handler.emit(self.make_record("Xablau"))
+
+        self.assertEqual(self.written, [b"Xablau\n"])
+
+    async def test_batches_wait_for_max_batch_latency(self):
+        handler = self.make_handler(max_batch_latency=0.05)
+
+        await handler.emit(self.make_record("Xablau"))
+        await asyncio.sleep(0.01)
+        await handler.emit(self.make_record("Xena"))
+        self.assertEqual(self.written, [])
+
+        await asyncio.sleep(0.06)
+        self.assertEqual(self.written, [b"Xablau\nXena\n"])
+
+    async def test_flush_writes_the_pending_batch(self):
+        handler = self.make_handler()
+
+        await handler.emit(self.make_record("Xablau"))
+        await handler.flush()
+
+        self.assertEqual(self.written, [b"Xablau\n"])
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.written), 1)
+
+    async def test_written_batches_are_never_changed(self):
+        views = []
+        self.writer.write.side_effect = lambda data: views.append(
+            memoryview(data)
+        )
+        handler = self.make_handler()
+
+        for msg in ("Xablau", "Xena"):
+            await handler.emit(self.make_record(msg))
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        self.assertEqual(
+            [bytes(view) for view in views], [b"Xablau\n", b"Xena\n"]
+        )
+
+    async def test_emitters_wait_for_a_paused_stream(self):
+        drained = asyncio.Event()
+        self.writer.drain.side_effect = drained.wait
+        handler = self.make_handler()
+        await handler._init_writer()
+        handler._protocol = Mock(paused=True)
+
+        emits = [
+            asyncio.ensure_future(handler.emit(self.make_record(f"Xablau {i}")))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        batch_writer = handler._batch_writer
+        emits.append(
+            asyncio.ensure_future(handler.emit(self.make_record("Xena")))
+        )
+        await asyncio.sleep(0.01)
+
+        self.assertFalse(any(emit.done() for emit in emits))
+        self.assertIs(handler._batch_writer, batch_writer)
+        self.assertEqual(self.written, [b"Xablau 0\nXablau 1\nXablau 2\n"])
+
+        handler._protocol.paused = False
+        drained.set()
+        await asyncio.gather(*emits)
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.written[1:], [b"Xena\n"])
+        self.assertTrue(batch_writer.done())
+        self.assertIsNone(handler._batch_writer)
+
+    async def test_write_errors_are_handled_with_the_last_batch_record(self):
+        exc = Exception("XABLAU")
+        self.writer.drain.side_effect = exc
+        handler = self.make_handler()
+        record = self.make_record("Xablau")
+
+        with asynctest.patch.object(handler, "handle_error") as handle_error:
+            await handler.emit(record)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        handle_error.assert_awaited_once_with(record, exc)
+
+
+class WriterThreadAsyncStreamHandlerTests(asynctest.TestCase):
+    async def setUp(self):
+        r_fileno, w_fileno = os.pipe()
+        self.read_pipe = os.fdopen(r_fileno, "rb")
+        self.write_pipe = os.fdopen(w_fileno, "w")
+        self.writer_thread = WriterThread()
+
+    async def tearDown(self):
+        self.writer_thread.stop()
+        self.read_pipe.close()
+        self.write_pipe.close()
+
+    async def test_records_are_written_by_the_writer_thread(self):
+        handler = AsyncStreamHandler(
+            stream=self.write_pipe,
+            formatter=Mock(format=Mock(side_effect=lambda record: record.msg)),
+            writer_thread=self.writer_thread,
+        )
+
+        with patch.object(self.loop, "connect_write_pipe") as connect:
+            for msg in ("Xablau", "Xena"):
+                await handler.emit(
+                    LogRecord(
+                        name="aiologger",
+                        level=20,
+                        pathname=__file__,
+                        lineno=17,
+                        msg=msg,
+                    )
+                )
+        await handler.close()
+
+        connect.assert_not_called()
+        self.assertEqual(handler.buffered_bytes, 0)
+        self.assertEqual(self.read_pipe.read1(100), b"Xablau\nXena\n")
+        # The stream isn't closed along with the handler
+        self.assertEqual(os.write(self.write_pipe.fileno(), b"!"), 1)
+
+    async def test_batched_records_are_written_by_the_writer_thread(self):
+        handler = AsyncStreamHandler(
+            stream=self.write_pipe,
+            formatter=Mock(format=Mock(side_effect=lambda record: record.msg)),
+            writer_thread=self.writer_thread,
+            batch=True,
+        )
+
+        for i in range(100):
+            await handler.emit(
+                LogRecord(
+                    name="aiologger",
+                    level=20,
+                    pathname=__file__,
+                    lineno=17,
+                    msg=f"Xablau {i}",
+                )
+            )
+        await asyncio.sleep(0)
+        await handler.close()
+
+        self.assertEqual(
+            self.read_pipe.read1(10000),
+            "".join(f"Xablau {i}\n" for i in range(100)).encode(),
+        )
@@ -7,6 +7,7 @@ from unittest.mock import Mock, patch
 import asynctest
 from asynctest import CoroutineMock
 
+from aiologger.filters import RateLimitFilter
 from aiologger.levels import LogLevel
 from aiologger.loggers.json import JsonLogger
 from aiologger.records import ExtendedLogRecord
@@ -339,3 +340,73 @@ class JsonLoggerTests(asynctest.TestCase):
 
         self.assertNotIn(FUNCTION_NAME_FIELDNAME, logged_content)
         self.assertNotIn(LOG_LEVEL_FIELDNAME, logged_content)
+
+    async def test_rate_limited_records_report_the_suppressed_ones(self):
+        now = 0.0
+        logger = JsonLogger.with_default_handlers(
+            level=10, record_attrs=["suppressed"]
+        )
+        logger.add_filter(RateLimitFilter(rate=1, burst=1, clock=lambda: now))
+
+        for i in range(4):
+            if i == 3:
+                now += 1
+            await logger.info("Xablau")
+        first = json.loads(await self.stream_reader.readline())
+        second = json.loads(await self.stream_reader.readline())
+        await logger.shutdown()
+
+        self.assertEqual(first["suppressed"], 0)
+        self.assertEqual(second["suppressed"], 2)
+
+    async def test_bound_loggers_add_their_fields_to_every_record(self):
+        logger = JsonLogger.with_default_handlers(
+            level=10, extra={"dog": "Xablau"}
+        )
+        bound_logger = logger.bind(service="xablau").bind(pod=1)
+
+        await bound_logger.info("Xena", extra={"ham": "eggs"})
+        await bound_logger.warning("Xena")
+        await logger.info("Xena")
+
+        first, second, third = [
+            json.loads(await self.stream_reader.readline()) for _ in range(3)
+        ]
+        self.assertEqual(first["dog"], "Xablau")
+        self.assertEqual(first["service"], "xablau")
+        self.assertEqual(first["pod"], 1)
+        self.assertEqual(first["ham"], "eggs")
+        self.assertEqual(second["level"], "WARNING")
+        self.assertEqual(second["pod"], 1)
+        self.assertNotIn("ham", second)
+        self.assertNotIn("service", third)
+        await logger.shutdown()
+
+    async def test_bound_loggers_find_the_caller_of_log_methods(self):
+        bound_logger = self.logger.bind(service="xablau")
+
+        await bound_logger.error("Xena")
+        line_number = inspect.currentframe().f_lineno - 1
+
+        logged_content = json.loads(await self.stream_reader.readline())
+        self.assertEqual(logged_content["line_number"], line_number)
+        self.assertEqual(
+            logged_content["function"],
+            "test_bound_loggers_find_the_caller_of_log_methods",
+        )
+
+    async def test_bound_loggers_delegate_other_attributes_to_the_logger(self):
+        bound_logger = self.logger.bind(service="xablau")
+
+        self.assertEqual(bound_logger.name, self.logger.name)
+        self.assertTrue(bound_logger.is_enabled_for(LogLevel.DEBUG))
+
+    async def test_bound_extra_fields_arent_affected_by_extra_changes(self):
+        self.logger.extra = {"dog": "Xablau"}
+        bound_logger = self.logger.bind(service="xablau")
+        self.logger.extra["dog"] = "Xena"
+
+        self.assertEqual(
+            dict(bound_logger.bound_extra.fields),
+            {"dog": "Xablau", "service": "xablau"},
+        )
@@ -0,0 +1,84 @@
+import bz2
+import gzip
+import lzma
+import os
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import asynctest
+
+from aiologger.compression import Compression, FileCompressor, compress_file
+
+
+class CompressFileTests(asynctest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "app.log.1")
+        with open(self.source, "wb") as fp:
+            fp.write(b"Xablau\n" * 100)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_it_replaces_the_file_with_a_compressed_one(self):
+        for compression, module in (
+            (Compression.GZIP, gzip),
+            (Compression.BZ2, bz2),
+            (Compression.LZMA, lzma),
+        ):
+            with self.subTest(compression=compression):
+                with open(self.source, "wb") as fp:
+                    fp.write(b"Xablau\n" * 100)
+
+                dest = compress_file(self.source, compression, level=1)
+
+                self.assertEqual(dest, self.source + compression.suffix)
+                self.assertFalse(os.path.exists(self.source))
+                with module.open(dest) as fp:
+                    self.assertEqual(fp.read(), b"Xablau\n" * 100)
+
+    def test_it_keeps_the_file_and_removes_the_temp_file_on_errors(self):
+        with patch(
+            "aiologger.compression.shutil.copyfileobj",
+            side_effect=OSError("No space left on device"),
+        ):
+            with self.assertRaises(OSError):
+                compress_file(self.source, Compression.GZIP)
+
+        self.assertEqual(os.listdir(self.temp_dir.name), ["app.log.1"])
+
+
+class FileCompressorTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "app.log.1")
+        with open(self.source, "wb") as fp:
+            fp.write(b"Xablau\n")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_it_compresses_files_in_a_process_pool(self):
+        compressor = FileCompressor(Compression.LZMA, max_workers=2)
+        try:
+            dest = await compressor.compress(self.source)
+            self.assertEqual(compressor._executor._max_workers, 2)
+        finally:
+            compressor.shutdown()
+
+        self.assertEqual(dest, self.source + ".xz")
+        with lzma.open(dest) as fp:
+            self.assertEqual(fp.read(), b"Xablau\n")
+
+    async def test_shutdown_doesnt_shut_down_a_given_executor(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            compressor = FileCompressor(executor=executor)
+            compressor.shutdown()
+            dest = await compressor.compress(self.source)
+
+        self.assertEqual(dest, self.source + ".gz")
+
+    def test_max_workers_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            FileCompressor(max_workers=0)
@@ -0,0 +1,297 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import asynctest
+from asynctest import CoroutineMock, Mock
+
+from aiologger.dispatchers import (
+    OverflowPolicy,
+    QueuedDispatcher,
+    ThreadSafeBuffer,
+)
+from aiologger.levels import LogLevel
+from tests.utils import make_log_record
+
+
+class QueuedDispatcherTests(asynctest.TestCase):
+    def test_it_refuses_non_positive_max_sizes(self):
+        with self.assertRaises(ValueError):
+            QueuedDispatcher(CoroutineMock(), max_size=0)
+
+    async def test_it_handles_records_in_put_order(self):
+        handle = CoroutineMock()
+        dispatcher = QueuedDispatcher(handle, max_size=2)
+        records = [make_log_record(msg=i) for i in range(4)]
+
+        futures = [dispatcher.put(record) for record in records]
+        await asyncio.gather(*futures)
+        await dispatcher.join()
+
+        self.assertEqual([c[0][0] for c in handle.await_args_list], records)
+        await dispatcher.close()
+
+    async def test_depth_counts_queued_and_waiting_records(self):
+        dispatcher = QueuedDispatcher(CoroutineMock(), max_size=1)
+
+        dispatcher.put(make_log_record())
+        dispatcher.put(make_log_record())
+        self.assertEqual(dispatcher.depth, 2)
+
+        await dispatcher.join()
+        self.assertEqual(dispatcher.depth, 0)
+        await dispatcher.close()
+
+    async def test_cancelled_waiting_records_are_discarded(self):
+        handle = CoroutineMock()
+        dispatcher = QueuedDispatcher(handle, max_size=1)
+        first, second = make_log_record(msg=1), make_log_record(msg=2)
+
+        dispatcher.put(first)
+        dispatcher.put(second).cancel()
+        await dispatcher.join()
+
+        handle.assert_awaited_once_with(first)
+        await dispatcher.close()
+
+    async def test_it_survives_handle_errors(self):
+        handle = CoroutineMock(side_effect=[ValueError, None])
+        dispatcher = QueuedDispatcher(handle)
+        exception_handler = Mock()
+        self.loop.set_exception_handler(exception_handler)
+
+        dispatcher.put(make_log_record())
+        dispatcher.put(make_log_record())
+        await dispatcher.join()
+
+        self.assertEqual(handle.await_count, 2)
+        exception_handler.assert_called_once()
+        await dispatcher.close()
+
+    async def test_join_returns_immediately_if_nothing_was_put(self):
+        dispatcher = QueuedDispatcher(CoroutineMock())
+        await asyncio.wait_for(dispatcher.join(), timeout=1)
+
+    async def test_close_stops_the_consumer(self):
+        dispatcher = QueuedDispatcher(CoroutineMock())
+        dispatcher.put(make_log_record())
+        consumer = dispatcher._consumer
+
+        await dispatcher.join()
+        await dispatcher.close()
+
+        self.assertTrue(consumer.cancelled())
+
+    async def test_close_completes_the_futures_of_waiting_records(self):
+        release = asyncio.Event()
+
+        async def handle(record):
+            await release.wait()
+
+        dispatcher = QueuedDispatcher(handle, max_size=1)
+        dispatcher.put(make_log_record())
+        await asyncio.sleep(0)
+        dispatcher.put(make_log_record())
+        waiting = dispatcher.put(make_log_record())
+
+        await dispatcher.close()
+
+        await asyncio.wait_for(waiting, timeout=1)
+
+    async def test_records_put_after_close_are_dropped(self):
+        handle = CoroutineMock()
+        dispatcher = QueuedDispatcher(handle)
+        await dispatcher.close()
+
+        await dispatcher.put(make_log_record())
+        await asyncio.sleep(0)
+
+        handle.assert_not_awaited()
+        self.assertFalse(dispatcher.running)
+        self.assertEqual(dispatcher.dropped_after_close, 1)
+
+
+class OverflowPolicyTests(asynctest.TestCase):
+    async def tearDown(self):
+        await self.dispatcher.close()
+
+    async def put_all(self, records):
+        futures = [self.dispatcher.put(record) for record in records]
+        await asyncio.gather(*futures)
+        await self.dispatcher.join()
+
+    def handled_records(self):
+        return [c[0][0] for c in self.handle.await_args_list]
+
+    async def test_block_keeps_every_record(self):
+        self.handle = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle, max_size=1, overflow_policy=OverflowPolicy.BLOCK
+        )
+        records = [make_log_record(msg=i) for i in range(3)]
+
+        for record in records:
+            await self.dispatcher.put(record)
+        await self.dispatcher.join()
+
+        self.assertEqual(self.handled_records(), records)
+        self.assertEqual(sum(self.dispatcher.dropped.values()), 0)
+
+    async def test_at_most_max_size_records_wait_for_room(self):
+        self.handle = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle, max_size=2, overflow_policy=OverflowPolicy.BLOCK
+        )
+        records = [make_log_record(msg=i) for i in range(6)]
+
+        # Nothing awaits the puts, so records keep coming while full
+        futures = [self.dispatcher.put(record) for record in records]
+        self.assertEqual(self.dispatcher.depth, 4)
+
+        await asyncio.gather(*futures)
+        await self.dispatcher.join()
+        self.assertEqual(self.handled_records(), records[:4])
+        self.assertEqual(self.dispatcher.dropped[OverflowPolicy.BLOCK], 2)
+
+    async def test_drop_newest_drops_records_put_into_a_full_queue(self):
+        self.handle = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle, max_size=1, overflow_policy=OverflowPolicy.DROP_NEWEST
+        )
+        records = [make_log_record(msg=i) for i in range(3)]
+
+        await self.put_all(records)
+
+        self.assertEqual(self.handled_records(), records[:1])
+        self.assertEqual(self.dispatcher.dropped[OverflowPolicy.DROP_NEWEST], 2)
+
+    async def test_drop_oldest_makes_room_for_new_records(self):
+        self.handle = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle, max_size=1, overflow_policy=OverflowPolicy.DROP_OLDEST
+        )
+        records = [make_log_record(msg=i) for i in range(3)]
+
+        await self.put_all(records)
+
+        self.assertEqual(self.handled_records(), records[-1:])
+        self.assertEqual(self.dispatcher.dropped[OverflowPolicy.DROP_OLDEST], 2)
+
+    async def test_drop_below_level_only_drops_records_below_drop_level(self):
+        self.handle = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle,
+            max_size=1,
+            overflow_policy=OverflowPolicy.DROP_BELOW_LEVEL,
+            drop_level=LogLevel.WARNING,
+        )
+        first = make_log_record(levelno=LogLevel.INFO)
+        info = make_log_record(levelno=LogLevel.INFO)
+        error = make_log_record(levelno=LogLevel.ERROR)
+
+        await self.put_all([first, info, error])
+
+        self.assertEqual(self.handled_records(), [first, error])
+        self.assertEqual(
+            self.dispatcher.dropped[OverflowPolicy.DROP_BELOW_LEVEL], 1
+        )
+
+    async def test_it_reports_dropped_records_after_the_report_interval(self):
+        self.handle = CoroutineMock()
+        on_dropped = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle,
+            max_size=1,
+            overflow_policy=OverflowPolicy.DROP_NEWEST,
+            on_dropped=on_dropped,
+            report_interval=0.01,
+        )
+
+        await self.put_all([make_log_record() for _ in range(3)])
+        on_dropped.assert_not_awaited()
+
+        await asyncio.sleep(0.05)
+        on_dropped.assert_awaited_once_with(2)
+
+    async def test_close_reports_pending_dropped_records(self):
+        self.handle = CoroutineMock()
+        on_dropped = CoroutineMock()
+        self.dispatcher = QueuedDispatcher(
+            self.handle,
+            max_size=1,
+            overflow_policy=OverflowPolicy.DROP_NEWEST,
+            on_dropped=on_dropped,
+            report_interval=60,
+        )
+
+        await self.put_all([make_log_record() for _ in range(2)])
+        await self.dispatcher.close()
+
+        on_dropped.assert_awaited_once_with(1)
+
+
+class ThreadSafeBufferTests(asynctest.TestCase):
+    async def test_it_keeps_records_until_a_loop_is_bound(self):
+        dispatch_batch = Mock()
+        buffer = ThreadSafeBuffer(dispatch_batch)
+        records = [make_log_record(msg=i) for i in range(2)]
+
+        for record in records:
+            buffer.put(record)
+        await asyncio.sleep(0)
+        dispatch_batch.assert_not_called()
+
+        buffer.bind(self.loop)
+        await asyncio.sleep(0)
+        dispatch_batch.assert_called_once_with(records)
+
+    async def test_records_waiting_for_a_loop_are_bounded(self):
+        dispatch_batch = Mock()
+        on_dropped = Mock()
+        buffer = ThreadSafeBuffer(
+            dispatch_batch, max_size=2, on_dropped=on_dropped
+        )
+        records = [make_log_record(msg=i) for i in range(5)]
+
+        for record in records:
+            buffer.put(record)
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(buffer.dropped, 3)
+
+        buffer.flush()
+        on_dropped.assert_called_once_with(3)
+        dispatch_batch.assert_called_once_with(records[:2])
+        self.assertEqual(len(buffer), 0)
+
+    async def test_it_keeps_records_put_after_its_loop_closed(self):
+        dispatch_batch = Mock()
+        closed_loop = asyncio.new_event_loop()
+        closed_loop.close()
+        buffer = ThreadSafeBuffer(dispatch_batch, loop=closed_loop)
+        record = make_log_record()
+
+        buffer.put(record)
+        self.assertIsNone(buffer.loop)
+
+        buffer.bind(self.loop)
+        await asyncio.sleep(0)
+        dispatch_batch.assert_called_once_with([record])
+
+    async def test_it_dispatches_records_put_by_threads_in_batches(self):
+        dispatch_batch = Mock()
+        buffer = ThreadSafeBuffer(dispatch_batch)
+        buffer.loop = self.loop
+        records = [make_log_record(msg=i) for i in range(100)]
+
+        with patch.object(buffer, "_drain", wraps=buffer._drain) as drain:
+            # The loop thread is blocked while records are put, so they're
+            # all drained by the same batch
+            thread = threading.Thread(
+                target=lambda: [buffer.put(record) for record in records]
+            )
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0)
+
+        drain.assert_called_once()
+        dispatch_batch.assert_called_once_with(records)
@@ -1,8 +1,19 @@
+import json
 import unittest
 from unittest.mock import Mock
 
-from aiologger.filters import StdoutFilter, Filter, Filterer
+from aiologger.filters import (
+    Filter,
+    Filterer,
+    RateLimitFilter,
+    SamplingFilter,
+    SamplingMethod,
+    StdoutFilter,
+)
+from aiologger.formatters.base import Formatter
+from aiologger.formatters.json import ExtendedJsonFormatter
 from aiologger.levels import LogLevel
+from aiologger.records import ExtendedLogRecord
 from tests.utils import make_log_record
 
 
@@ -140,3 +151,204 @@ class StdoutFilterTests(unittest.TestCase):
     def test_it_doesnt_filters_records_with_info_log_level(self):
         record = Mock(levelno=LogLevel.INFO)
         self.assertTrue(self.stdout_filter.filter(record))
+
+
+class RateLimitFilterTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.filter = RateLimitFilter(rate=1, burst=2, clock=lambda: self.now)
+
+    def test_it_suppresses_records_after_the_burst(self):
+        results = [self.filter(make_log_record(lineno=42)) for _ in range(4)]
+
+        self.assertEqual(results, [True, True, False, False])
+
+    def test_call_sites_have_separate_buckets(self):
+        for _ in range(2):
+            self.filter(make_log_record(lineno=42))
+
+        self.assertFalse(self.filter(make_log_record(lineno=42)))
+        self.assertTrue(self.filter(make_log_record(lineno=43)))
+
+    def test_buckets_are_refilled_over_time(self):
+        for _ in range(3):
+            self.filter(make_log_record(lineno=42))
+
+        self.now += 1
+        self.assertTrue(self.filter(make_log_record(lineno=42)))
+        self.assertFalse(self.filter(make_log_record(lineno=42)))
+
+    def test_it_reports_the_suppressed_records_once_it_reopens(self):
+        for _ in range(5):
+            self.filter(make_log_record(lineno=42, msg="Xablau"))
+
+        self.now += 1
+        record = make_log_record(lineno=42, msg="Xablau")
+        self.assertTrue(self.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+        self.now += 1
+        record = make_log_record(lineno=42, msg="Xablau")
+        self.filter(record)
+        self.assertEqual(record.suppressed, 0)
+
+    def test_it_doesnt_change_the_shared_record(self):
+        for _ in range(3):
+            self.filter(make_log_record(lineno=42, msg="Xablau"))
+        self.now += 1
+        record = make_log_record(lineno=42, msg="Xablau")
+        self.filter(record)
+
+        self.assertEqual(record.get_message(), "Xablau")
+        self.assertEqual(
+            Formatter("%(message)s (%(suppressed)s suppressed)").format(record),
+            "Xablau (1 suppressed)",
+        )
+
+    def test_it_uses_the_key_function(self):
+        filter = RateLimitFilter(
+            rate=1, burst=1, key=lambda record: record.name, clock=lambda: 0
+        )
+
+        self.assertTrue(filter(make_log_record(name="a", lineno=1)))
+        self.assertFalse(filter(make_log_record(name="a", lineno=2)))
+        self.assertTrue(filter(make_log_record(name="b", lineno=1)))
+
+    def test_least_recently_used_keys_are_evicted(self):
+        filter = RateLimitFilter(rate=1, burst=1, max_keys=2, clock=lambda: 0)
+        for lineno in (1, 2, 1, 3):
+            filter(make_log_record(lineno=lineno))
+
+        self.assertEqual(list(filter._buckets), [("", 1), ("", 3)])
+        self.assertTrue(filter(make_log_record(lineno=2)))
+
+    def test_it_can_be_added_to_a_filterer(self):
+        filterer = Filterer()
+        filterer.add_filter(self.filter)
+
+        results = [
+            filterer.filter(make_log_record(lineno=42)) for _ in range(3)
+        ]
+        self.assertEqual(results, [True, True, False])
+
+
+class SamplingFilterTests(unittest.TestCase):
+    def test_it_keeps_1_in_n_records_of_each_call_site(self):
+        filter = SamplingFilter(rates={LogLevel.INFO: 0.25})
+
+        results = [
+            filter(make_log_record(levelno=LogLevel.INFO, lineno=42))
+            for _ in range(8)
+        ]
+
+        self.assertEqual(results, [True, False, False, False] * 2)
+        self.assertTrue(
+            filter(make_log_record(levelno=LogLevel.INFO, lineno=43))
+        )
+
+    def test_kept_records_can_be_reweighted_by_their_sample_rate(self):
+        for rate in (0.3, 0.7):
+            filter = SamplingFilter(rates={LogLevel.INFO: rate})
+            records = [
+                make_log_record(levelno=LogLevel.INFO, lineno=42)
+                for _ in range(1000)
+            ]
+
+            kept = [record for record in records if filter(record)]
+
+            self.assertEqual(len(kept), 1000 * rate)
+            self.assertAlmostEqual(
+                sum(1 / record.sample_rate for record in kept), 1000
+            )
+
+    def test_it_keeps_every_record_of_levels_without_rates(self):
+        filter = SamplingFilter()
+
+        for _ in range(10):
+            self.assertTrue(
+                filter(make_log_record(levelno=LogLevel.WARNING, lineno=42))
+            )
+
+    def test_it_samples_debug_and_info_records_by_default(self):
+        filter = SamplingFilter()
+
+        self.assertEqual(filter.get_rate("aiologger", LogLevel.DEBUG), 0.01)
+        self.assertEqual(filter.get_rate("aiologger", LogLevel.INFO), 0.01)
+        self.assertEqual(filter.get_rate("aiologger", LogLevel.ERROR), 1.0)
+
+    def test_logger_rates_apply_to_the_logger_and_its_children(self):
+        filter = SamplingFilter(
+            rates={"INFO": 0.5}, logger_rates={"app.db": {"INFO": 0.1}}
+        )
+
+        self.assertEqual(filter.get_rate("app.db", LogLevel.INFO), 0.1)
+        self.assertEqual(filter.get_rate("app.db.pool", LogLevel.INFO), 0.1)
+        self.assertEqual(filter.get_rate("app.dbx", LogLevel.INFO), 0.5)
+        self.assertEqual(filter.get_rate("app.db", LogLevel.DEBUG), 1.0)
+
+    def test_hash_sampling_always_keeps_or_drops_the_same_key(self):
+        filter = SamplingFilter(
+            rates={"INFO": 0.5},
+            method=SamplingMethod.HASH,
+            key=lambda record: record.msg,
+        )
+        records = [
+            make_log_record(levelno=LogLevel.INFO, msg=str(i))
+            for i in range(200)
+        ]
+
+        first = [filter(record) for record in records]
+        second = [filter(record) for record in records]
+
+        self.assertEqual(first, second)
+        self.assertTrue(60 < sum(first) < 140)
+
+    def test_kept_records_carry_their_sample_rate(self):
+        filter = SamplingFilter(rates={"INFO": 0.5})
+        record = ExtendedLogRecord(
+            name="aiologger",
+            level=LogLevel.INFO,
+            pathname=__file__,
+            lineno=42,
+            msg="Xablau",
+            args=None,
+            exc_info=None,
+            extra=None,
+            flatten=False,
+            serializer_kwargs={},
+        )
+
+        self.assertTrue(filter(record))
+        self.assertEqual(record.sample_rate, 0.5)
+        self.assertIsNone(record.extra)
+
+    def test_only_formatters_that_opt_in_serialize_the_sample_rate(self):
+        filter = SamplingFilter(rates={"INFO": 0.5})
+        record = ExtendedLogRecord(
+            name="aiologger",
+            level=LogLevel.INFO,
+            pathname=__file__,
+            lineno=42,
+            msg="Xablau",
+            args=None,
+            exc_info=None,
+            extra=None,
+            flatten=False,
+            serializer_kwargs={},
+        )
+        sampled = ExtendedJsonFormatter(record_attrs=["sample_rate"])
+        unsampled = ExtendedJsonFormatter()
+
+        self.assertTrue(filter(record))
+
+        self.assertEqual(json.loads(sampled.format(record))["sample_rate"], 0.5)
+        self.assertNotIn("sample_rate", json.loads(unsampled.format(record)))
+
+    def test_rates_must_be_between_0_and_1(self):
+        with self.assertRaises(ValueError):
+            SamplingFilter(rates={"INFO": 2})
+
+    def test_zero_rates_drop_every_record(self):
+        filter = SamplingFilter(rates={"DEBUG": 0})
+
+        self.assertFalse(filter(make_log_record(levelno=LogLevel.DEBUG)))
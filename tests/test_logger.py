@@ -3,12 +3,14 @@ import contextlib
 import inspect
 import unittest
 import os
+import signal
 from typing import Tuple
 
 import asynctest
 from asynctest import CoroutineMock, Mock, patch, call, ANY
 
-from aiologger.utils import get_running_loop
+from aiologger.utils import Lazy, get_running_loop
+from aiologger.dispatchers import OverflowPolicy
 from aiologger.filters import StdoutFilter
 from aiologger.handlers.streams import AsyncStreamHandler
 from aiologger.levels import LogLevel
@@ -339,18 +341,22 @@ class LoggerTests(asynctest.TestCase):
 
             await logger.shutdown()
 
-    async def test_it_returns_a_dummy_task_if_logging_isnt_enabled_for_level(
+    async def test_it_returns_a_completed_awaitable_if_logging_isnt_enabled_for_level(
         self
     ):
         logger = Logger.with_default_handlers()
-        self.assertIsNone(logger._dummy_task)
 
         with patch.object(
             logger, "is_enabled_for", return_value=False
-        ) as isEnabledFor, patch.object(logger, "_dummy_task") as _dummy_task:
+        ) as isEnabledFor, patch.object(logger, "_log") as _log, patch(
+            "aiologger.logger.create_task"
+        ) as create_task:
             log_task = logger.info("im disabled")
             isEnabledFor.assert_called_once_with(LogLevel.INFO)
-            self.assertEqual(log_task, _dummy_task)
+            _log.assert_not_called()
+            create_task.assert_not_called()
+
+        await log_task
 
     async def test_it_returns_a_log_task_if_logging_is_enabled_for_level(self):
         logger = Logger.with_default_handlers()
@@ -423,3 +429,538 @@ class LoggerTests(asynctest.TestCase):
 
         logger.remove_handler(handler)
         self.assertEqual(logger.handlers, [])
+
+
+class QueuedLoggerTests(asynctest.TestCase):
+    async def test_it_delivers_records_in_call_order(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(queued=True)
+        logger.add_handler(handler)
+
+        for i in range(10):
+            logger.info("message %s", i)
+        await logger.join()
+
+        messages = [
+            c[0][0].get_message() for c in handler.handle.call_args_list
+        ]
+        self.assertEqual(messages, [f"message {i}" for i in range(10)])
+        await logger.shutdown()
+
+    async def test_log_calls_dont_create_a_task_per_record(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(queued=True)
+        logger.add_handler(handler)
+
+        with patch("aiologger.logger.create_task") as create_task:
+            log_awaitables = [logger.info("Xablau") for _ in range(3)]
+            create_task.assert_not_called()
+
+        for log_awaitable in log_awaitables:
+            self.assertTrue(log_awaitable.done())
+        await logger.join()
+        self.assertEqual(handler.handle.await_count, 3)
+        await logger.shutdown()
+
+    async def test_log_call_awaitable_completes_only_when_there_is_room(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(queued=True, max_queue_size=1)
+        logger.add_handler(handler)
+
+        first = logger.info("first")
+        second = logger.info("second")
+        self.assertTrue(first.done())
+        self.assertFalse(second.done())
+
+        await second
+        await logger.join()
+        self.assertEqual(handler.handle.await_count, 2)
+        await logger.shutdown()
+
+    async def test_shutdown_handles_queued_records_before_closing_handlers(
+        self
+    ):
+        handler = Mock(spec=AsyncStreamHandler, level=LogLevel.DEBUG)
+        logger = Logger(queued=True)
+        logger.add_handler(handler)
+
+        logger.info("Xablau")
+        await logger.shutdown()
+
+        handler.handle.assert_awaited_once()
+        handler.close.assert_awaited_once()
+
+    async def test_it_reports_dropped_records_through_its_handlers(self):
+        handler = Mock(spec=AsyncStreamHandler, level=LogLevel.DEBUG)
+        logger = Logger(
+            queued=True,
+            max_queue_size=1,
+            overflow_policy=OverflowPolicy.DROP_NEWEST,
+        )
+        logger.add_handler(handler)
+
+        logger.info("first")
+        logger.info("dropped")
+        await logger.shutdown()
+
+        self.assertEqual(
+            logger.dropped_records, {OverflowPolicy.DROP_NEWEST: 1}
+        )
+        messages = [
+            c[0][0].get_message() for c in handler.handle.call_args_list
+        ]
+        self.assertEqual(
+            messages,
+            ["first", "1 log records dropped because the queue was full"],
+        )
+
+
+class IsolatedHandlersLoggerTests(asynctest.TestCase):
+    async def test_a_slow_handler_doesnt_delay_the_others(self):
+        slow_handler_released = asyncio.Event()
+
+        async def slow_handle(record):
+            await slow_handler_released.wait()
+
+        slow_handler = Mock(level=LogLevel.DEBUG, handle=slow_handle)
+        fast_handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(isolate_handlers=True)
+        logger.add_handler(slow_handler)
+        logger.add_handler(fast_handler)
+
+        await logger.info("Xablau")
+        await logger.info("Xablau")
+        await asyncio.sleep(0)
+
+        self.assertEqual(fast_handler.handle.await_count, 2)
+        self.assertEqual(logger.handler_queue_depths[slow_handler], 1)
+
+        slow_handler_released.set()
+        await logger.join()
+        self.assertEqual(logger.handler_queue_depths[slow_handler], 0)
+        await logger.shutdown()
+
+    async def test_call_handlers_waits_only_for_full_handler_queues(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(isolate_handlers=True, handler_queue_size=2)
+        logger.add_handler(handler)
+        record = LogRecord(
+            level=20,
+            name="aiologger",
+            pathname="/aiologger/tests/test_logger.py",
+            lineno=17,
+            msg="Xablau!",
+            exc_info=None,
+            args=None,
+        )
+
+        await asyncio.gather(*(logger.call_handlers(record) for _ in range(3)))
+        await logger.join()
+
+        self.assertEqual(handler.handle.await_count, 3)
+        await logger.shutdown()
+
+    async def test_remove_handler_stops_its_worker_after_its_queue_drains(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(isolate_handlers=True)
+        logger.add_handler(handler)
+
+        await logger.info("Xablau")
+        dispatcher = logger._handler_dispatchers[handler]
+        logger.remove_handler(handler)
+        await asyncio.sleep(0.01)
+
+        handler.handle.assert_awaited_once()
+        self.assertFalse(dispatcher.running)
+        self.assertEqual(logger.handler_queue_depths, {})
+
+    async def test_logging_after_shutdown_doesnt_start_handler_workers(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(isolate_handlers=True)
+        logger.add_handler(handler)
+        await logger.info("Xablau")
+        await logger.shutdown()
+
+        await logger.info("Xablau")
+
+        self.assertEqual(logger.handler_queue_depths, {})
+        self.assertEqual(handler.handle.await_count, 2)
+
+    async def test_loggers_share_the_queue_of_a_handler(self):
+        handled = []
+
+        async def handle(record):
+            handled.append(record.msg)
+            await asyncio.sleep(0)
+
+        handler = Mock(level=LogLevel.DEBUG, handle=handle)
+        parent = Logger(name="parent", isolate_handlers=True)
+        child = Logger(name="parent.child", isolate_handlers=True)
+        child.parent = parent
+        parent.add_handler(handler)
+
+        for i in range(3):
+            await parent.info(f"parent {i}")
+            await child.info(f"child {i}")
+        dispatcher = child._handler_dispatchers[handler]
+
+        self.assertIs(parent._handler_dispatchers[handler], dispatcher)
+
+        await child.shutdown()
+        self.assertTrue(dispatcher.running)
+        await parent.shutdown()
+        self.assertFalse(dispatcher.running)
+        self.assertEqual(
+            handled,
+            [f"{name} {i}" for i in range(3) for name in ("parent", "child")],
+        )
+
+
+class FindCallerTests(unittest.TestCase):
+    def setUp(self):
+        self.logger = Logger()
+
+    def log_wrapper(self, stacklevel):
+        def make_log_task():
+            return self.logger.find_caller(stacklevel=stacklevel)
+
+        def log_function():
+            return make_log_task()
+
+        return log_function()
+
+    def test_it_caches_callers_by_call_site(self):
+        callers = [self.log_wrapper(stacklevel=1) for _ in range(2)]
+
+        self.assertEqual(callers[0].function_name, "log_wrapper")
+        self.assertIs(callers[0], callers[1])
+
+    def test_it_doesnt_cache_callers_with_stack_info(self):
+        def make_log_task():
+            return self.logger.find_caller(stack_info=True)
+
+        def log_function():
+            return make_log_task()
+
+        callers = [log_function() for _ in range(2)]
+
+        self.assertEqual(callers[0], callers[1])
+        self.assertIsNot(callers[0], callers[1])
+
+    def test_stacklevel_skips_wrapper_frames(self):
+        caller = self.log_wrapper(stacklevel=2)
+
+        self.assertEqual(
+            caller.function_name, "test_stacklevel_skips_wrapper_frames"
+        )
+        self.assertEqual(caller.filename, __file__)
+
+    def test_stacklevel_stops_at_the_outermost_frame(self):
+        caller = self.log_wrapper(stacklevel=10000)
+
+        self.assertNotEqual(caller.function_name, "(unknown function)")
+
+    def test_log_methods_accept_stacklevel(self):
+        def log_wrapper():
+            return self.logger.info("Xablau", stacklevel=2)
+
+        with patch.object(self.logger, "_log") as _log:
+            log_wrapper()
+
+        caller = _log.call_args[1]["caller"]
+        self.assertEqual(
+            caller.function_name, "test_log_methods_accept_stacklevel"
+        )
+
+    def test_it_doesnt_find_callers_if_capture_caller_is_disabled(self):
+        logger = Logger(capture_caller=False)
+
+        with patch.object(logger, "find_caller") as find_caller, patch.object(
+            logger, "_log"
+        ) as _log:
+            logger.info("Xablau")
+
+        find_caller.assert_not_called()
+        self.assertEqual(
+            _log.call_args[1]["caller"],
+            ("(unknown file)", 0, "(unknown function)", None),
+        )
+
+
+class EffectiveLevelTests(unittest.TestCase):
+    def test_it_is_the_logger_level_if_handlers_accept_lower_levels(self):
+        logger = Logger(level=LogLevel.INFO)
+        logger.add_handler(Mock(level=LogLevel.DEBUG))
+
+        self.assertEqual(logger.effective_level, LogLevel.INFO)
+
+    def test_it_is_the_lowest_handler_level_if_its_above_the_logger_level(self):
+        logger = Logger(level=LogLevel.DEBUG)
+        logger.add_handler(Mock(level=LogLevel.ERROR))
+        logger.add_handler(Mock(level=LogLevel.WARNING))
+
+        self.assertEqual(logger.effective_level, LogLevel.WARNING)
+        self.assertFalse(logger.is_enabled_for(LogLevel.INFO))
+
+    def test_it_considers_handlers_of_parent_loggers(self):
+        parent = Logger()
+        parent.add_handler(Mock(level=LogLevel.INFO))
+        logger = Logger()
+        logger.add_handler(Mock(level=LogLevel.ERROR))
+        logger.parent = parent
+
+        self.assertEqual(logger.effective_level, LogLevel.INFO)
+
+        logger.propagate = False
+        self.assertEqual(logger.effective_level, LogLevel.ERROR)
+
+    def test_it_is_recomputed_when_handlers_or_levels_change(self):
+        logger = Logger()
+        handler = AsyncStreamHandler(stream=Mock(), level=LogLevel.ERROR)
+        logger.add_handler(handler)
+        self.assertEqual(logger.effective_level, LogLevel.ERROR)
+
+        handler.level = LogLevel.INFO
+        self.assertEqual(logger.effective_level, LogLevel.INFO)
+
+        logger.level = LogLevel.WARNING
+        self.assertEqual(logger.effective_level, LogLevel.WARNING)
+
+        logger.remove_handler(handler)
+        self.assertEqual(logger.effective_level, LogLevel.WARNING)
+
+    def test_it_isnt_recomputed_if_nothing_changed(self):
+        logger = Logger()
+        logger.add_handler(Mock(level=LogLevel.INFO))
+        self.assertEqual(logger.effective_level, LogLevel.INFO)
+
+        with patch.object(logger, "_refresh_cache") as refresh_cache:
+            logger.effective_level
+            refresh_cache.assert_not_called()
+
+    def test_disabled_levels_dont_make_records(self):
+        logger = Logger()
+        logger.add_handler(Mock(level=LogLevel.WARNING))
+
+        with patch.object(logger, "find_caller") as find_caller, patch.object(
+            logger, "_log"
+        ) as _log:
+            logger.debug("Xablau")
+
+        find_caller.assert_not_called()
+        _log.assert_not_called()
+
+    def test_disabled_levels_dont_evaluate_lazy_args(self):
+        logger = Logger()
+        logger.add_handler(Mock(level=LogLevel.WARNING))
+        dump_state = Mock()
+
+        logger.debug("state: %s", Lazy(dump_state))
+
+        dump_state.assert_not_called()
+
+
+class ThreadSafeLoggerTests(asynctest.TestCase):
+    async def test_it_handles_records_logged_from_other_threads(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger()
+        logger.add_handler(handler)
+        await logger.info("from the loop")
+
+        def log_from_thread():
+            for i in range(3):
+                logger.info("from a thread %s", i)
+
+        await self.loop.run_in_executor(None, log_from_thread)
+        await asyncio.sleep(0.01)
+
+        records = [c[0][0] for c in handler.handle.call_args_list]
+        self.assertEqual(
+            [record.get_message() for record in records],
+            ["from the loop"] + [f"from a thread {i}" for i in range(3)],
+        )
+        self.assertEqual(records[-1].funcName, "log_from_thread")
+
+    async def test_it_handles_records_logged_from_threads_first(self):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger()
+        logger.add_handler(handler)
+
+        await self.loop.run_in_executor(
+            None, lambda: logger.info("from a thread")
+        )
+        await asyncio.sleep(0.01)
+
+        handler.handle.assert_awaited_once()
+
+    async def test_queued_loggers_handle_records_logged_from_other_threads(
+        self
+    ):
+        handler = Mock(level=LogLevel.DEBUG, handle=CoroutineMock())
+        logger = Logger(queued=True)
+        logger.add_handler(handler)
+        await logger.info("from the loop")
+
+        await self.loop.run_in_executor(
+            None, lambda: logger.info("from a thread")
+        )
+        await asyncio.sleep(0)
+        await logger.join()
+
+        self.assertEqual(handler.handle.await_count, 2)
+        await logger.shutdown()
+
+    async def test_shutdown_handles_records_logged_before_a_loop_was_used(self):
+        handler = Mock(
+            level=LogLevel.DEBUG, handle=CoroutineMock(), initialized=False
+        )
+
+        def log_from_thread():
+            logger = Logger()
+            logger.add_handler(handler)
+            for i in range(3):
+                logger.info("from a thread %s", i)
+            return logger
+
+        logger = await self.loop.run_in_executor(None, log_from_thread)
+        report = await logger.shutdown()
+
+        self.assertEqual(report, (3, 0))
+        self.assertEqual(handler.handle.await_count, 3)
+
+    async def test_records_waiting_for_a_loop_are_bounded(self):
+        handler = Mock(
+            level=LogLevel.DEBUG, handle=CoroutineMock(), initialized=False
+        )
+
+        def log_from_thread():
+            logger = Logger(max_queue_size=2)
+            logger.add_handler(handler)
+            for i in range(5):
+                logger.info("from a thread %s", i)
+            return logger
+
+        logger = await self.loop.run_in_executor(None, log_from_thread)
+        self.assertEqual(len(logger._thread_safe_buffer), 2)
+        report = await logger.shutdown()
+
+        self.assertEqual(report, (2, 0))
+        messages = [c[0][0].msg for c in handler.handle.call_args_list]
+        self.assertEqual(
+            messages,
+            [
+                "3 log records dropped because the queue was full",
+                "from a thread %s",
+                "from a thread %s",
+            ],
+        )
+
+
+class ShutdownTests(asynctest.TestCase):
+    def make_logger(self, handle, **kwargs):
+        logger = Logger(**kwargs)
+        logger.add_handler(
+            Mock(level=LogLevel.NOTSET, handle=handle, initialized=False)
+        )
+        return logger
+
+    async def test_shutdown_waits_for_records_in_flight(self):
+        handled = []
+
+        async def handle(record):
+            await asyncio.sleep(0.01)
+            handled.append(record.msg)
+
+        logger = self.make_logger(handle)
+        for i in range(5):
+            logger.info(i)
+
+        report = await logger.shutdown()
+
+        self.assertEqual(handled, [0, 1, 2, 3, 4])
+        self.assertEqual(report, (5, 0))
+
+    async def test_shutdown_abandons_records_after_the_timeout(self):
+        async def handle(record):
+            if record.msg == "slow":
+                await asyncio.sleep(10)
+
+        logger = self.make_logger(handle)
+        logger.info("fast")
+        slow = logger.info("slow")
+
+        report = await logger.shutdown(timeout=0.05)
+
+        self.assertEqual(report.delivered, 1)
+        self.assertEqual(report.abandoned, 1)
+        await asyncio.sleep(0)
+        self.assertTrue(slow.cancelled())
+
+    async def test_shutdown_drains_the_queue_of_queued_loggers(self):
+        release = asyncio.Event()
+
+        async def handle(record):
+            await release.wait()
+
+        logger = self.make_logger(handle, queued=True)
+        for i in range(3):
+            logger.info(i)
+        await asyncio.sleep(0)
+
+        report = await logger.shutdown(timeout=0.01)
+        self.assertEqual(report, (0, 3))
+
+    async def test_shutdown_releases_log_calls_waiting_for_room(self):
+        release = asyncio.Event()
+
+        async def handle(record):
+            await release.wait()
+
+        logger = self.make_logger(handle, queued=True, max_queue_size=1)
+        logger.info("handled")
+        await asyncio.sleep(0)
+        logger.info("queued")
+        waiting = logger.info("waiting")
+
+        report = await logger.shutdown(timeout=0.01)
+
+        await asyncio.wait_for(waiting, timeout=1)
+        self.assertEqual(report, (0, 3))
+
+    async def test_records_logged_after_shutdown_are_dropped(self):
+        handle = CoroutineMock()
+        logger = self.make_logger(handle, queued=True)
+        await logger.shutdown()
+
+        await logger.info("Xablau")
+        await asyncio.sleep(0)
+
+        handle.assert_not_awaited()
+        self.assertEqual(logger._dispatcher.dropped_after_close, 1)
+
+    async def test_shutdown_reports_nothing_if_already_shutdown(self):
+        logger = self.make_logger(CoroutineMock())
+        await logger.info("Xablau")
+        await logger.shutdown()
+
+        self.assertEqual(await logger.shutdown(), (0, 0))
+
+    async def test_signal_handlers_drain_the_logger_and_resend_the_signal(self):
+        handled = []
+
+        async def handle(record):
+            await asyncio.sleep(0.01)
+            handled.append(record.msg)
+
+        logger = self.make_logger(handle)
+        logger.install_signal_handlers(signals=(signal.SIGUSR1,))
+        logger.info("Xablau")
+
+        send_signal = os.kill
+        with patch("aiologger.logger.os.kill") as kill:
+            send_signal(os.getpid(), signal.SIGUSR1)
+            await asyncio.sleep(0.1)
+
+        self.assertEqual(handled, ["Xablau"])
+        kill.assert_called_once_with(os.getpid(), signal.SIGUSR1)
+        self.assertFalse(self.loop.remove_signal_handler(signal.SIGUSR1))
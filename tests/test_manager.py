@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import Mock
+
+import asynctest
+from asynctest import CoroutineMock
+
+from aiologger import get_logger
+from aiologger.levels import LogLevel
+from aiologger.loggers.json import JsonLogger
+from aiologger.logger import Logger
+from aiologger.manager import Manager, ROOT_LOGGER_NAME
+
+
+class ManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = Manager()
+
+    def test_it_returns_the_root_logger_if_no_name_is_given(self):
+        self.assertIs(self.manager.get_logger(), self.manager.root)
+        self.assertEqual(self.manager.root.name, ROOT_LOGGER_NAME)
+
+    def test_it_returns_the_same_logger_for_the_same_name(self):
+        self.assertIs(
+            self.manager.get_logger("a.b"), self.manager.get_logger("a.b")
+        )
+
+    def test_it_creates_the_ancestors_of_dotted_names(self):
+        logger = self.manager.get_logger("a.b.c")
+
+        self.assertEqual(logger.name, "a.b.c")
+        self.assertIs(logger.parent, self.manager.get_logger("a.b"))
+        self.assertIs(logger.parent.parent, self.manager.get_logger("a"))
+        self.assertIs(logger.parent.parent.parent, self.manager.root)
+
+    def test_it_creates_loggers_of_the_logger_class(self):
+        manager = Manager(logger_class=JsonLogger)
+
+        self.assertIsInstance(manager.get_logger("a"), JsonLogger)
+        self.assertIsInstance(manager.root, JsonLogger)
+
+    def test_loggers_use_the_handlers_of_their_ancestors(self):
+        root_handler = Mock(level=LogLevel.WARNING)
+        a_handler = Mock(level=LogLevel.DEBUG)
+        self.manager.root.add_handler(root_handler)
+        self.manager.get_logger("a").add_handler(a_handler)
+
+        logger = self.manager.get_logger("a.b")
+
+        self.assertEqual(logger.handler_chain, (a_handler, root_handler))
+        self.assertEqual(logger.effective_level, LogLevel.DEBUG)
+
+        self.manager.get_logger("a").propagate = False
+        self.assertEqual(logger.handler_chain, (a_handler,))
+
+    def test_loggers_inherit_the_level_of_their_closest_ancestor(self):
+        self.manager.root.add_handler(Mock(level=LogLevel.DEBUG))
+        self.manager.get_logger("a").level = LogLevel.ERROR
+
+        logger = self.manager.get_logger("a.b")
+        self.assertEqual(logger.effective_level, LogLevel.ERROR)
+
+        logger.level = LogLevel.INFO
+        self.assertEqual(logger.effective_level, LogLevel.INFO)
+
+    def test_get_logger_uses_the_default_manager(self):
+        logger = get_logger("aiologger.tests.manager")
+
+        self.assertIsInstance(logger, Logger)
+        self.assertIs(logger, get_logger("aiologger.tests.manager"))
+        self.assertIs(logger.parent, get_logger("aiologger.tests"))
+
+
+class ManagerShutdownTests(asynctest.TestCase):
+    async def test_shutdown_shuts_down_every_logger(self):
+        manager = Manager()
+        loggers = [
+            manager.get_logger("a.b"),
+            manager.get_logger("a"),
+            manager.root,
+        ]
+
+        for logger in loggers:
+            logger.shutdown = CoroutineMock()
+        await manager.shutdown()
+
+        for logger in loggers:
+            logger.shutdown.assert_awaited_once()
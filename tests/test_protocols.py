@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import asynctest
+from asynctest import Mock
+
+from aiologger.handlers.streams import AsyncStreamHandler
+from aiologger.protocols import AiologgerProtocol
+
+
+class AiologgerProtocolTests(asynctest.TestCase):
+    def setUp(self):
+        self.protocol = AiologgerProtocol()
+        self.transport = Mock(get_write_buffer_size=Mock(return_value=42))
+        self.protocol.connection_made(self.transport)
+
+    async def test_drain_doesnt_wait_if_writing_isnt_paused(self):
+        await asyncio.wait_for(self.protocol._drain_helper(), timeout=0.1)
+
+    async def test_drain_waits_until_writing_is_resumed(self):
+        self.protocol.pause_writing()
+        drain = asyncio.ensure_future(self.protocol._drain_helper())
+        await asyncio.sleep(0)
+        self.assertFalse(drain.done())
+
+        self.protocol.resume_writing()
+        await asyncio.sleep(0)
+
+        self.assertTrue(drain.done())
+        self.assertFalse(self.protocol.paused)
+
+    async def test_drain_fails_if_the_connection_is_lost(self):
+        self.protocol.pause_writing()
+        drain = asyncio.ensure_future(self.protocol._drain_helper())
+        await asyncio.sleep(0)
+
+        exc = BrokenPipeError()
+        self.protocol.connection_lost(exc)
+
+        with self.assertRaises(BrokenPipeError):
+            await drain
+        with self.assertRaises(ConnectionResetError):
+            await self.protocol._drain_helper()
+
+    def test_buffered_bytes_is_the_transport_buffer_size(self):
+        self.assertEqual(self.protocol.buffered_bytes, 42)
+        self.protocol.connection_lost(None)
+        self.assertEqual(self.protocol.buffered_bytes, 0)
+
+
+class PipeFlowControlTests(asynctest.TestCase):
+    async def setUp(self):
+        r_fileno, w_fileno = os.pipe()
+        self.read_pipe = os.fdopen(r_fileno, "rb")
+        self.write_pipe = os.fdopen(w_fileno, "w")
+        self.handler = AsyncStreamHandler(
+            stream=self.write_pipe,
+            formatter=Mock(format=Mock(return_value="x" * 1023)),
+            high_water_mark=4096,
+            low_water_mark=1024,
+        )
+        await self.handler._init_writer()
+
+    async def tearDown(self):
+        self.handler.writer.transport.abort()
+        self.read_pipe.close()
+        self.write_pipe.close()
+
+    async def test_emit_waits_while_the_pipe_consumer_is_slow(self):
+        record = Mock()
+        for _ in range(1000):
+            emit = asyncio.ensure_future(self.handler.emit(record))
+            await asyncio.sleep(0)
+            if not emit.done():
+                break
+        else:
+            self.fail("emit never waited for the pipe to be drained")
+
+        self.assertGreater(self.handler.buffered_bytes, 4096)
+        self.assertLessEqual(self.handler.buffered_bytes, 4096 + 1024)
+
+        # Reading from the pipe lets the transport drain its buffer
+        while not emit.done():
+            await self.loop.run_in_executor(None, self.read_pipe.read1, 65536)
+            await asyncio.sleep(0.01)
+        self.assertLessEqual(self.handler.buffered_bytes, 1024)
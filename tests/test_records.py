@@ -1,8 +1,11 @@
 import unittest
+from unittest.mock import Mock
+
 from freezegun import freeze_time
 
 from aiologger.levels import LogLevel
 from aiologger.records import LogRecord
+from aiologger.utils import CallableWrapper, Lazy
 
 
 class LogRecordTests(unittest.TestCase):
@@ -27,6 +30,43 @@ class LogRecordTests(unittest.TestCase):
         )
         self.assertEqual(record.get_message(), "Hello world!")
 
+    def test_get_message_evaluates_lazy_args_only_once(self):
+        dump_state = Mock(return_value="big state")
+        record = LogRecord(
+            name="name",
+            level=LogLevel.INFO,
+            pathname=__file__,
+            lineno=666,
+            msg="%s: %s",
+            args=("state", Lazy(dump_state)),
+        )
+        dump_state.assert_not_called()
+
+        self.assertEqual(record.get_message(), "state: big state")
+        self.assertEqual(record.get_message(), "state: big state")
+        dump_state.assert_called_once_with()
+
+    def test_get_message_evaluates_lazy_args_mapping(self):
+        record = LogRecord(
+            name="name",
+            level=LogLevel.INFO,
+            pathname=__file__,
+            lineno=666,
+            msg="%(state)s",
+            args=({"state": CallableWrapper(lambda: "big state")},),
+        )
+        self.assertEqual(record.get_message(), "big state")
+
+    def test_get_message_evaluates_lazy_messages(self):
+        record = LogRecord(
+            name="name",
+            level=LogLevel.INFO,
+            pathname=__file__,
+            lineno=666,
+            msg=Lazy("Hello %s!".__mod__, "world"),
+        )
+        self.assertEqual(record.get_message(), "Hello world!")
+
     def test_get_message_with_args_mapping(self):
         record = LogRecord(
             name="name",
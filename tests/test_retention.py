@@ -0,0 +1,133 @@
+import asyncio
+
+import asynctest
+from asynctest import CoroutineMock
+
+from aiologger.retention import Backup, BackupIndex, BackupJanitor
+
+
+class BackupIndexTests(asynctest.TestCase):
+    def setUp(self):
+        self.index = BackupIndex()
+        for day, size in ((3, 30), (1, 10), (2, 20)):
+            self.index.add(Backup(f"app.log.2020-01-0{day}", size, day * 100))
+
+    def test_backups_are_ordered_by_age_and_their_size_is_tracked(self):
+        self.assertEqual(
+            [backup.path for backup in self.index],
+            ["app.log.2020-01-01", "app.log.2020-01-02", "app.log.2020-01-03"],
+        )
+        self.assertEqual(self.index.total_bytes, 60)
+
+    def test_adding_an_indexed_path_replaces_it(self):
+        self.index.add(Backup("app.log.2020-01-01", 15, 100))
+
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.total_bytes, 65)
+
+    def test_discard(self):
+        self.index.discard("app.log.2020-01-02")
+        self.index.discard("app.log.2020-01-04")
+
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.total_bytes, 40)
+
+    def test_expired_by_backup_count(self):
+        expired = self.index.expired(backup_count=1, now=300)
+
+        self.assertEqual(
+            [backup.path for backup in expired],
+            ["app.log.2020-01-01", "app.log.2020-01-02"],
+        )
+
+    def test_expired_by_total_bytes(self):
+        expired = self.index.expired(max_total_bytes=50, now=300)
+
+        self.assertEqual(
+            [backup.path for backup in expired], ["app.log.2020-01-01"]
+        )
+
+    def test_expired_by_age(self):
+        expired = self.index.expired(max_age=150, now=300)
+
+        self.assertEqual(
+            [backup.path for backup in expired], ["app.log.2020-01-01"]
+        )
+
+    def test_nothing_expires_without_budgets(self):
+        self.assertEqual(self.index.expired(now=300), [])
+
+    def test_backups_are_ordered_by_mtime_not_by_name(self):
+        index = BackupIndex()
+        names = [
+            "app.log.2020-01-01_10-10-10.gz",
+            "app.log.2020-01-01_10-10-10.2.gz",
+            "app.log.2020-01-01_10-10-10.10.gz",
+        ]
+        for mtime, name in enumerate(names):
+            index.add(Backup(name, 10, mtime))
+        index.discard(names[1])
+
+        self.assertEqual(
+            [backup.path for backup in index.expired(backup_count=1)], names[:1]
+        )
+
+    def test_backups_are_ordered_by_key(self):
+        index = BackupIndex(key=lambda backup: -int(backup.path.split(".")[-1]))
+        for number in (1, 2, 10):
+            index.add(Backup(f"app.log.{number}", 10, 0))
+
+        self.assertEqual(
+            [backup.path for backup in index],
+            ["app.log.10", "app.log.2", "app.log.1"],
+        )
+
+
+class BackupJanitorTests(asynctest.TestCase):
+    async def test_it_deletes_expired_backups_in_the_background(self):
+        delete = CoroutineMock()
+        janitor = BackupJanitor(delete, backup_count=1)
+        janitor.index.add(Backup("app.log.1", 10, 0))
+        janitor.index.add(Backup("app.log.2", 10, 0))
+
+        janitor.schedule()
+        delete.assert_not_awaited()
+        await janitor.join()
+
+        delete.assert_awaited_once_with(["app.log.1"])
+        self.assertEqual([b.path for b in janitor.index], ["app.log.2"])
+
+    async def test_deletions_are_rate_limited(self):
+        delete = CoroutineMock()
+        janitor = BackupJanitor(
+            delete, backup_count=1, max_deletes_per_second=2
+        )
+        for i in range(6):
+            janitor.index.add(Backup(f"app.log.{i}", 10, 0))
+
+        janitor.schedule()
+        await asyncio.sleep(0.01)
+        delete.assert_awaited_once_with(["app.log.0", "app.log.1"])
+
+        await janitor.close()
+        delete.assert_awaited_once()
+        self.assertEqual(len(janitor.index), 4)
+
+    async def test_delete_errors_are_reported(self):
+        delete = CoroutineMock(side_effect=PermissionError)
+        janitor = BackupJanitor(delete, backup_count=1)
+        janitor.index.add(Backup("app.log.1", 10, 0))
+        janitor.index.add(Backup("app.log.2", 10, 0))
+        exception_handler = asynctest.Mock()
+        self.loop.set_exception_handler(exception_handler)
+
+        janitor.schedule()
+        await janitor.join()
+
+        exception_handler.assert_called_once()
+        context = exception_handler.call_args[0][1]
+        self.assertIsInstance(context["exception"], PermissionError)
+
+    def test_max_deletes_per_second_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            BackupJanitor(CoroutineMock(), max_deletes_per_second=0)
@@ -0,0 +1,305 @@
+import asyncio
+import os
+import threading
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import asynctest
+
+from aiologger.writers import (
+    AtomicAppendStream,
+    PreallocatedStream,
+    WriterThread,
+    split_atomic_writes,
+    writev_all,
+)
+
+
+class WritevAllTests(asynctest.TestCase):
+    def setUp(self):
+        self.read_fd, self.write_fd = os.pipe()
+
+    def tearDown(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def test_it_retries_partial_writes(self):
+        writev = os.writev
+        calls = []
+
+        def partial_writev(fd, chunks):
+            calls.append([bytes(chunk) for chunk in chunks])
+            # Writes at most 4 bytes per call
+            return writev(fd, [bytes(b"".join(chunks)[:4])])
+
+        with patch("aiologger.writers.os.writev", partial_writev):
+            writev_all(self.write_fd, [b"Xablau", b"\n", b"Xena\n"])
+
+        self.assertEqual(os.read(self.read_fd, 100), b"Xablau\nXena\n")
+        self.assertEqual(
+            calls,
+            [
+                [b"Xablau", b"\n", b"Xena\n"],
+                [b"au", b"\n", b"Xena\n"],
+                [b"ena\n"],
+            ],
+        )
+
+
+class WriterThreadTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "aiologger.log")
+        self.writer_thread = WriterThread()
+
+    async def tearDown(self):
+        self.writer_thread.stop()
+        self.temp_dir.cleanup()
+
+    def read_file(self):
+        with open(self.path, "rb") as fp:
+            return fp.read()
+
+    async def test_consecutive_writes_are_coalesced_into_a_single_writev(self):
+        stream = await self.writer_thread.open(self.path)
+        writev = os.writev
+        calls = []
+
+        def counting_writev(fd, chunks):
+            calls.append(len(chunks))
+            return writev(fd, chunks)
+
+        with patch("aiologger.writers.os.writev", counting_writev):
+            # Holds the thread, so the writes are queued together
+            release = threading.Event()
+            blocker = self.writer_thread.call(release.wait)
+            for i in range(100):
+                stream.write(f"Xablau {i}\n")
+            release.set()
+            await blocker
+            await stream.flush()
+
+        self.assertEqual(calls, [100])
+        self.assertEqual(
+            self.read_file(),
+            "".join(f"Xablau {i}\n" for i in range(100)).encode(),
+        )
+        self.assertEqual(stream.pending_bytes, 0)
+        await stream.close()
+
+    async def test_written_buffers_can_be_reused_right_away(self):
+        stream = await self.writer_thread.open(self.path)
+        buffer = bytearray()
+
+        for msg in (b"Xablau\n", b"Xena\n"):
+            buffer += msg
+            stream.write(buffer)
+            buffer.clear()
+        await stream.close()
+
+        self.assertEqual(self.read_file(), b"Xablau\nXena\n")
+
+    async def test_open_appends_to_existing_files(self):
+        with open(self.path, "w") as fp:
+            fp.write("Xablau\n")
+
+        stream = await self.writer_thread.open(self.path, mode="a")
+        await stream.write("Xena\n")
+        await stream.flush()
+        await stream.close()
+
+        self.assertEqual(self.read_file(), b"Xablau\nXena\n")
+
+    async def test_open_truncates_files_with_w_mode(self):
+        with open(self.path, "w") as fp:
+            fp.write("Xablau\n")
+
+        stream = await self.writer_thread.open(self.path, mode="w")
+        await stream.close()
+
+        self.assertEqual(self.read_file(), b"")
+
+    async def test_open_raises_for_unsupported_modes(self):
+        with self.assertRaises(ValueError):
+            await self.writer_thread.open(self.path, mode="r")
+
+    async def test_flush_raises_write_errors(self):
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        stream = self.writer_thread.attach(write_fd)
+
+        stream.write(b"Xablau\n")
+        with self.assertRaises(BrokenPipeError):
+            await stream.flush()
+        await stream.flush()
+        os.close(write_fd)
+
+    async def test_drain_doesnt_wait_below_the_high_water_mark(self):
+        stream = await self.writer_thread.open(self.path, high_water_mark=10)
+        release = threading.Event()
+        blocker = self.writer_thread.call(release.wait)
+
+        stream.write("Xablau\n")
+        await asyncio.wait_for(stream.drain(), timeout=1)
+        self.assertFalse(stream.paused)
+
+        stream.write("Xablau\n")
+        self.assertTrue(stream.paused)
+        drain = asyncio.ensure_future(stream.drain())
+        await asyncio.sleep(0.01)
+        self.assertFalse(drain.done())
+
+        release.set()
+        await blocker
+        await drain
+        self.assertEqual(stream.pending_bytes, 0)
+        await stream.close()
+
+    async def test_drain_raises_the_errors_of_failed_writes(self):
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        stream = self.writer_thread.attach(write_fd)
+
+        stream.write(b"Xablau\n")
+        await self.writer_thread.call(lambda: None)
+        with self.assertRaises(BrokenPipeError):
+            await stream.drain()
+        os.close(write_fd)
+
+    async def test_attached_fds_arent_closed_with_the_stream(self):
+        read_fd, write_fd = os.pipe()
+        stream = self.writer_thread.attach(write_fd)
+
+        stream.write(b"Xablau\n")
+        await stream.close()
+
+        self.assertTrue(stream.closed)
+        self.assertEqual(os.write(write_fd, b"Xena\n"), 5)
+        self.assertEqual(os.read(read_fd, 100), b"Xablau\nXena\n")
+        os.close(read_fd)
+        os.close(write_fd)
+
+    async def test_writes_to_closed_streams_raise(self):
+        stream = await self.writer_thread.open(self.path)
+        await stream.close()
+
+        with self.assertRaises(ValueError):
+            stream.write("Xablau")
+
+
+class SplitAtomicWritesTests(asynctest.TestCase):
+    def test_small_data_is_written_at_once(self):
+        self.assertEqual(
+            split_atomic_writes(b"Xablau\nXena\n", 16), [b"Xablau\nXena\n"]
+        )
+
+    def test_chunks_are_made_of_whole_lines(self):
+        self.assertEqual(
+            split_atomic_writes(b"Xablau\nXena\nXablau\n", 12),
+            [b"Xablau\nXena\n", b"Xablau\n"],
+        )
+
+    def test_long_lines_are_split(self):
+        self.assertEqual(
+            split_atomic_writes(b"Xablau Xena\nX\n", 6),
+            [b"Xablau", b" Xena\n", b"X\n"],
+        )
+
+    def test_long_lines_are_refused_if_they_cant_be_split(self):
+        with self.assertRaises(ValueError):
+            split_atomic_writes(b"Xablau Xena\n", 6, split_long_lines=False)
+
+
+class AtomicAppendStreamTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "app.log")
+        with open(self.path, "w") as fp:
+            fp.write("Xablau\n")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_each_chunk_is_a_single_append(self):
+        stream = await AtomicAppendStream.open(self.path, atomic_write_size=12)
+        with patch("aiologger.writers.os.write", side_effect=os.write) as write:
+            await stream.write("Xena\nXablau\nXena\n")
+        await stream.close()
+
+        self.assertEqual(
+            [call[0][1] for call in write.call_args_list],
+            [b"Xena\nXablau\n", b"Xena\n"],
+        )
+        with open(self.path) as fp:
+            self.assertEqual(fp.read(), "Xablau\nXena\nXablau\nXena\n")
+        self.assertTrue(stream.closed)
+
+    async def test_writes_to_closed_streams_raise(self):
+        stream = await AtomicAppendStream.open(self.path)
+        await stream.close()
+
+        with self.assertRaises(ValueError):
+            await stream.write("Xablau\n")
+
+
+class PreallocatedStreamTests(asynctest.TestCase):
+    async def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "app.log")
+
+    async def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_space_is_preallocated_once_per_chunk(self):
+        stream = await PreallocatedStream.open(self.path, chunk_size=16)
+        with patch(
+            "aiologger.writers.os.posix_fallocate",
+            side_effect=os.posix_fallocate,
+        ) as posix_fallocate:
+            for _ in range(3):
+                await stream.write("Xablau\n")
+
+        self.assertEqual(
+            posix_fallocate.call_args_list,
+            [((stream.fd, 0, 16),), ((stream.fd, 16, 16),)],
+        )
+        self.assertEqual(os.path.getsize(self.path), 32)
+        await stream.close()
+
+        self.assertEqual(os.path.getsize(self.path), 21)
+        with open(self.path) as fp:
+            self.assertEqual(fp.read(), "Xablau\n" * 3)
+
+    async def test_open_appends_after_the_written_length(self):
+        with open(self.path, "w") as fp:
+            fp.write("Xablau\n")
+        stream = await PreallocatedStream.open(self.path, chunk_size=16)
+        await stream.write("Xena\n")
+        await stream.close()
+
+        with open(self.path) as fp:
+            self.assertEqual(fp.read(), "Xablau\nXena\n")
+
+    async def test_open_truncates_the_preallocated_tail_of_unclosed_files(self):
+        stream = await PreallocatedStream.open(self.path, chunk_size=16)
+        await stream.write("Xablau\n")
+        os.close(stream.fd)
+        self.assertEqual(os.path.getsize(self.path), 16)
+
+        stream = await PreallocatedStream.open(self.path, chunk_size=16)
+        self.assertEqual(stream.offset, 7)
+        await stream.close()
+        self.assertEqual(os.path.getsize(self.path), 7)
+
+    async def test_it_writes_without_preallocation_if_it_isnt_supported(self):
+        stream = await PreallocatedStream.open(self.path, chunk_size=16)
+        with patch(
+            "aiologger.writers.os.posix_fallocate", side_effect=OSError
+        ) as posix_fallocate:
+            await stream.write("Xablau\n" * 3)
+            await stream.write("Xena\n" * 4)
+        await stream.close()
+
+        posix_fallocate.assert_called_once()
+        with open(self.path) as fp:
+            self.assertEqual(fp.read(), "Xablau\n" * 3 + "Xena\n" * 4)